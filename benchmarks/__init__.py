@@ -0,0 +1,4 @@
+"""Benchmarks dos caminhos críticos de Models, controller e formatação das Views.
+
+Uso: python -m benchmarks.run --tamanhos 1000 10000 --saida resultados.json
+"""
@@ -0,0 +1,143 @@
+"""Substitutos sem tela para o Tk e as Views, usados pelos benchmarks.
+
+As Views reais são criadas sem chamar o __init__ (que monta widgets) e recebem
+estes widgets falsos, então os métodos medidos (populate_treeview, populate_report)
+rodam exatamente o código de produção, só sem desenhar nada.
+"""
+from view.main_view import MainView
+from view.report_view import ReportView
+
+class FakeMaster:
+    """Janela raiz falsa: guarda os callbacks de after() até run_pending()."""
+    def __init__(self):
+        """Inicializa a fila de callbacks agendados."""
+        self._pending = {}
+        self._next_id = 0
+
+    def after(self, ms, func, *args):
+        """Agenda `func` (o atraso é ignorado); retorna o id do agendamento."""
+        self._next_id += 1
+        self._pending[self._next_id] = (func, args)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        """Cancela um callback agendado."""
+        self._pending.pop(after_id, None)
+
+    def run_pending(self):
+        """Executa os callbacks agendados (inclusive os reagendados) até a fila esvaziar."""
+        while self._pending:
+            after_id = next(iter(self._pending))
+            func, args = self._pending.pop(after_id)
+            func(*args)
+
+    def winfo_exists(self):
+        """A janela falsa nunca é fechada."""
+        return True
+
+    def __getattr__(self, name):
+        """Demais métodos do Tk (title, geometry, lift...) não fazem nada."""
+        return lambda *args, **kwargs: None
+
+class FakeWidget:
+    """Widget que aceita e ignora qualquer configuração."""
+    def __getattr__(self, name):
+        """Qualquer método (config, pack, heading...) não faz nada."""
+        return lambda *args, **kwargs: None
+
+class FakeTreeview(FakeWidget):
+    """Treeview em memória com as operações usadas pelas Views."""
+    def __init__(self):
+        """Inicializa a lista ordenada de itens e seus valores."""
+        self._items = []
+        self._values = {}
+        self._next_iid = 0
+
+    def insert(self, parent, index, values=(), iid=None):
+        """Insere um item na posição dada ("end" ou inteiro) e retorna seu iid."""
+        if iid is None:
+            self._next_iid += 1
+            iid = f"I{self._next_iid:06X}"
+        iid = str(iid)
+        if index == "end":
+            self._items.append(iid)
+        else:
+            self._items.insert(index, iid)
+        self._values[iid] = tuple(values)
+        return iid
+
+    def item(self, iid, values=None, **options):
+        """Lê ou troca os valores de um item."""
+        if values is not None:
+            self._values[str(iid)] = tuple(values)
+        return {"values": self._values[str(iid)]}
+
+    def move(self, iid, parent, index):
+        """Move um item para a posição dada."""
+        self._items.remove(str(iid))
+        self._items.insert(index, str(iid))
+
+    def delete(self, *iids):
+        """Remove os itens dados."""
+        removed = {str(iid) for iid in iids}
+        self._items = [iid for iid in self._items if iid not in removed]
+        for iid in removed:
+            del self._values[iid]
+
+    def get_children(self, item=""):
+        """Iids de todos os itens, em ordem."""
+        return tuple(self._items)
+
+    def exists(self, iid):
+        """Indica se o item existe."""
+        return str(iid) in self._values
+
+    def yview(self, *args):
+        """Posição de rolagem fixa no topo."""
+        return (0.0, 1.0)
+
+class FakeFormView(FakeWidget):
+    """MainView mínima para o controller: devolve um formulário fixo e ignora mensagens."""
+    def __init__(self, form_data=None):
+        """Guarda o dicionário devolvido por get_form_data()."""
+        self.form_data = form_data or {}
+        self.errors = []
+
+    def get_form_data(self):
+        """Dados do formulário definidos pelo benchmark."""
+        return dict(self.form_data)
+
+    def get_search_term(self):
+        """Sem busca ativa."""
+        return ""
+
+    def show_error(self, title, message):
+        """Registra o erro em vez de abrir uma caixa de diálogo."""
+        self.errors.append((title, message))
+
+def headless_main_view(sort_key):
+    """MainView real com Treeview falso, pronta para populate_treeview/upsert_row."""
+    view = MainView.__new__(MainView)
+    view.master = FakeMaster()
+    view.controller = None
+    view.tree = FakeTreeview()
+    view._row_keys = []
+    view._key_by_id = {}
+    view._sort_key = sort_key
+    view._sort_descending = False
+    view._has_more_before = view._has_more_after = False
+    view._page_request_pending = False
+    return view
+
+def headless_report_view():
+    """ReportView real com widgets falsos; a renderização em lotes roda em master.run_pending()."""
+    view = ReportView.__new__(ReportView)
+    view.master = view.window = FakeMaster()
+    view.controller = None
+    view.tree = FakeTreeview()
+    view.progress_bar = view.progress_label = view.cancel_button = FakeWidget()
+    view._render_rows = []
+    view._render_items = ()
+    view._render_index = 0
+    view._render_after_id = None
+    return view
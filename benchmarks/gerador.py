@@ -0,0 +1,89 @@
+"""Gerador determinístico (com semente) de dados sintéticos de salão.
+
+Clientes recorrentes com telefone e email fixos, catálogo de serviços com preço e
+duração típicos, reajuste anual de preços e horários em dias úteis ao longo de
+vários anos. A mesma semente sempre gera os mesmos dados.
+"""
+import random
+from datetime import date, timedelta
+from model import codec
+
+SEMENTE_PADRAO = 20240501
+ANO_INICIAL, ANO_FINAL = 2019, 2026 # Período coberto pelos agendamentos gerados
+ABERTURA, FECHAMENTO = 8 * 60, 19 * 60 # Minutos do dia em que o salão abre e fecha
+INTERVALO_HORARIOS = 15 # Os horários começam em múltiplos de 15 minutos
+REAJUSTE_ANUAL = 0.06 # Aumento médio dos preços a cada ano
+AGENDAMENTOS_POR_CLIENTE = 8 # Média, para dimensionar a carteira de clientes
+DIAS_FECHADOS = (6, 0) # Domingo e segunda (date.weekday(): segunda = 0)
+
+# (serviço, preço em centavos no ano inicial, duração em minutos, peso na procura)
+SERVICOS = (
+    ("Corte", 5000, 45, 30),
+    ("Escova", 4000, 40, 20),
+    ("Manicure", 3000, 45, 25),
+    ("Pedicure", 3500, 50, 15),
+    ("Hidratação", 6000, 60, 10),
+    ("Coloração", 15000, 120, 8),
+    ("Luzes", 20000, 150, 5),
+    ("Progressiva", 25000, 180, 4),
+    ("Sobrancelha", 2500, 20, 12),
+    ("Maquiagem", 12000, 60, 3),
+)
+
+NOMES = ("Ana", "Beatriz", "Camila", "Daniela", "Eduarda", "Fernanda", "Gabriela", "Helena", "Isabela",
+         "Júlia", "Larissa", "Mariana", "Natália", "Patrícia", "Rafaela", "Sofia", "Tânia", "Vitória",
+         "Carlos", "João", "Lucas", "Marcos", "Pedro", "Rodrigo")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira", "Almeida",
+              "Ribeiro", "Carvalho", "Gomes", "Martins", "Araújo", "Barbosa", "Conceição")
+
+def gerar_clientes(quantidade, rng):
+    """Lista de (nome, telefone, email); o email é único por cliente."""
+    clientes = []
+    for numero in range(quantidade):
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}" # homônimos acontecem, como na vida real
+        telefone = f"119{rng.randrange(10_000_000, 100_000_000)}"
+        email = f"{nome.split()[0].lower()}.{numero}@exemplo.com" if rng.random() < 0.6 else ""
+        clientes.append((nome, telefone, email))
+    return clientes
+
+def _dias_abertos():
+    """Datas de funcionamento entre ANO_INICIAL e ANO_FINAL."""
+    dia, fim = date(ANO_INICIAL, 1, 1), date(ANO_FINAL, 12, 31)
+    dias = []
+    while dia <= fim:
+        if dia.weekday() not in DIAS_FECHADOS:
+            dias.append(dia)
+        dia += timedelta(days=1)
+    return dias
+
+def gerar_agendamentos(quantidade, semente=SEMENTE_PADRAO):
+    """Gera `quantidade` tuplas (nome, telefone, email, data, valor_centavos, servico, duracao).
+
+    `data` em minutos desde a época e valor em centavos, como gravados no banco;
+    as linhas saem em ordem aleatória de data, como num cadastro real.
+    """
+    rng = random.Random(semente)
+    clientes = gerar_clientes(max(quantidade // AGENDAMENTOS_POR_CLIENTE, 1), rng)
+    # Alguns clientes voltam bem mais que outros
+    pesos_clientes = [1 / (posicao + 1) ** 0.5 for posicao in range(len(clientes))]
+    pesos_servicos = [peso for *_, peso in SERVICOS]
+    dias = _dias_abertos()
+    horarios = range(ABERTURA, FECHAMENTO, INTERVALO_HORARIOS)
+    clientes_sorteados = rng.choices(clientes, pesos_clientes, k=quantidade)
+    servicos_sorteados = rng.choices(SERVICOS, pesos_servicos, k=quantidade)
+    for (nome, telefone, email), (servico, preco, duracao, _peso) in zip(clientes_sorteados, servicos_sorteados):
+        dia = rng.choice(dias)
+        reajuste = (1 + REAJUSTE_ANUAL) ** (dia.year - ANO_INICIAL)
+        valor = int(preco * reajuste * rng.uniform(0.9, 1.1)) // 50 * 50 # arredonda a R$ 0,50
+        inicio = codec.date_to_minutes(dia) + rng.choice(horarios)
+        yield (nome, telefone, email, inicio, valor, servico, duracao)
+
+def gerar_formularios(quantidade, semente=SEMENTE_PADRAO):
+    """Dicionários no formato de MainView.get_form_data(), com texto como digitado pelo usuário."""
+    for nome, telefone, email, inicio, valor, servico, duracao in gerar_agendamentos(quantidade, semente):
+        yield {
+            "Nome": nome, "Telefone": telefone, "Email": email,
+            "Data": codec.format_date(inicio), "Horário": codec.format_time(inicio),
+            "Duração": str(duracao), "Valor": codec.format_money(valor).replace(".", ","),
+            "Serviço": servico,
+        }
@@ -0,0 +1,216 @@
+"""Executa os benchmarks e grava os tempos em JSON.
+
+Para cada tamanho, cria um banco temporário com dados do gerador (mesma semente,
+mesmos dados) e mede CRUD do AgendamentoModel, listagem completa e paginada, a
+validação do formulário no controller, a formatação de linhas das Views (com
+widgets falsos) e o backup (com o histórico ainda vazio, como num banco novo).
+Com --comparar, aponta casos mais lentos que um resultado anterior.
+
+Uso: python -m benchmarks.run --tamanhos 1000 10000 --saida atual.json --comparar anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from model.database import set_database, setup_database, close_pool, get_connection
+from model.migrations import SCHEMA_VERSION
+from model.agendamento import AgendamentoModel, PAGE_SIZE, sort_key
+from model.backup import criar_backup, verificar_backup, BackupError
+from controller.app_controller import AppController
+from benchmarks.gerador import gerar_agendamentos, gerar_formularios, SEMENTE_PADRAO
+from benchmarks.fakes import FakeMaster, FakeFormView, headless_main_view, headless_report_view
+
+TAMANHOS_PADRAO = (1_000, 10_000, 100_000, 1_000_000)
+REPETICOES_PADRAO = 3 # Execuções de cada caso; o JSON traz mínimo, mediana e máximo
+OPERACOES_CRUD = 500 # Chamadas por repetição nos casos de uma linha por vez
+PAGINAS = 50 # Páginas percorridas no caso de listagem paginada
+LOTE_INSERCAO = 10_000 # Linhas por executemany ao popular o banco
+TOLERANCIA_PADRAO = 0.10 # Fração de aumento da mediana considerada regressão
+
+def _progresso(mensagem):
+    """Mensagens de andamento vão para stderr, para não misturar com o resumo."""
+    print(mensagem, file=sys.stderr, flush=True)
+
+def _medir(func, repeticoes, preparar=None):
+    """Tempos (segundos) de `repeticoes` execuções de func(); preparar() roda fora da medição."""
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        func(argumento) if preparar else func()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+def _resultado(tamanho, caso, operacoes, tempos):
+    """Registro JSON de um caso: tempos em segundos e mediana por operação em microssegundos."""
+    mediana = statistics.median(tempos)
+    return {"tamanho": tamanho, "caso": caso, "operacoes": operacoes,
+            "segundos": {"min": min(tempos), "mediana": mediana, "max": max(tempos)},
+            "us_por_operacao": mediana / operacoes * 1e6 if operacoes else None}
+
+def popular_banco(tamanho, semente):
+    """Insere `tamanho` agendamentos gerados, em lotes, numa única transação."""
+    model = AgendamentoModel()
+    linhas = gerar_agendamentos(tamanho, semente)
+    with get_connection():
+        while lote := [linha for _, linha in zip(range(LOTE_INSERCAO), linhas)]:
+            model.add_many_agendamentos(lote)
+
+def _casos_crud(model, tamanho, rng):
+    """Chamadas de uma linha por vez: inclusão, leitura, edição, gravação com checagem e remoção."""
+    novos = list(gerar_agendamentos(OPERACOES_CRUD, rng.randrange(2 ** 32)))
+    ids = [rng.randrange(1, tamanho + 1) for _ in range(OPERACOES_CRUD)]
+    criados = []
+
+    def incluir():
+        criados.extend(model.add_agendamento(*linha)[0] for linha in novos)
+
+    def ler():
+        for agendamento_id in ids:
+            model.get_agendamento_by_id(agendamento_id)
+
+    def editar():
+        for agendamento_id, linha in zip(criados, novos):
+            model.update_agendamento(agendamento_id, *linha)
+
+    def gravar_com_checagem():
+        for agendamento_id, linha in zip(criados, novos):
+            model.save_if_available(agendamento_id, *linha)
+
+    def remover():
+        for agendamento_id in criados:
+            model.delete_agendamento(agendamento_id)
+        criados.clear()
+
+    # A inclusão e a remoção formam um ciclo: cada repetição recria as linhas que remove
+    return (("add_agendamento", incluir), ("get_agendamento_by_id", ler), ("update_agendamento", editar),
+            ("save_if_available", gravar_com_checagem), ("delete_agendamento", remover))
+
+def executar_tamanho(tamanho, semente, repeticoes):
+    """Roda todos os casos num banco temporário com `tamanho` agendamentos."""
+    resultados = []
+    rng = random.Random(semente)
+    with tempfile.TemporaryDirectory(prefix="salao-bench-") as pasta:
+        set_database(os.path.join(pasta, "bench.db"))
+        try:
+            setup_database()
+            inicio = time.perf_counter()
+            popular_banco(tamanho, semente)
+            resultados.append(_resultado(tamanho, "popular_banco", tamanho, [time.perf_counter() - inicio]))
+            _progresso(f"[{tamanho}] banco populado em {resultados[-1]['segundos']['mediana']:.1f} s")
+            model = AgendamentoModel()
+
+            # Logo após popular: o histórico ainda tem 0 páginas, como num banco novo sem arquivamento
+            pasta_backups = os.path.join(pasta, "backups")
+            def copiar():
+                falhas = {nome: r for nome, r in verificar_backup(
+                    criar_backup(pasta_backups, manter=1, progresso=lambda fracao: None)).items() if r != "ok"}
+                if falhas:
+                    raise BackupError(f"Backup do benchmark corrompido: {falhas}")
+            resultados.append(_resultado(tamanho, "criar_backup", None, _medir(copiar, repeticoes)))
+
+            crud = _casos_crud(model, tamanho, rng)
+            tempos_crud = {caso: [] for caso, _ in crud}
+            for _ in range(repeticoes):
+                for caso, func in crud:
+                    tempos_crud[caso] += _medir(func, 1)
+            resultados += [_resultado(tamanho, caso, OPERACOES_CRUD, tempos) for caso, tempos in tempos_crud.items()]
+
+            todos = model.get_all_agendamentos()
+            resultados.append(_resultado(tamanho, "get_all_agendamentos", tamanho,
+                                         _medir(model.get_all_agendamentos, repeticoes)))
+
+            paginas = min(PAGINAS, -(-tamanho // PAGE_SIZE))
+            def paginar():
+                cursor = None
+                for _ in range(paginas):
+                    linhas, _ha_mais = model.get_agendamentos_page(cursor)
+                    cursor = sort_key(linhas[-1])
+            resultados.append(_resultado(tamanho, "get_agendamentos_page", paginas, _medir(paginar, repeticoes)))
+
+            controller = AppController(FakeMaster())
+            try:
+                formularios = list(gerar_formularios(tamanho, semente))
+                controller.main_view = FakeFormView()
+                def validar():
+                    for formulario in formularios:
+                        controller.main_view.form_data = formulario
+                        controller._validate_and_get_data()
+                resultados.append(_resultado(tamanho, "validate_and_get_data", tamanho, _medir(validar, repeticoes)))
+                del formularios
+            finally:
+                controller.shutdown()
+
+            resultados.append(_resultado(tamanho, "populate_treeview", tamanho, _medir(
+                lambda view: view.populate_treeview(todos), repeticoes,
+                preparar=lambda: headless_main_view(lambda row: sort_key(row, "data")))))
+
+            def renderizar(view):
+                view.populate_report(todos)
+                view.window.run_pending()
+            resultados.append(_resultado(tamanho, "populate_report", tamanho,
+                                         _medir(renderizar, repeticoes, preparar=headless_report_view)))
+        finally:
+            close_pool()
+    return resultados
+
+def comparar(resultados, anteriores, tolerancia):
+    """Lista (tamanho, caso, razão) dos casos cuja mediana cresceu mais que `tolerancia`."""
+    base = {(r["tamanho"], r["caso"]): r["segundos"]["mediana"] for r in anteriores}
+    regressoes = []
+    for r in resultados:
+        anterior = base.get((r["tamanho"], r["caso"]))
+        if anterior:
+            razao = r["segundos"]["mediana"] / anterior
+            if razao > 1 + tolerancia:
+                regressoes.append((r["tamanho"], r["caso"], razao))
+    return regressoes
+
+def main(argv=None):
+    """Ponto de entrada dos benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks de Models, controller e Views (sem tela).")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO),
+                        help="Quantidades de agendamentos no banco (padrão: 1000 10000 100000 1000000)")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO)
+    parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para apontar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="Aumento da mediana tolerado na comparação (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for tamanho in args.tamanhos:
+        resultados += executar_tamanho(tamanho, args.semente, args.repeticoes)
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(), "versao_esquema": SCHEMA_VERSION,
+        "semente": args.semente, "repeticoes": args.repeticoes, "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    for r in resultados:
+        por_operacao = f"{r['us_por_operacao']:12.1f} us/op" if r["us_por_operacao"] is not None else ""
+        print(f"{r['tamanho']:>9} {r['caso']:<24} {r['segundos']['mediana']:10.4f} s {por_operacao}")
+    print(f"Resultados gravados em {args.saida}.")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(resultados, json.load(f)["resultados"], args.tolerancia)
+        for tamanho, caso, razao in regressoes:
+            print(f"REGRESSÃO: {caso} com {tamanho} linhas está {razao:.2f}x mais lento.")
+        if regressoes:
+            return 1
+        print("Nenhuma regressão acima da tolerância.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,564 @@
+"""Serviço HTTP/JSON (asyncio, sem interface gráfica) sobre os Models de agendamento.
+
+Vários terminais do salão usam o mesmo banco através deste processo: as conexões
+HTTP são atendidas por um único loop asyncio, as leituras rodam em um pequeno
+pool de threads e todas as escritas passam por uma única thread dona do banco.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+from model.database import set_database, setup_database, close_pool, POOL_SIZE
+from model.agendamento import AgendamentoModel, ORDENACOES, PAGE_SIZE, SEARCH_LIMIT, DURACAO_PADRAO, VersionConflictError
+from model.disponibilidade import DisponibilidadeModel, MAX_DURACAO
+from model.relatorio import RelatorioModel
+from model.user_model import UserModel
+from model.cliente import ClienteModel
+from model.servico import ServicoModel
+from model.serie import SerieModel
+from model.recorrencia import FREQUENCIAS, MAX_OCORRENCIAS, excede_maximo
+from controller.bulk_import import import_agendamentos
+from controller.export import export_agendamentos, EXPORT_FORMATS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_PAGE_LIMIT = 1000 # Maior página aceita em /agendamentos
+READ_WORKERS = POOL_SIZE - 1 # Threads de leitura; a conexão restante fica com a escrita
+MAX_BODY_BYTES = 64 * 1024 * 1024 # Maior corpo aceito (arquivos de importação)
+IDLE_TIMEOUT = 60 # Segundos que uma conexão keep-alive pode ficar ociosa
+STREAM_CHUNK_SIZE = 64 * 1024 # Bytes por escrita ao enviar arquivos exportados
+
+class HttpError(Exception):
+    """Erro com status HTTP e mensagem devolvidos ao cliente em JSON."""
+    def __init__(self, status, message, extra=None):
+        """Guarda o status, a mensagem e campos extras opcionais do corpo de erro."""
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.extra = extra or {}
+
+class FileResponse:
+    """Resposta com o conteúdo de um arquivo temporário (removido após o envio)."""
+    def __init__(self, path, content_type, headers=None):
+        """Guarda o caminho, o tipo e cabeçalhos extras da resposta."""
+        self.path = path
+        self.content_type = content_type
+        self.headers = headers or {}
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _int_param(query, name, default=None):
+    """Lê um parâmetro inteiro da query string (400 se inválido)."""
+    values = query.get(name)
+    if not values or values[0] == "":
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise HttpError(400, f"Parâmetro inteiro inválido: {name}") from None
+
+def _limit_param(query, default, maximo):
+    """Lê ?limit= limitado a `maximo` (400 se menor que 1: LIMIT negativo no SQLite não limita nada)."""
+    limit = _int_param(query, "limit", default)
+    if limit < 1:
+        raise HttpError(400, "Parâmetro limit deve ser maior que zero.")
+    return min(limit, maximo)
+
+def _str_param(query, name, default=None):
+    """Lê um parâmetro de texto da query string."""
+    values = query.get(name)
+    return values[0] if values else default
+
+def _sort_params(query):
+    """Lê ordenação (da lista ORDENACOES) e sentido da query string."""
+    ordenacao = _str_param(query, "ordenacao", "data")
+    if ordenacao not in ORDENACOES:
+        raise HttpError(400, f"Ordenação desconhecida: {ordenacao}")
+    return {"ordenacao": ordenacao, "descendente": _str_param(query, "descendente") == "1"}
+
+def _cursor_param(query, ordenacao):
+    """Lê o cursor keyset (lista JSON com um valor por coluna da ordenação; 400 se inválido)."""
+    cursor = _str_param(query, "cursor")
+    if not cursor:
+        return None
+    try:
+        cursor = json.loads(cursor)
+    except ValueError:
+        raise HttpError(400, "Cursor inválido.") from None
+    if (not isinstance(cursor, list) or len(cursor) != len(ORDENACOES[ordenacao])
+            or not all(value is None or isinstance(value, (str, int, float)) for value in cursor)):
+        raise HttpError(400, "Cursor inválido.")
+    return cursor
+
+def _agendamento_args(body):
+    """Converte o corpo JSON de um agendamento nos argumentos de save_if_available."""
+    try:
+        nome, servico = str(body["nome"]).strip(), str(body["servico"]).strip()
+        telefone, email = str(body.get("telefone") or ""), str(body.get("email") or "")
+        data, valor, duracao = body["data"], body.get("valor_centavos", 0), body.get("duracao", DURACAO_PADRAO)
+    except (KeyError, TypeError):
+        raise HttpError(400, "Campos obrigatórios: nome, servico e data.") from None
+    if not nome or not servico:
+        raise HttpError(400, "Nome e serviço são obrigatórios.")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (data, valor, duracao)):
+        raise HttpError(400, "data, valor_centavos e duracao devem ser inteiros.")
+    if not 0 < duracao <= MAX_DURACAO:
+        raise HttpError(400, f"Duração deve ser de 1 a {MAX_DURACAO} minutos.")
+    return nome, telefone, email, data, valor, servico, duracao
+
+def _servico_args(body):
+    """Converte o corpo JSON de um serviço nos argumentos de save_servico (sem o id)."""
+    nome, valor = str(body.get("nome") or "").strip(), body.get("valor_centavos", 0)
+    duracao = body.get("duracao", DURACAO_PADRAO)
+    if not nome:
+        raise HttpError(400, "O nome do serviço é obrigatório.")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (valor, duracao)):
+        raise HttpError(400, "valor_centavos e duracao devem ser inteiros.")
+    if not 0 < duracao <= MAX_DURACAO:
+        raise HttpError(400, f"Duração deve ser de 1 a {MAX_DURACAO} minutos.")
+    return nome, valor, duracao
+
+def _recorrencia_args(body):
+    """Lê frequência, `ate` (minutos, exclusivo) e `vezes` da regra de uma série que começa em body["data"]."""
+    frequencia, ate, vezes = body.get("frequencia"), body.get("ate"), body.get("vezes")
+    if frequencia not in FREQUENCIAS:
+        raise HttpError(400, f"Frequência deve ser uma de: {', '.join(FREQUENCIAS)}.")
+    if ate is None and vezes is None:
+        raise HttpError(400, "Informe ate ou vezes.")
+    if not all(value is None or isinstance(value, int) and not isinstance(value, bool) for value in (ate, vezes)):
+        raise HttpError(400, "ate e vezes devem ser inteiros.")
+    if vezes is not None and not 0 < vezes <= MAX_OCORRENCIAS:
+        raise HttpError(400, f"vezes deve ser de 1 a {MAX_OCORRENCIAS}.")
+    if isinstance(body.get("data"), int) and excede_maximo(body["data"], frequencia, ate, vezes):
+        raise HttpError(400, f"A série passaria de {MAX_OCORRENCIAS} ocorrências; reduza ate ou informe vezes.")
+    return frequencia, ate, vezes
+
+def _versao_param(body):
+    """Lê a versão opcional usada no controle otimista (400 se não for inteira)."""
+    versao = body.get("versao")
+    if versao is not None and not isinstance(versao, int):
+        raise HttpError(400, "versao deve ser inteiro.")
+    return versao
+
+def is_loopback(host):
+    """Indica se `host` só aceita conexões da própria máquina (127.0.0.0/8, ::1 ou localhost)."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError: # nome de máquina ou "" (todas as interfaces)
+        return False
+
+class ApiServer:
+    """Servidor HTTP/1.1 mínimo com rotas JSON sobre os Models da aplicação."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+        """Prepara os Models, os executores e a tabela de rotas (sem abrir a porta).
+
+        Fora do loopback o serviço fica exposto à rede, então `token` é obrigatório
+        (ValueError sem ele).
+        """
+        if not token and not is_loopback(host):
+            raise ValueError(f"Escutando em {host}, o serviço exige um token de acesso (--token).")
+        self.host = host
+        self.port = port
+        self.token = token
+        self.agendamento_model = AgendamentoModel()
+        self.user_model = UserModel()
+        self.relatorio_model = RelatorioModel()
+        self.disponibilidade_model = DisponibilidadeModel()
+        self.cliente_model = ClienteModel()
+        self.servico_model = ServicoModel()
+        self.serie_model = SerieModel()
+        self._reader = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="api-leitura")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-escrita")
+        self._server = None
+        # (método, padrão do caminho, handler, executor); o handler recebe (match, query, body)
+        self.routes = [
+            ("GET", r"/status", self._status, self._reader),
+            ("POST", r"/usuarios", self._create_user, self._writer),
+            # A verificação (KDF) é lenta e não deve segurar a fila de escrita; o rehash vai para ela
+            ("POST", r"/login", self._login, self._reader),
+            ("GET", r"/agendamentos", self._page, self._reader),
+            ("GET", r"/agendamentos/todos", self._all, self._reader),
+            ("GET", r"/agendamentos/busca", self._search, self._reader),
+            ("GET", r"/agendamentos/(\d+)", self._get_one, self._reader),
+            ("POST", r"/agendamentos", self._add, self._writer),
+            ("PUT", r"/agendamentos/(\d+)", self._update, self._writer),
+            ("DELETE", r"/agendamentos/(\d+)", self._delete, self._writer),
+            ("PUT", r"/agendamentos/(\d+)/seguintes", self._update_following, self._writer),
+            ("DELETE", r"/agendamentos/(\d+)/seguintes", self._cancel_following, self._writer),
+            ("POST", r"/series/previa", self._series_preview, self._reader),
+            ("POST", r"/series", self._create_series, self._writer),
+            ("POST", r"/series/geracao", self._generate_series, self._writer),
+            ("GET", r"/alteracoes", self._changes, self._reader),
+            ("GET", r"/clientes", self._clients, self._reader),
+            ("GET", r"/servicos", self._services, self._reader),
+            ("POST", r"/servicos", self._save_service, self._writer),
+            ("PUT", r"/servicos/(\d+)", self._save_service, self._writer),
+            ("DELETE", r"/servicos/(\d+)", self._delete_service, self._writer),
+            ("GET", r"/horarios-livres", self._free_slots, self._reader),
+            ("GET", r"/resumos", self._summaries, self._reader),
+            ("POST", r"/importacao", self._import, self._writer),
+            ("GET", r"/exportacao", self._export, self._reader),
+        ]
+        self.routes = [(method, re.compile(pattern + r"\Z"), handler, executor)
+                       for method, pattern, handler, executor in self.routes]
+
+    # --- Handlers (rodam nos executores, nunca no loop) ---
+
+    def _status(self, match, query, body):
+        """Informa se já existem usuários cadastrados."""
+        return {"has_users": self.user_model.has_users()}
+
+    def _create_user(self, match, query, body):
+        """Cadastra o primeiro usuário (como a tela de cadastro; depois disso é recusado)."""
+        if self.user_model.has_users():
+            raise HttpError(403, "Já existe um usuário cadastrado.")
+        ok, message = self.user_model.create_user(str(body.get("username", "")), str(body.get("password", "")))
+        return {"ok": ok, "message": message}
+
+    def _login(self, match, query, body):
+        """Verifica usuário e senha; um hash refeito é gravado pela thread de escrita."""
+        valid, rehash = self.user_model.verify_credentials(str(body.get("username", "")),
+                                                           str(body.get("password", "")))
+        if rehash:
+            self._writer.submit(self.user_model.update_password_hash, *rehash).result()
+        return {"valid": valid}
+
+    def _page(self, match, query, body):
+        """Página keyset da listagem, com filtros e ordenação."""
+        sort = _sort_params(query)
+        cursor = _cursor_param(query, sort["ordenacao"])
+        direction = _str_param(query, "direction", "next")
+        if direction not in ("next", "previous"):
+            raise HttpError(400, "direction deve ser next ou previous.")
+        rows, has_more = self.agendamento_model.get_agendamentos_page(
+            cursor, direction, _limit_param(query, PAGE_SIZE, MAX_PAGE_LIMIT),
+            inicio=_int_param(query, "inicio"), fim=_int_param(query, "fim"),
+            servico=_str_param(query, "servico"), **sort)
+        return {"rows": rows, "has_more": has_more}
+
+    def _all(self, match, query, body):
+        """Agendamentos do período (relatório), com os arquivados se historico=1."""
+        return {"rows": self.agendamento_model.get_all_agendamentos(
+            historico=_str_param(query, "historico") == "1", inicio=_int_param(query, "inicio"),
+            fim=_int_param(query, "fim"), servico=_str_param(query, "servico"), **_sort_params(query))}
+
+    def _search(self, match, query, body):
+        """Busca por prefixo."""
+        return {"rows": self.agendamento_model.search_agendamentos(
+            _str_param(query, "termo", ""), _limit_param(query, SEARCH_LIMIT, SEARCH_LIMIT),
+            **_sort_params(query))}
+
+    def _get_one(self, match, query, body):
+        """Um agendamento pelo id."""
+        row = self.agendamento_model.get_agendamento_by_id(int(match.group(1)))
+        if row is None:
+            raise HttpError(404, "Agendamento não encontrado.")
+        return {"row": row}
+
+    def _add(self, match, query, body):
+        """Cria um agendamento se o horário estiver livre."""
+        row, conflitos = self.agendamento_model.save_if_available(None, *_agendamento_args(body))
+        return {"row": row, "conflitos": conflitos}
+
+    def _update(self, match, query, body):
+        """Atualiza um agendamento se o novo horário estiver livre."""
+        versao = _versao_param(body)
+        try:
+            row, conflitos = self.agendamento_model.save_if_available(int(match.group(1)), *_agendamento_args(body),
+                                                                      versao=versao)
+        except VersionConflictError as e:
+            raise HttpError(409, str(e), {"row": e.row}) from None
+        return {"row": row, "conflitos": conflitos}
+
+    def _delete(self, match, query, body):
+        """Remove um agendamento."""
+        return {"row": self.agendamento_model.delete_agendamento(int(match.group(1)))}
+
+    def _update_following(self, match, query, body):
+        """Aplica a edição a este agendamento e aos seguintes da mesma série."""
+        try:
+            rows, conflitos = self.serie_model.alterar_seguintes(int(match.group(1)), *_agendamento_args(body),
+                                                                 versao=_versao_param(body))
+        except VersionConflictError as e:
+            raise HttpError(409, str(e), {"row": e.row}) from None
+        return {"rows": rows, "conflitos": conflitos}
+
+    def _cancel_following(self, match, query, body):
+        """Remove este agendamento e os seguintes da mesma série."""
+        removidos = self.serie_model.cancelar_seguintes(int(match.group(1)))
+        if removidos is None:
+            raise HttpError(500, "Erro ao cancelar as ocorrências da série.")
+        return {"removidos": removidos}
+
+    def _series_preview(self, match, query, body):
+        """Datas e conflitos de uma série antes de gravá-la."""
+        data, duracao = body.get("data"), body.get("duracao", DURACAO_PADRAO)
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in (data, duracao)):
+            raise HttpError(400, "data e duracao devem ser inteiros.")
+        datas, conflitos = self.serie_model.prever_serie(data, duracao, *_recorrencia_args(body))
+        return {"datas": datas, "conflitos": conflitos}
+
+    def _create_series(self, match, query, body):
+        """Grava uma série, pulando as datas de `pular` (conflitos já aceitos pelo usuário)."""
+        pular = body.get("pular") or []
+        if not isinstance(pular, list) or not all(isinstance(value, int) for value in pular):
+            raise HttpError(400, "pular deve ser uma lista de inteiros.")
+        serie_id, criados, conflitos = self.serie_model.criar_serie(
+            *_agendamento_args(body), *_recorrencia_args(body), pular=pular)
+        return {"serie_id": serie_id, "criados": criados, "conflitos": conflitos}
+
+    def _generate_series(self, match, query, body):
+        """Grava as ocorrências das séries até a data `ate` (padrão: o horizonte do servidor)."""
+        ate = body.get("ate")
+        if ate is not None and not isinstance(ate, int):
+            raise HttpError(400, "ate deve ser inteiro.")
+        criados = self.serie_model.gerar_ocorrencias(ate)
+        if criados is None:
+            raise HttpError(500, "Erro ao gerar as ocorrências das séries.")
+        return {"criados": criados}
+
+    def _changes(self, match, query, body):
+        """Linhas alteradas e ids removidos depois da versão ?desde= (sem ela, só a versão atual)."""
+        desde = _int_param(query, "desde")
+        if desde is None:
+            return {"versao": self.agendamento_model.get_versao(), "rows": [], "removidos": []}
+        versao, rows, removidos = self.agendamento_model.get_alteracoes(desde)
+        return {"versao": versao, "rows": rows, "removidos": removidos}
+
+    def _clients(self, match, query, body):
+        """Todos os clientes, ou só os de ?ids= (lista JSON)."""
+        ids = _str_param(query, "ids")
+        if ids is None:
+            return {"clientes": self.cliente_model.get_all_clientes()}
+        try:
+            ids = [int(cliente_id) for cliente_id in json.loads(ids)]
+        except (ValueError, TypeError):
+            raise HttpError(400, "Parâmetro ids deve ser uma lista JSON de números.") from None
+        return {"clientes": self.cliente_model.get_clientes(ids)}
+
+    def _services(self, match, query, body):
+        """Catálogo de serviços."""
+        return {"servicos": self.servico_model.get_all_servicos()}
+
+    def _save_service(self, match, query, body):
+        """Cria (POST) ou altera (PUT) um serviço do catálogo."""
+        servico_id = int(match.group(1)) if match.groups() else None
+        ok, message = self.servico_model.save_servico(servico_id, *_servico_args(body))
+        return {"ok": ok, "message": message}
+
+    def _delete_service(self, match, query, body):
+        """Remove um serviço ainda não usado."""
+        ok, message = self.servico_model.delete_servico(int(match.group(1)))
+        return {"ok": ok, "message": message}
+
+    def _free_slots(self, match, query, body):
+        """Horários livres de um dia (AAAA-MM-DD)."""
+        try:
+            dia = date.fromisoformat(_str_param(query, "dia", ""))
+        except ValueError:
+            raise HttpError(400, "Parâmetro dia deve ser AAAA-MM-DD.") from None
+        return {"horarios": self.disponibilidade_model.get_horarios_livres(
+            dia, _int_param(query, "duracao", DURACAO_PADRAO))}
+
+    def _summaries(self, match, query, body):
+        """Totais por dia, mês, ano e serviço."""
+        return {"resumos": self.relatorio_model.get_todos_resumos(_int_param(query, "inicio"), _int_param(query, "fim"),
+                                                                  _str_param(query, "servico"))}
+
+    def _import(self, match, query, body):
+        """Importa o arquivo enviado no corpo (extensão dada por ?nome=)."""
+        suffix = os.path.splitext(_str_param(query, "nome", "importacao.csv"))[1] or ".csv"
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            try:
+                return import_agendamentos(path).to_dict()
+            except (OSError, ValueError) as e:
+                raise HttpError(400, f"Não foi possível ler o arquivo: {e}") from None
+        finally:
+            os.remove(path)
+
+    def _export(self, match, query, body):
+        """Exporta para um arquivo temporário, enviado em seguida ao cliente."""
+        fmt = _str_param(query, "formato", "csv")
+        if fmt not in EXPORT_FORMATS:
+            raise HttpError(400, f"Formato de exportação desconhecido: {fmt}")
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            count = export_agendamentos(path, fmt, _int_param(query, "inicio"), _int_param(query, "fim"),
+                                        _str_param(query, "servico"))
+        except BaseException:
+            os.remove(path)
+            raise
+        content_type = {"csv": "text/csv", "json": "application/json", "jsonl": "application/x-ndjson"}[fmt]
+        return FileResponse(path, f"{content_type}; charset=utf-8", {"X-Total-Linhas": str(count)})
+
+    # --- HTTP ---
+
+    def _route(self, method, path):
+        """Encontra (handler, executor, match) para o método e caminho (404/405 se não houver)."""
+        allowed = False
+        for route_method, pattern, handler, executor in self.routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, executor, match
+                allowed = True
+        raise HttpError(405 if allowed else 404, "Método não permitido." if allowed else "Rota não encontrada.")
+
+    async def _read_request(self, reader):
+        """Lê uma requisição; retorna (método, alvo, cabeçalhos, corpo) ou None se o cliente fechou."""
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not line.strip():
+            return None
+        try:
+            method, target, _version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Linha de requisição inválida.") from None
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "Content-Length inválido.") from None
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Corpo da requisição muito grande.")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, headers, body):
+        """Autentica, decodifica e executa a rota no executor certo."""
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            raise HttpError(401, "Token de acesso inválido.")
+        url = urlsplit(target)
+        handler, executor, match = self._route(method, url.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        if handler != self._import:
+            try:
+                body = json.loads(body) if body else {}
+            except ValueError:
+                raise HttpError(400, "JSON inválido.") from None
+            if not isinstance(body, dict):
+                raise HttpError(400, "O corpo deve ser um objeto JSON.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, handler, match, query, body)
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        """Envia uma resposta JSON (ou o arquivo de um FileResponse)."""
+        extra = {}
+        if isinstance(payload, FileResponse):
+            content_type, extra, length = payload.content_type, payload.headers, os.path.getsize(payload.path)
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type, length = "application/json; charset=utf-8", len(data)
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {length}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if isinstance(payload, FileResponse):
+            try:
+                with open(payload.path, "rb") as f:
+                    while chunk := f.read(STREAM_CHUNK_SIZE):
+                        writer.write(chunk)
+                        await writer.drain()
+            finally:
+                os.remove(payload.path)
+        else:
+            writer.write(data)
+        await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        """Atende as requisições de uma conexão (keep-alive) até o cliente fechar."""
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = 200, await self._dispatch(method, target, headers, body)
+                except HttpError as he:
+                    status, payload = he.status, {"erro": he.message, **he.extra}
+                    keep_alive = keep_alive and he.status not in (400, 413)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    print(f"Erro inesperado na API: {e!r}")
+                    status, payload = 500, {"erro": "Erro interno do servidor."}
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Abre a porta (com port=0, o sistema escolhe e self.port é atualizado)."""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Atende clientes até ser cancelado."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        """Fecha a porta, encerra os executores e as conexões do banco."""
+        if self._server is not None:
+            self._server.close()
+        self._writer.shutdown(wait=True)
+        self._reader.shutdown(wait=True)
+        close_pool()
+
+def main(argv=None):
+    """Ponto de entrada do serviço HTTP."""
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON de agendamentos para vários terminais.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Endereço de escuta (padrão: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Porta (padrão: {DEFAULT_PORT})")
+    parser.add_argument("--db", default=None, help="Arquivo do banco de dados (padrão: database.db)")
+    parser.add_argument("--token", default=os.environ.get("SALAO_API_TOKEN"),
+                        help="Token exigido no cabeçalho Authorization (padrão: $SALAO_API_TOKEN)")
+    args = parser.parse_args(argv)
+    if not args.token and not is_loopback(args.host):
+        parser.error(f"--token (ou $SALAO_API_TOKEN) é obrigatório ao escutar em {args.host}, fora da própria máquina.")
+    if args.db:
+        set_database(args.db)
+    setup_database()
+    server = ApiServer(args.host, args.port, args.token)
+    async def run():
+        await server.start()
+        print(f"API de agendamentos em http://{server.host}:{server.port}")
+        await server.serve_forever()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    print("Servidor encerrado.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,36 +1,208 @@
+import time
 import tkinter as tk
 from datetime import datetime
-from model.database import setup_database
-from model.agendamento import AgendamentoModel
+from model import codec, metricas
+from model.database import setup_database, check_startup, close_pool
+from model.worker import DatabaseWorker
+from model.agendamento import AgendamentoModel, DURACAO_PADRAO, VersionConflictError, sort_key
 from model.user_model import UserModel 
+from model.relatorio import RelatorioModel
+from model.disponibilidade import DisponibilidadeModel
+from model.historico import HistoricoModel, HORIZONTE_DIAS
+from model.cliente import ClienteModel, IndiceClientes
+from model.servico import ServicoModel, CatalogoServicos
+from model.serie import SerieModel, horizonte
+from controller.validation import (validate_agendamento, validate_recorrencia, validate_list_filters, validate_servico,
+                                   ValidationError)
 from view.login_view import LoginView
-from view.main_view import MainView
-from view.report_view import ReportView
-from view.registration_view import RegistrationView
+# As demais Views, o modo remoto (http.client) e importação/exportação são importados
+# só quando usados, para que a tela de login apareça o quanto antes
 
+WORKER_POLL_MS = 20 # Intervalo de verificação dos resultados do worker do banco
+CHANGE_POLL_MS = 2000 # Intervalo de verificação de alterações feitas por outros terminais
+ARCHIVE_START_MS = 5000 # Espera, após abrir a tela principal, antes de arquivar agendamentos antigos
+ARCHIVE_PAUSE_MS = 200 # Pausa entre lotes do arquivamento, para as ações da tela passarem na frente
+BACKUP_INTERVAL_HOURS = 24 # Idade do último backup a partir da qual um novo é feito automaticamente
+BACKUP_START_MS = 60_000 # Espera, após abrir a tela principal, antes da primeira verificação de backup
+BACKUP_CHECK_MS = 10 * 60_000 # Intervalo entre as verificações de backup vencido
+BACKUP_PROGRESS_MS = 250 # Intervalo de atualização do andamento do backup na tela
+# Métodos medidos pelas métricas: ações do usuário e callbacks que atualizam as Views
+MEASURED_PREFIXES = ("handle_", "load_", "show_", "_on_", "_validate", "_import_file")
+
+@metricas.instrumentar(MEASURED_PREFIXES)
 class AppController:
     """Controller principal da aplicação, gerenciando Models e Views."""
-    def __init__(self, master):
-        """Inicializa o Controller, Models e referências de Views."""
+    def __init__(self, master, api_url=None, api_token=None, metrics_path=None, startup_started=None,
+                 archive_days=HORIZONTE_DIAS, backup_hours=BACKUP_INTERVAL_HOURS, backup_dir=None):
+        """Inicializa o Controller, Models e referências de Views.
+
+        Com `api_url`, os Models falam com o serviço HTTP (controller.api_server)
+        em vez de abrir o banco local. No modo local, agendamentos com mais de
+        `archive_days` dias vão aos poucos para o histórico e, a cada `backup_hours`
+        horas, um backup é gravado em `backup_dir` (padrão: model.backup.BACKUP_DIR) por
+        uma thread própria (0 ou None desliga). Com `metrics_path`, as métricas são gravadas
+        nesse arquivo ao encerrar. Com `startup_started` (time.perf_counter() do início
+        do processo), imprime o tempo de cada fase até a primeira tela aparecer.
+        """
         self.master = master
-        self.agendamento_model = AgendamentoModel() 
-        self.user_model = UserModel()
+        self.metrics_path = metrics_path
+        self._startup_marks = [("início", startup_started)] if startup_started is not None else None
+        self.api_client = None
+        if api_url:
+            from model.remote import (ApiClient, RemoteAgendamentoModel, RemoteUserModel, RemoteRelatorioModel,
+                                      RemoteDisponibilidadeModel, RemoteClienteModel, RemoteServicoModel,
+                                      RemoteSerieModel)
+            self.api_client = ApiClient(api_url, api_token)
+        if self.api_client:
+            self.agendamento_model = RemoteAgendamentoModel(self.api_client)
+            self.user_model = RemoteUserModel(self.api_client)
+            self.relatorio_model = RemoteRelatorioModel(self.api_client)
+            self.disponibilidade_model = RemoteDisponibilidadeModel(self.api_client)
+            self.cliente_model = RemoteClienteModel(self.api_client)
+            self.servico_model = RemoteServicoModel(self.api_client)
+            self.serie_model = RemoteSerieModel(self.api_client)
+        else:
+            self.agendamento_model = AgendamentoModel() 
+            self.user_model = UserModel()
+            self.relatorio_model = RelatorioModel()
+            self.disponibilidade_model = DisponibilidadeModel()
+            self.cliente_model = ClienteModel()
+            self.servico_model = ServicoModel()
+            self.serie_model = SerieModel()
+        self.clientes = IndiceClientes() # Autocompletar de Nome/Telefone, sem consulta por tecla
+        self.servicos = CatalogoServicos() # Valor e duração padrão de cada serviço, sem consulta ao escolher
+        self._services_pending = False
+        self._services_stale = False # Catálogo editado durante a consulta em andamento
+        self._series_gerada_ate = None # Até onde (minutos) as ocorrências das séries já foram pedidas ao banco
+        # No modo remoto, o arquivamento fica a cargo da máquina do serviço (controller.archive)
+        self.historico_model = None if self.api_client else HistoricoModel()
+        self.archive_days = archive_days
+        self._archived = 0 # Agendamentos movidos para o histórico nesta sessão
+        self.backup_hours = None if self.api_client else backup_hours # No modo remoto: controller.backup
+        self.backup_dir = backup_dir
+        self.backup_worker = None # Worker separado: um backup não atrasa as consultas da tela
+        self._backup_progress = None # Fração copiada do backup em andamento (None: nenhum)
         self.login_view = None
         self.main_view = None
         self.report_view = None
         self.registration_view = None 
+        self.diagnostics_view = None
+        self.servicos_view = None
         self.selected_id = None
+        self.selected_versao = None # Versão da linha carregada no formulário (controle otimista)
+        self.selected_serie = None # Série do agendamento carregado no formulário (None: avulso)
+        self.list_filters = validate_list_filters({}) # Filtros da listagem já convertidos para o banco
+        self.list_sort = ("data", False) # (ordenação, decrescente) da MainView
+        self.report_sort = ("data", False) # (ordenação, decrescente) do relatório
+        self.report_range = (None, None) # (inicio, fim) do relatório; sem datas, só os agendamentos atuais
+        self.report_servico = None # Serviço filtrado no relatório (None: todos)
+        self.db_worker = DatabaseWorker()
+        self._polling_worker = False
+        self._write_pending = False
+        self._login_pending = False
+        self._seen_version = None # Última versão do contador de alterações já refletida na MainView
+        self._change_poll_pending = False
+
+    def _run_db(self, func, *args, on_success=None, on_error=None, quiet=False, **kwargs):
+        """Executa uma chamada de Model no worker do banco; o callback roda na thread do Tk.
+
+        Com `quiet`, não mostra o indicador de carregamento (consultas periódicas).
+        """
+        if metricas.ativo:
+            on_success, on_error = self._timed_callbacks(func, on_success, on_error or self._handle_worker_error)
+        self.db_worker.submit(func, *args, on_success=on_success,
+                              on_error=on_error or self._handle_worker_error, **kwargs)
+        if self.main_view and not quiet: self.main_view.set_loading(True)
+        if not self._polling_worker:
+            self._polling_worker = True
+            self.master.after(WORKER_POLL_MS, self._poll_db_worker)
+
+    def _timed_callbacks(self, func, on_success, on_error):
+        """Envolve os callbacks para medir a espera total (fila + banco) até a resposta chegar à UI."""
+        nome = f"worker:{getattr(func, '__qualname__', func)}"
+        inicio = time.perf_counter()
+        def timed(callback):
+            def wrapper(result):
+                metricas.registrar(nome, time.perf_counter() - inicio)
+                if callback: callback(result)
+            return wrapper
+        return timed(on_success), timed(on_error)
+
+    def _poll_db_worker(self):
+        """Entrega os resultados prontos do worker e reagenda enquanto houver trabalho."""
+        try:
+            self.db_worker.process_results()
+        finally:
+            if self.db_worker.pending:
+                self.master.after(WORKER_POLL_MS, self._poll_db_worker)
+            else:
+                self._polling_worker = False
+                if self.main_view: self.main_view.set_loading(False)
+
+    def _handle_worker_error(self, error):
+        """Trata exceções inesperadas ocorridas no worker do banco."""
+        self._write_pending = False
+        print(f"Erro inesperado ao acessar o banco de dados: {error!r}")
+        if self.main_view:
+            self.main_view.show_error("Erro", "Falha inesperada ao acessar o banco de dados.")
+
+    def shutdown(self):
+        """Encerra os workers (aguardando um backup em andamento), fecha o pool e grava as métricas pedidas."""
+        self.db_worker.shutdown()
+        if self.backup_worker:
+            self.backup_worker.shutdown()
+        close_pool()
+        if self.metrics_path:
+            try:
+                metricas.exportar(self.metrics_path)
+                print(f"Métricas gravadas em {self.metrics_path}.")
+            except OSError as e:
+                print(f"Não foi possível gravar as métricas: {e}")
+
+    def mark_startup(self, phase):
+        """Registra o fim de uma fase da inicialização (se o relatório foi pedido)."""
+        if self._startup_marks is not None:
+            self._startup_marks.append((phase, time.perf_counter()))
+
+    def _report_startup(self):
+        """Imprime o tempo de cada fase da inicialização e o total até a primeira tela."""
+        if self._startup_marks is None: return
+        marks, self._startup_marks = self._startup_marks, None
+        print("Tempo de inicialização:")
+        for (_, previous), (phase, moment) in zip(marks, marks[1:]):
+            print(f"  {phase:<28} {(moment - previous) * 1000:8.1f} ms")
+            if metricas.ativo: metricas.registrar(f"inicio:{phase}", moment - previous)
+        print(f"  {'total':<28} {(marks[-1][1] - marks[0][1]) * 1000:8.1f} ms")
 
     def start_app(self):
-        """Inicia a aplicação: configura DB e decide entre login ou registro."""
-        print("Iniciando setup do banco de dados...")
-        setup_database()
-        if not self.user_model.has_users():
+        """Inicia a aplicação: verifica o banco e decide entre login ou registro."""
+        self._run_db(self._setup_and_check_users, on_success=self._on_startup_checked)
+
+    def _setup_and_check_users(self):
+        """Executado no worker: verifica esquema e usuários; migra só se o esquema estiver desatualizado."""
+        if self.api_client is None:
+            current, has_users = check_startup()
+            if current:
+                return has_users
+            print("Iniciando setup do banco de dados...")
+            setup_database()
+        return self.user_model.has_users()
+
+    def _on_startup_checked(self, has_users):
+        """Decide entre a tela de cadastro e a de login após a verificação do banco."""
+        self.mark_startup("banco verificado")
+        if not has_users:
             print("Nenhum usuário. Mostrando tela de cadastro do administrador...")
+            from view.registration_view import RegistrationView
             self.registration_view = RegistrationView(self.master, self)
+            window = self.registration_view.window
         else:
             print("Usuários encontrados. Mostrando tela de login...")
             self.login_view = LoginView(self.master, self)
+            window = self.login_view.window
+        window.update_idletasks()
+        self.mark_startup("primeira tela desenhada")
+        self._report_startup()
 
     def handle_first_user_registration(self):
         """Processa o cadastro do primeiro usuário administrador."""
@@ -44,7 +216,14 @@ class AppController:
         if password != confirm_password:
             self.registration_view.show_error("Erro", "As senhas não coincidem.")
             return
-        success, message = self.user_model.create_user(username, password)
+        self._run_db(self.user_model.create_user, username, password,
+                     on_success=self._on_first_user_created)
+
+    def _on_first_user_created(self, result):
+        """Conclui o cadastro do primeiro usuário com o resultado do Model."""
+        success, message = result
+        if self.registration_view is None or not self.registration_view.window.winfo_exists():
+            return
         if success:
             self.registration_view.show_message("Sucesso", message)
             self.registration_view.destroy()
@@ -60,24 +239,373 @@ class AppController:
         if not username or not password_to_check:
             self.login_view.show_error("Login Inválido", "Usuário e senha são obrigatórios.")
             return
-        if self.user_model.check_credentials(username, password_to_check):
+        if self._login_pending: return
+        self._login_pending = True
+        self.login_view.set_busy(True)
+        self._run_db(self.user_model.check_credentials, username, password_to_check,
+                     on_success=self._on_credentials_checked, on_error=self._on_login_failed)
+
+    def _on_login_failed(self, error):
+        """Libera a tela de login após uma falha inesperada na verificação."""
+        self._login_pending = False
+        if self.login_view and self.login_view.window.winfo_exists():
+            self.login_view.set_busy(False)
+        self._handle_worker_error(error)
+
+    def _on_credentials_checked(self, valid):
+        """Abre a MainView ou informa a falha, conforme a verificação das credenciais."""
+        self._login_pending = False
+        if self.login_view is None or not self.login_view.window.winfo_exists():
+            return
+        if valid:
             self.login_view.destroy()
             self.show_main_view()
         else:
+            self.login_view.set_busy(False)
             self.login_view.show_error("Login Falhou", "Usuário ou senha incorretos.")
             
     def show_main_view(self):
         """Cria e exibe a MainView e carrega os dados iniciais."""
+        from view.main_view import MainView
         self.main_view = MainView(self.master, self)
+        self._apply_list_sort()
         self.main_view.show()
         self.load_data_to_main_view()
+        self._run_db(self.cliente_model.get_all_clientes, on_success=self.clientes.carregar, quiet=True)
+        self._load_services()
+        self.master.after(CHANGE_POLL_MS, self._poll_changes)
+        if self.historico_model and self.archive_days:
+            self.master.after(ARCHIVE_START_MS, self._archive_next_batch)
+        if self.backup_hours:
+            self.master.after(BACKUP_START_MS, self._backup_if_due)
 
     def load_data_to_main_view(self):
-        """Busca agendamentos do Model e atualiza a Treeview na MainView."""
-        data = self.agendamento_model.get_all_agendamentos()
-        self.main_view.populate_treeview(data)
+        """Busca a primeira página de agendamentos (com os filtros atuais) e atualiza a Treeview."""
+        termo = self.main_view.get_search_term()
+        if not termo:
+            try:
+                self.list_filters = validate_list_filters(self.main_view.get_list_filters())
+            except ValidationError as ve:
+                self.main_view.show_error(ve.title, ve.message)
+                return
+        self._generate_series(None if termo else self.list_filters["fim"])
+        # Lida antes da página (o worker é FIFO): alterações posteriores virão na próxima verificação
+        self._run_db(self.agendamento_model.get_versao, on_success=self._set_seen_version, quiet=True)
+        if termo: # Mantém a busca ativa ao recarregar
+            self._run_db(self.agendamento_model.search_agendamentos, termo,
+                         on_success=lambda rows: self._on_first_page_loaded((rows, False)),
+                         **self._sort_args(self.list_sort))
+            return
+        self._run_db(self.agendamento_model.get_agendamentos_page, None, "next",
+                     on_success=self._on_first_page_loaded, **self._page_filters())
+
+    def _generate_series(self, ate=None):
+        """Grava as ocorrências das séries até o horizonte (ou até `ate`, se for depois), antes da listagem.
+
+        Só pede ao banco quando o limite avança (o horizonte muda uma vez por dia);
+        as ocorrências além dele continuam só na regra da série.
+        """
+        ate = max(horizonte(), ate or 0)
+        if self._series_gerada_ate is not None and ate <= self._series_gerada_ate:
+            return
+        self._series_gerada_ate = ate
+        self._run_db(self.serie_model.gerar_ocorrencias, ate, quiet=True,
+                     on_success=self._on_series_generated, on_error=self._on_series_generation_failed)
+
+    def _on_series_generated(self, criados):
+        """Permite tentar de novo na próxima listagem se a geração falhou."""
+        if criados is None:
+            self._series_gerada_ate = None
+
+    def _on_series_generation_failed(self, error):
+        """Registra a falha sem interromper a listagem; a próxima tenta de novo."""
+        self._series_gerada_ate = None
+        print(f"Falha ao gerar as ocorrências das séries: {error!r}")
+
+    def _set_seen_version(self, versao):
+        """Registra a versão dos dados que a MainView acabou de (re)carregar."""
+        self._seen_version = versao
+
+    def _poll_changes(self):
+        """Verifica periodicamente se outro terminal alterou dados e aplica só o que mudou."""
+        if self.main_view is None or not self.master.winfo_exists():
+            return
+        self._request_changes()
+        self.master.after(CHANGE_POLL_MS, self._poll_changes)
+
+    def _request_changes(self):
+        """Busca as alterações posteriores à versão exibida, se não houver uma busca em andamento."""
+        if not self._change_poll_pending and self._seen_version is not None:
+            self._change_poll_pending = True
+            self._run_db(self.agendamento_model.get_alteracoes, self._seen_version,
+                         on_success=self._on_changes_loaded, on_error=self._on_changes_failed, quiet=True)
+
+    def _on_changes_loaded(self, result):
+        """Aplica na Treeview as remoções e depois as linhas alteradas desde a última verificação."""
+        self._change_poll_pending = False
+        versao, rows, removidos = result
+        if self._seen_version is None or versao <= self._seen_version:
+            return # nada mudou, ou a listagem foi recarregada enquanto a consulta rodava
+        self._seen_version = versao
+        self._refresh_clients(rows)
+        self._refresh_services(rows)
+        for agendamento_id in removidos:
+            self.main_view.remove_row(agendamento_id)
+        searching = bool(self.main_view.get_search_term())
+        for row in rows:
+            if not searching:
+                self._show_saved_row(row)
+            elif self.main_view.has_row(row[0]): # na busca, só atualiza linhas já exibidas
+                self.main_view.upsert_row(row)
+
+    def _refresh_clients(self, rows):
+        """Busca os clientes novos (ou que ganharam telefone/email) dos agendamentos gravados para o índice."""
+        ids = set()
+        for row in rows:
+            cliente = self.clientes.clientes.get(row[9])
+            if row[9] is not None and (cliente is None or (row[2] and not cliente[2]) or (row[3] and not cliente[3])):
+                ids.add(row[9])
+        if ids:
+            self._run_db(self.cliente_model.get_clientes, sorted(ids), quiet=True,
+                         on_success=lambda clientes: [self.clientes.atualizar(cliente) for cliente in clientes])
+
+    def handle_client_lookup(self, field, text):
+        """Sugere clientes cujo nome (ou telefone) começa com o texto digitado, consultando só a memória."""
+        if field == "Telefone":
+            suggestions = self.clientes.buscar_telefone(text)
+        else:
+            suggestions = self.clientes.buscar_nome(text)
+        self.main_view.show_client_suggestions(field, suggestions)
+
+    def handle_client_selected(self, cliente_id):
+        """Preenche nome, telefone e email do cliente escolhido nas sugestões."""
+        cliente = self.clientes.clientes.get(cliente_id)
+        if cliente:
+            _, nome, telefone, email = cliente
+            self.main_view.set_client_fields(nome, telefone or "", email or "")
+
+    def _load_services(self):
+        """Recarrega o catálogo de serviços em memória (uma consulta por vez)."""
+        if self._services_pending:
+            self._services_stale = True # a consulta em andamento pode não ver a última edição
+            return
+        self._services_pending = True
+        self._run_db(self.servico_model.get_all_servicos, on_success=self._on_services_loaded,
+                     on_error=self._on_services_failed, quiet=True)
+
+    def _on_services_loaded(self, servicos):
+        """Guarda o catálogo e atualiza a lista de serviços do formulário e da janela de serviços."""
+        self._services_pending = False
+        if self._services_stale:
+            self._services_stale = False
+            self._load_services()
+            return
+        self.servicos.carregar(servicos)
+        self.main_view.set_service_names(self.servicos.nomes())
+        if self.servicos_view is not None and self.servicos_view.window.winfo_exists():
+            self.servicos_view.populate([(servico_id, nome, codec.format_money(valor), duracao)
+                                         for servico_id, nome, valor, duracao in servicos])
+
+    def _on_services_failed(self, error):
+        """Registra a falha ao carregar o catálogo; ele é pedido de novo na próxima alteração."""
+        self._services_pending = False
+        self.servicos.invalidar()
+        print(f"Falha ao carregar os serviços: {error!r}")
+
+    def _refresh_services(self, rows):
+        """Recarrega o catálogo se algum agendamento gravado usa um serviço que ele não tem.
+
+        Um nome de serviço novo digitado no formulário (ou em outro terminal) é
+        incluído no catálogo pelos triggers do banco.
+        """
+        if not self.servicos.valido or any(row[10] is not None and row[10] not in self.servicos.servicos
+                                           for row in rows):
+            self.servicos.invalidar()
+            self._load_services()
+
+    def handle_service_selected(self, nome):
+        """Preenche valor e duração com os padrões do serviço escolhido, lidos do catálogo em memória."""
+        servico = self.servicos.buscar(nome)
+        if servico:
+            _, nome, valor, duracao = servico
+            self.main_view.set_service_defaults(nome, codec.format_money(valor), str(duracao))
+
+    def handle_show_services(self):
+        """Cria (ou traz para a frente) a janela do catálogo de serviços."""
+        if self.servicos_view is None or not self.servicos_view.window.winfo_exists():
+            from view.servicos_view import ServicosView
+            self.servicos_view = ServicosView(self.master, self)
+            self.servicos.invalidar()
+            self._load_services()
+        self.servicos_view.lift()
+
+    def handle_service_save(self, servico_id, form_data):
+        """Valida e grava um serviço do catálogo (novo se `servico_id` for None)."""
+        try:
+            data = validate_servico(form_data)
+        except ValidationError as ve:
+            self.servicos_view.show_error(ve.title, ve.message)
+            return
+        existente = self.servicos.buscar(data["Nome"])
+        if existente and existente[0] != servico_id:
+            self.servicos_view.show_error("Serviço Duplicado", f"Já existe o serviço {existente[1]}.")
+            return
+        self._run_db(self.servico_model.save_servico, servico_id, data["Nome"], data["Valor"], data["Duração"],
+                     on_success=self._on_service_changed)
+
+    def handle_service_delete(self, servico_id):
+        """Remove um serviço do catálogo."""
+        self._run_db(self.servico_model.delete_servico, servico_id, on_success=self._on_service_changed)
+
+    def _on_service_changed(self, result):
+        """Informa o resultado da edição do catálogo e descarta a cópia em memória."""
+        ok, message = result
+        if self.servicos_view is None or not self.servicos_view.window.winfo_exists():
+            return
+        if not ok:
+            self.servicos_view.show_error("Erro", message)
+            return
+        self.servicos.invalidar()
+        self._load_services()
+        self.servicos_view.clear_form()
+        self.servicos_view.show_message("Sucesso", message)
+
+    def _on_changes_failed(self, error):
+        """Registra a falha da verificação periódica sem interromper o usuário; tenta de novo depois."""
+        self._change_poll_pending = False
+        print(f"Falha ao verificar alterações: {error!r}")
+
+    def _archive_next_batch(self):
+        """Arquiva um lote de agendamentos antigos no worker; os lotes se alternam com as ações da tela."""
+        antes_de = codec.datetime_to_minutes(datetime.now()) - self.archive_days * codec.MINUTES_PER_DAY
+        self._run_db(self.historico_model.arquivar_lote, antes_de, on_success=self._on_archive_batch, quiet=True)
+
+    def _on_archive_batch(self, moved):
+        """Agenda o próximo lote enquanto houver o que arquivar."""
+        if moved:
+            self._archived += moved
+            self.master.after(ARCHIVE_PAUSE_MS, self._archive_next_batch)
+        elif self._archived:
+            print(f"{self._archived} agendamento(s) antigo(s) movido(s) para o histórico.")
+
+    def _backup_if_due(self):
+        """Inicia um backup em segundo plano se o último for mais antigo que o intervalo configurado."""
+        self.master.after(BACKUP_CHECK_MS, self._backup_if_due)
+        from model import backup
+        pasta = self.backup_dir or backup.BACKUP_DIR
+        if self._backup_progress is not None or not backup.backup_vencido(pasta, self.backup_hours * 3600):
+            return
+        self._backup_progress = 0.0
+        if self.backup_worker is None:
+            self.backup_worker = DatabaseWorker()
+        self.backup_worker.submit(backup.criar_backup, pasta, progresso=self._set_backup_progress,
+                                  on_success=self._on_backup_finished, on_error=self._on_backup_failed)
+        self.master.after(BACKUP_PROGRESS_MS, self._poll_backup)
+
+    def _set_backup_progress(self, fracao):
+        """Chamado pela thread do backup a cada passo da cópia; a tela lê o valor em _poll_backup."""
+        self._backup_progress = fracao
+
+    def _poll_backup(self):
+        """Mostra o andamento do backup e entrega o resultado quando ele termina."""
+        self.backup_worker.process_results()
+        if self.backup_worker.pending:
+            if self.main_view: self.main_view.set_backup_status(f"Backup: {self._backup_progress:.0%}")
+            self.master.after(BACKUP_PROGRESS_MS, self._poll_backup)
+
+    def _on_backup_finished(self, path):
+        """Registra o backup concluído."""
+        self._backup_progress = None
+        print(f"Backup gravado em {path}.")
+        if self.main_view: self.main_view.set_backup_status(f"Backup: {datetime.now():%H:%M}")
+
+    def _on_backup_failed(self, error):
+        """Registra a falha sem interromper o atendimento; a próxima verificação tenta de novo."""
+        self._backup_progress = None
+        print(f"Falha no backup automático: {error!r}")
+        if self.main_view: self.main_view.set_backup_status("Backup falhou")
+
+    def _page_filters(self):
+        """Argumentos de filtro e ordenação repassados a get_agendamentos_page."""
+        return {"inicio": self.list_filters["inicio"], "fim": self.list_filters["fim"],
+                "servico": self.list_filters["servico"], **self._sort_args(self.list_sort)}
+
+    def _sort_args(self, sort):
+        """Converte (ordenação, decrescente) nos argumentos aceitos pelo Model."""
+        ordenacao, descendente = sort
+        return {"ordenacao": ordenacao, "descendente": descendente}
+
+    def _next_sort(self, current, ordenacao):
+        """Nova ordenação após clicar num cabeçalho: a mesma coluna inverte o sentido."""
+        return (ordenacao, not current[1]) if current[0] == ordenacao else (ordenacao, False)
+
+    def _apply_list_sort(self):
+        """Informa à MainView a ordenação atual e a chave usada para posicionar linhas."""
+        ordenacao, descendente = self.list_sort
+        self.main_view.set_sort(ordenacao, descendente, lambda row: sort_key(row, ordenacao))
+
+    def handle_sort(self, ordenacao):
+        """Reordena a listagem pela coluna clicada, refazendo a consulta no banco."""
+        self.list_sort = self._next_sort(self.list_sort, ordenacao)
+        self._apply_list_sort()
+        self.load_data_to_main_view()
+
+    def _matches_list_filters(self, row):
+        """Indica se a linha pertence à listagem filtrada exibida (buscas mostram qualquer linha)."""
+        if self.main_view.get_search_term():
+            return True
+        inicio, fim, servico = self.list_filters["inicio"], self.list_filters["fim"], self.list_filters["servico"]
+        return ((inicio is None or row[4] >= inicio) and (fim is None or row[4] < fim)
+                and (not servico or row[6] == servico))
+
+    def _show_saved_row(self, row):
+        """Insere/atualiza a linha gravada na Treeview, ou a retira se saiu dos filtros."""
+        if self._matches_list_filters(row):
+            self.main_view.upsert_row(row)
+        else:
+            self.main_view.remove_row(row[0])
+
+    def handle_filter_change(self):
+        """Recarrega a listagem com o período e o serviço escolhidos na MainView."""
+        self.load_data_to_main_view()
+
+    def _on_first_page_loaded(self, result):
+        """Preenche a Treeview com a primeira página carregada pelo worker."""
+        data, has_more = result
+        self.main_view.populate_treeview(data, has_more)
+        self._reset_form_state()
+
+    def _reset_form_state(self):
+        """Limpa o formulário da MainView e descarta a seleção atual."""
         self.main_view.clear_form() 
         self.selected_id = None
+        self.selected_versao = None
+        self.selected_serie = None
+
+    def handle_load_page(self, direction, cursor):
+        """Carrega a página seguinte ou anterior ao cursor (chave de ordenação) pedida pela MainView."""
+        filters, sort = self.list_filters, self.list_sort
+        def on_page_loaded(result):
+            if filters is not self.list_filters or sort != self.list_sort:
+                return # filtros ou ordenação mudaram enquanto a página carregava
+            data, has_more = result
+            if direction == "previous":
+                self.main_view.prepend_page(data, has_more)
+            else:
+                self.main_view.append_page(data, has_more)
+        self._run_db(self.agendamento_model.get_agendamentos_page, cursor, direction,
+                     on_success=on_page_loaded, **self._page_filters())
+
+    def handle_search(self, termo):
+        """Mostra apenas os agendamentos que casam com o termo (vazio volta à lista paginada)."""
+        if not termo:
+            self.load_data_to_main_view()
+            return
+        def on_results(rows):
+            if self.main_view.get_search_term() == termo: # descarta respostas de buscas antigas
+                self.main_view.populate_treeview(rows)
+        self._run_db(self.agendamento_model.search_agendamentos, termo, on_success=on_results,
+                     **self._sort_args(self.list_sort))
 
     def handle_tree_select(self, event=None):
         """Lida com a seleção de um item na Treeview da MainView."""
@@ -91,13 +619,20 @@ class AppController:
     def handle_edit_selection(self):
         """Carrega dados do item selecionado para o formulário de edição."""
         if not self.selected_id: return
-        ag_data_tuple = self.agendamento_model.get_agendamento_by_id(self.selected_id)
+        self._run_db(self.agendamento_model.get_agendamento_by_id, self.selected_id,
+                     on_success=self._on_selection_loaded)
+
+    def _on_selection_loaded(self, ag_data_tuple):
+        """Preenche o formulário de edição com o agendamento carregado."""
         if ag_data_tuple:
             data_dict = {
                 "Nome": ag_data_tuple[1], "Telefone": ag_data_tuple[2], "Email": ag_data_tuple[3],
-                "Data": ag_data_tuple[4], "Valor": f"{ag_data_tuple[5]:.2f}", "Serviço": ag_data_tuple[6],
+                "Data": ag_data_tuple[4], "Valor": codec.format_money(ag_data_tuple[5]), "Serviço": ag_data_tuple[6],
+                "Duração": str(ag_data_tuple[7]),
             }
             self.main_view.set_form_data(data_dict)
+            self.selected_versao = ag_data_tuple[8]
+            self.selected_serie = ag_data_tuple[11]
             self.main_view.enable_save_button(True) 
             self.main_view.enable_edit_delete_buttons(False) 
         else:
@@ -106,37 +641,97 @@ class AppController:
 
     def _validate_and_get_data(self):
         """Valida dados do formulário e formata data/hora para o banco."""
-        form_data = self.main_view.get_form_data()
-        if not all(form_data.get(key) for key in ["Nome", "Serviço", "Data", "Horário"]):
-            self.main_view.show_error("Campos Obrigatórios", "Nome, Serviço, Data e Horário são obrigatórios.")
-            return None
         try:
-            form_data["Valor"] = float(form_data["Valor"]) if form_data["Valor"] else 0.0
-        except ValueError:
-            self.main_view.show_error("Valor Inválido", "Valor deve ser numérico (ex: 50.00).")
-            return None
-        try:
-            parsed_date = datetime.strptime(form_data["Data"], "%d/%m/%Y")
-            parsed_time = datetime.strptime(form_data["Horário"], "%H:%M")
-            combined_dt = datetime.combine(parsed_date.date(), parsed_time.time())
-            form_data["Data"] = combined_dt.strftime("%Y-%m-%d %H:%M:00")
-            if "Horário" in form_data: del form_data["Horário"]
-        except ValueError:
-            self.main_view.show_error("Data/Horário Inválido", "Use DD/MM/AAAA e HH:MM válidos.")
+            data = validate_agendamento(self.main_view.get_form_data())
+        except ValidationError as ve:
+            self.main_view.show_error(ve.title, ve.message)
             return None
-        return form_data
+        servico = self.servicos.buscar(data["Serviço"])
+        if servico: data["Serviço"] = servico[1] # grafia do catálogo, para não criar um serviço repetido
+        return data
 
     def handle_add_agendamento(self):
         """Processa a adição de um novo agendamento."""
+        if self._write_pending: return
         data_to_add = self._validate_and_get_data() 
         if data_to_add is None: return 
-        success = self.agendamento_model.add_agendamento(
-            data_to_add["Nome"], data_to_add["Telefone"], data_to_add["Email"],
-            data_to_add["Data"], data_to_add["Valor"], data_to_add["Serviço"] 
-        )
-        if success:
+        try:
+            recorrencia = validate_recorrencia(self.main_view.get_form_data(), data_to_add["Data"])
+        except ValidationError as ve:
+            self.main_view.show_error(ve.title, ve.message)
+            return
+        self._write_pending = True
+        if recorrencia:
+            self._run_db(self.serie_model.prever_serie, data_to_add["Data"], data_to_add["Duração"],
+                         recorrencia["frequencia"], recorrencia["ate"], recorrencia["vezes"],
+                         on_success=lambda result: self._on_series_previewed(data_to_add, recorrencia, result))
+            return
+        self._run_db(self.agendamento_model.save_if_available, None, *self._record_args(data_to_add),
+                     on_success=self._on_agendamento_added)
+
+    def _on_series_previewed(self, data, recorrencia, result):
+        """Mostra quantas ocorrências a série terá e quais horários ocupados serão pulados; grava se confirmado."""
+        self._write_pending = False
+        datas, conflitos = result
+        if not datas:
+            self.main_view.show_error("Repetição Inválida", "A repetição não gera nenhum agendamento.")
+            return
+        if len(conflitos) == len(datas):
+            self._show_conflicts([conflito for _, lista in conflitos for conflito in lista])
+            return
+        message = (f"Serão criados {len(datas) - len(conflitos)} agendamentos, "
+                   f"de {codec.format_date(datas[0])} a {codec.format_date(datas[-1])}.")
+        if conflitos:
+            message += "\n\nEstas datas estão ocupadas e serão puladas:\n" + "\n".join(
+                codec.format_datetime(ocorrencia) for ocorrencia, _ in conflitos[:10])
+            if len(conflitos) > 10:
+                message += f"\n(e mais {len(conflitos) - 10})"
+        if not self.main_view.ask_question("Confirmar Série", message + "\n\nConfirmar?"):
+            return
+        self._write_pending = True
+        self._run_db(self.serie_model.criar_serie, *self._record_args(data), recorrencia["frequencia"],
+                     recorrencia["ate"], recorrencia["vezes"], pular=[ocorrencia for ocorrencia, _ in conflitos],
+                     on_success=self._on_series_created)
+
+    def _on_series_created(self, result):
+        """Informa a série criada; as ocorrências gravadas chegam à listagem pela busca de alterações."""
+        self._write_pending = False
+        serie_id, criados, conflitos = result
+        if conflitos:
+            self._show_conflicts([conflito for _, lista in conflitos for conflito in lista])
+        elif serie_id is not None:
+            self.main_view.show_message("Sucesso", f"Série criada! {criados} agendamentos gravados; "
+                                                   "os demais serão gravados conforme as datas se aproximarem.")
+            self._reset_form_state()
+            self._request_changes()
+        else:
+            self.main_view.show_error("Erro", "Não foi possível criar a série.")
+
+    def _record_args(self, data):
+        """Campos validados na ordem aceita por save_if_available."""
+        return (data["Nome"], data["Telefone"], data["Email"], data["Data"],
+                data["Valor"], data["Serviço"], data["Duração"])
+
+    def _show_conflicts(self, conflitos):
+        """Informa os agendamentos que ocupam o horário pedido."""
+        lines = []
+        for _, nome, inicio, duracao in conflitos[:10]:
+            lines.append(f"{codec.format_datetime(inicio)} ({duracao} min) - {nome}")
+        self.main_view.show_error("Conflito de Horário",
+                                  "O horário já está ocupado por:\n" + "\n".join(lines))
+
+    def _on_agendamento_added(self, result):
+        """Insere na Treeview o agendamento recém-criado."""
+        self._write_pending = False
+        row, conflitos = result
+        if conflitos:
+            self._show_conflicts(conflitos)
+        elif row:
             self.main_view.show_message("Sucesso", "Agendamento adicionado!")
-            self.load_data_to_main_view()
+            self._show_saved_row(row)
+            self._refresh_clients([row])
+            self._refresh_services([row])
+            self._reset_form_state()
         else:
             self.main_view.show_error("Erro", "Não foi possível adicionar.")
 
@@ -145,44 +740,313 @@ class AppController:
         if not self.selected_id:
             self.main_view.show_error("Erro", "Nenhum agendamento selecionado.")
             return
+        if self._write_pending: return
         data_to_update = self._validate_and_get_data() 
         if data_to_update is None: return 
-        success = self.agendamento_model.update_agendamento(
-            self.selected_id, data_to_update["Nome"], data_to_update["Telefone"], 
-            data_to_update["Email"], data_to_update["Data"], 
-            data_to_update["Valor"], data_to_update["Serviço"] 
-        )
-        if success:
+        if self.selected_serie is not None:
+            seguintes = self.main_view.ask_series_scope(
+                "Série", "Este agendamento faz parte de uma série.\n\n"
+                         "Sim: alterar este e os seguintes\nNão: alterar só este")
+            if seguintes is None: return
+            if seguintes:
+                self._write_pending = True
+                self._run_db(self.serie_model.alterar_seguintes, self.selected_id,
+                             *self._record_args(data_to_update), versao=self.selected_versao,
+                             on_success=self._on_series_updated, on_error=self._on_update_failed)
+                return
+        self._write_pending = True
+        self._run_db(self.agendamento_model.save_if_available, self.selected_id,
+                     *self._record_args(data_to_update), versao=self.selected_versao,
+                     on_success=self._on_agendamento_updated, on_error=self._on_update_failed)
+
+    def _on_agendamento_updated(self, result):
+        """Atualiza na Treeview o agendamento editado."""
+        self._write_pending = False
+        row, conflitos = result
+        if conflitos:
+            self._show_conflicts(conflitos)
+        elif row:
             self.main_view.show_message("Sucesso", "Agendamento atualizado!")
-            self.load_data_to_main_view()
+            self._show_saved_row(row)
+            self._refresh_clients([row])
+            self._refresh_services([row])
+            self._reset_form_state()
+        else:
+            self.main_view.show_error("Erro", "Não foi possível atualizar.")
+
+    def _on_series_updated(self, result):
+        """Atualiza na Treeview as ocorrências alteradas da série."""
+        self._write_pending = False
+        rows, conflitos = result
+        if conflitos:
+            self._show_conflicts(conflitos)
+        elif rows:
+            self.main_view.show_message("Sucesso", f"{len(rows)} agendamentos atualizados!")
+            for row in rows:
+                self._show_saved_row(row)
+            self._refresh_clients(rows)
+            self._refresh_services(rows)
+            self._reset_form_state()
         else:
             self.main_view.show_error("Erro", "Não foi possível atualizar.")
 
+    def _on_update_failed(self, error):
+        """Recarrega o agendamento no formulário se outro terminal o alterou antes de salvar."""
+        if not isinstance(error, VersionConflictError):
+            self._handle_worker_error(error)
+            return
+        self._write_pending = False
+        self.main_view.show_error("Alterado em Outro Terminal",
+                                  "Este agendamento foi alterado em outro terminal. "
+                                  "Os dados atuais foram carregados; revise e salve novamente.")
+        if error.row:
+            self._show_saved_row(error.row)
+            self._on_selection_loaded(error.row)
+
     def handle_delete_agendamento(self):
         """Processa a remoção de um agendamento."""
         if not self.selected_id:
             self.main_view.show_error("Erro", "Nenhum agendamento selecionado.")
             return
-        if self.main_view.ask_question("Confirmar", "Remover este agendamento?"):
-            success = self.agendamento_model.delete_agendamento(self.selected_id)
-            if success:
-                self.main_view.show_message("Sucesso", "Agendamento removido!")
-                self.load_data_to_main_view()
-            else:
-                self.main_view.show_error("Erro", "Não foi possível remover.")
+        if self._write_pending: return
+        self._write_pending = True # até a confirmação: a linha é lida antes, para saber se é de uma série
+        self._run_db(self.agendamento_model.get_agendamento_by_id, self.selected_id,
+                     on_success=self._on_delete_target_loaded)
+
+    def _on_delete_target_loaded(self, row):
+        """Confirma a remoção; numa série, pergunta se as ocorrências seguintes também saem."""
+        self._write_pending = False
+        if not row:
+            self.main_view.show_error("Erro", "Agendamento não encontrado.")
+            self.main_view.remove_row(self.selected_id)
+            self._reset_form_state()
+            return
+        if row[11] is not None:
+            seguintes = self.main_view.ask_series_scope(
+                "Remover", "Este agendamento faz parte de uma série.\n\n"
+                           "Sim: remover este e os seguintes (encerra a série)\nNão: remover só este")
+            if seguintes is None: return
+            if seguintes:
+                self._write_pending = True
+                self._run_db(self.serie_model.cancelar_seguintes, row[0], on_success=self._on_series_cancelled)
+                return
+        elif not self.main_view.ask_question("Confirmar", "Remover este agendamento?"):
+            return
+        self._write_pending = True
+        self._run_db(self.agendamento_model.delete_agendamento, row[0], on_success=self._on_agendamento_deleted)
+
+    def _on_series_cancelled(self, removidos):
+        """Retira da Treeview as ocorrências removidas da série."""
+        self._write_pending = False
+        if removidos:
+            self.main_view.show_message("Sucesso", f"{len(removidos)} agendamentos removidos!")
+            for agendamento_id in removidos:
+                self.main_view.remove_row(agendamento_id)
+            self._reset_form_state()
+        else:
+            self.main_view.show_error("Erro", "Não foi possível remover.")
+
+    def _on_agendamento_deleted(self, row):
+        """Retira da Treeview o agendamento removido."""
+        self._write_pending = False
+        if row:
+            self.main_view.show_message("Sucesso", "Agendamento removido!")
+            self.main_view.remove_row(row[0])
+            self._reset_form_state()
+        else:
+            self.main_view.show_error("Erro", "Não foi possível remover.")
+
+    def _report_args(self):
+        """Ordenação e filtros do relatório; o histórico só é consultado quando há um período."""
+        inicio, fim = self.report_range
+        return dict(self._sort_args(self.report_sort), historico=self.report_range != (None, None),
+                    inicio=inicio, fim=fim, servico=self.report_servico)
 
     def handle_show_report(self):
-        """Cria e exibe a janela de relatório com todos os agendamentos."""
+        """Cria e exibe a janela de relatório com os agendamentos atuais (sem os arquivados)."""
+        self.report_range, self.report_servico = (None, None), None
+        self._run_db(self.agendamento_model.get_all_agendamentos,
+                     on_success=self._on_report_data_loaded, **self._report_args())
+
+    def _reload_report(self):
+        """Refaz a consulta do relatório com a ordenação e os filtros atuais."""
+        def on_loaded(data):
+            if self.report_view and self.report_view.window.winfo_exists():
+                self.report_view.set_sort(*self.report_sort)
+                self.report_view.populate_report(data)
+        self._run_db(self.agendamento_model.get_all_agendamentos, on_success=on_loaded, **self._report_args())
+
+    def _load_report_aggregates(self):
+        """Carrega os totais das abas agregadas com o mesmo período e serviço da listagem."""
+        inicio, fim = self.report_range
+        self._run_db(self.relatorio_model.get_todos_resumos, inicio, fim, self.report_servico,
+                     on_success=self._on_report_aggregates_loaded)
+
+    def handle_report_sort(self, ordenacao):
+        """Reordena o relatório pela coluna clicada, refazendo a consulta no banco."""
+        self.report_sort = self._next_sort(self.report_sort, ordenacao)
+        self._reload_report()
+
+    def handle_report_filter(self, filters):
+        """Restringe o relatório ao período e ao serviço digitados.
+
+        Datas arquivadas entram só se o período as alcança; as abas de totais seguem os mesmos filtros.
+        """
+        from controller.export import parse_date_range
+        try:
+            self.report_range = parse_date_range(filters.get("Inicio"), filters.get("Fim"))
+        except ValueError:
+            self.report_view.show_error("Data Inválida", "Use DD/MM/AAAA nas datas do período.")
+            return
+        self.report_servico = filters.get("Serviço") or None
+        self.report_view.set_period(self._report_period_text(filters))
+        self._reload_report()
+        self._load_report_aggregates()
+
+    def _report_period_text(self, filters=None):
+        """Descrição dos filtros em uso, exibida acima das abas do relatório."""
+        filters = filters or {}
+        inicio, fim = filters.get("Inicio"), filters.get("Fim")
+        if inicio and fim:
+            texto = f"De {inicio} a {fim}"
+        elif inicio or fim:
+            texto = f"A partir de {inicio}" if inicio else f"Até {fim}"
+        else:
+            texto = "Agendamentos atuais; totais de todo o período"
+        return f"{texto} — serviço: {self.report_servico}" if self.report_servico else texto
+
+    def _on_report_data_loaded(self, data):
+        """Abre (ou reaproveita) a janela de relatório com os dados carregados."""
         if self.report_view is None or not self.report_view.window.winfo_exists():
+            from view.report_view import ReportView
             self.report_view = ReportView(self.master, self)
-        data = self.agendamento_model.get_all_agendamentos()
+        self.report_view.set_sort(*self.report_sort)
+        self.report_view.set_period(self._report_period_text())
         self.report_view.populate_report(data)
         self.report_view.show()
         self.report_view.window.lift() 
+        self._load_report_aggregates()
+
+    def _on_report_aggregates_loaded(self, resumos):
+        """Preenche as abas de totais por dia, mês, ano e serviço do relatório."""
+        if self.report_view and self.report_view.window.winfo_exists():
+            self.report_view.populate_aggregates(resumos)
+
+    def handle_show_free_slots(self):
+        """Lista os horários livres do dia informado no formulário."""
+        form_data = self.main_view.get_form_data()
+        try:
+            dia = codec.minutes_to_datetime(codec.parse_form_date(form_data["Data"])).date()
+            duracao = int(form_data["Duração"]) if form_data["Duração"] else DURACAO_PADRAO
+        except ValueError:
+            self.main_view.show_error("Data Inválida", "Informe a data (DD/MM/AAAA) e a duração para ver os horários livres.")
+            return
+        def on_slots_loaded(livres):
+            horarios = ", ".join(codec.format_time(inicio) for inicio in livres) or "nenhum"
+            self.main_view.show_message("Horários Livres",
+                                        f"{form_data['Data']} ({duracao} min): {horarios}")
+        self._run_db(self.disponibilidade_model.get_horarios_livres, dia, duracao,
+                     on_success=on_slots_loaded)
+
+    def handle_import_file(self, path):
+        """Importa agendamentos de um arquivo CSV/JSON no worker do banco."""
+        if self._write_pending: return
+        self._write_pending = True
+        self._run_db(self._import_file, path, on_success=self._on_import_finished,
+                     on_error=self._on_import_failed)
+
+    def _import_file(self, path):
+        """Executado no worker: importa localmente ou enviando o arquivo ao servidor."""
+        from controller.bulk_import import import_agendamentos, ImportResult
+        if self.api_client:
+            return ImportResult.from_dict(self.api_client.import_file(path))
+        return import_agendamentos(path)
+
+    def _on_import_finished(self, result):
+        """Informa o resultado da importação e recarrega a lista."""
+        self._write_pending = False
+        message = result.summary()
+        if result.errors:
+            details = "\n".join(f"Linha {line}: {msg}" for line, msg in result.errors[:10])
+            message += f"\n\n{details}"
+            if len(result.errors) > 10: message += "\n..."
+        if result.aborted:
+            self.main_view.show_error("Importação", message)
+        else:
+            self.main_view.show_message("Importação", message)
+            self.load_data_to_main_view()
+
+    def _on_import_failed(self, error):
+        """Informa que o arquivo de importação não pôde ser lido."""
+        self._write_pending = False
+        self.main_view.show_error("Importação", f"Não foi possível ler o arquivo: {error}")
+
+    def handle_export_report(self, path, filters):
+        """Exporta os agendamentos filtrados para um arquivo, no worker do banco."""
+        from controller.export import export_agendamentos, parse_date_range
+        try:
+            inicio, fim = parse_date_range(filters.get("Inicio"), filters.get("Fim"))
+        except ValueError:
+            self.report_view.show_error("Data Inválida", "Use DD/MM/AAAA nas datas de exportação.")
+            return
+        def on_exported(count):
+            if self.report_view and self.report_view.window.winfo_exists():
+                self.report_view.show_message("Exportação", f"{count} agendamento(s) exportado(s).")
+        def on_export_failed(error):
+            if self.report_view and self.report_view.window.winfo_exists():
+                self.report_view.show_error("Exportação", f"Não foi possível exportar: {error}")
+        export = self.api_client.export_file if self.api_client else export_agendamentos
+        self._run_db(export, path, None, inicio, fim, filters.get("Serviço") or None,
+                     on_success=on_exported, on_error=on_export_failed)
+
+    def handle_show_diagnostics(self):
+        """Abre (ou traz para a frente) a janela de diagnóstico de desempenho."""
+        if self.diagnostics_view is None or not self.diagnostics_view.window.winfo_exists():
+            from view.diagnostics_view import DiagnosticsView
+            self.diagnostics_view = DiagnosticsView(self.master, self)
+            self.handle_diagnostics_refresh()
+        self.diagnostics_view.lift()
+
+    def handle_diagnostics_refresh(self):
+        """Atualiza a janela de diagnóstico com as medidas atuais e agenda a próxima atualização."""
+        if self.diagnostics_view is None or not self.diagnostics_view.window.winfo_exists():
+            return
+        self.diagnostics_view.populate(metricas.ativo, metricas.limite_lento_ms, metricas.resumo(), metricas.lentas())
+        self.diagnostics_view.schedule_refresh()
+
+    def handle_diagnostics_toggle(self, active):
+        """Liga (com o limite de lentas digitado) ou desliga a coleta de métricas."""
+        if active:
+            try:
+                limite = float(self.diagnostics_view.get_threshold().replace(",", "."))
+                if limite < 0: raise ValueError
+            except ValueError:
+                self.diagnostics_view.show_error("Limite Inválido", "Informe o limite em milissegundos (ex: 100).")
+                limite = metricas.limite_lento_ms
+            metricas.ativar(limite)
+        else:
+            metricas.desativar()
+        self.diagnostics_view.populate(metricas.ativo, metricas.limite_lento_ms, metricas.resumo(), metricas.lentas())
+
+    def handle_diagnostics_reset(self):
+        """Descarta as medidas coletadas."""
+        metricas.zerar()
+        self.diagnostics_view.populate(metricas.ativo, metricas.limite_lento_ms, metricas.resumo(), metricas.lentas())
+
+    def handle_diagnostics_export(self, path):
+        """Grava as medidas e o log de lentas em JSON."""
+        try:
+            metricas.exportar(path)
+        except OSError as e:
+            self.diagnostics_view.show_error("Erro", f"Não foi possível salvar: {e}")
+            return
+        self.diagnostics_view.show_message("Métricas", f"Métricas gravadas em {path}.")
 
     def handle_clear_form_request(self):
         """Lida com a solicitação da View para limpar o formulário e resetar estado."""
         self.selected_id = None
+        self.selected_versao = None
+        self.selected_serie = None
         if self.main_view: 
             self.main_view.enable_save_button(False)
             self.main_view.enable_edit_delete_buttons(False)
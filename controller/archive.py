@@ -0,0 +1,40 @@
+import argparse
+from datetime import datetime
+from model import codec
+from model.database import set_database, setup_database, historico_path, DATABASE_NAME
+from model.historico import HistoricoModel, HORIZONTE_DIAS, LOTE_ARQUIVAMENTO
+
+def archive_older_than(dias=HORIZONTE_DIAS, lote=LOTE_ARQUIVAMENTO, model=None):
+    """Move para o histórico, lote a lote, os agendamentos com mais de `dias` dias.
+
+    Retorna a quantidade movida, ou None se algum lote falhar (os já movidos ficam no histórico).
+    """
+    model = model or HistoricoModel()
+    antes_de = codec.datetime_to_minutes(datetime.now()) - dias * codec.MINUTES_PER_DAY
+    total = 0
+    while moved := model.arquivar_lote(antes_de, lote):
+        total += moved
+    return None if moved is None else total
+
+def main(argv=None):
+    """Ponto de entrada do arquivamento sem interface gráfica."""
+    parser = argparse.ArgumentParser(description="Move agendamentos antigos para o banco de histórico.")
+    parser.add_argument("--dias", type=int, default=HORIZONTE_DIAS,
+                        help=f"Arquiva agendamentos com mais de DIAS dias (padrão: {HORIZONTE_DIAS})")
+    parser.add_argument("--lote", type=int, default=LOTE_ARQUIVAMENTO, help="Linhas movidas por transação")
+    parser.add_argument("--db", default=None, help="Arquivo do banco de dados (padrão: database.db)")
+    args = parser.parse_args(argv)
+    if args.db:
+        set_database(args.db)
+    setup_database()
+    total = archive_older_than(args.dias, args.lote)
+    if total is None:
+        print("O arquivamento foi interrompido por um erro; rode de novo para continuar.")
+        return 1
+    ativos, arquivados = HistoricoModel().contar()
+    print(f"{total} agendamento(s) movido(s) para {historico_path(args.db or DATABASE_NAME)}. "
+          f"Principal: {ativos}; histórico: {arquivados}.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
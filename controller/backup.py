@@ -0,0 +1,56 @@
+import argparse
+import os
+import sqlite3
+from model.backup import (criar_backup, listar_backups, verificar_backup, restaurar_backup, BackupError,
+                          BACKUP_DIR, MANTER_BACKUPS)
+from model.database import set_database, setup_database, close_pool, DATABASE_NAME
+
+def _print_progress(fracao):
+    """Mostra o andamento da cópia na mesma linha do terminal."""
+    print(f"\rCopiando... {fracao:4.0%}", end="", flush=True)
+
+def main(argv=None):
+    """Ponto de entrada dos backups sem interface gráfica."""
+    parser = argparse.ArgumentParser(description="Cria, lista, verifica e restaura backups do banco de dados.")
+    parser.add_argument("acao", choices=("criar", "listar", "verificar", "restaurar"))
+    parser.add_argument("arquivo", nargs="?", help="Backup a verificar ou restaurar (padrão: o mais recente)")
+    parser.add_argument("--pasta", default=BACKUP_DIR, help=f"Pasta dos backups (padrão: {BACKUP_DIR})")
+    parser.add_argument("--manter", type=int, default=MANTER_BACKUPS, help="Backups mantidos na pasta")
+    parser.add_argument("--db", default=None, help="Arquivo do banco de dados (padrão: database.db)")
+    args = parser.parse_args(argv)
+    if args.db:
+        set_database(args.db)
+    backups = listar_backups(args.pasta)
+    if args.acao == "listar":
+        for caminho in backups:
+            print(f"{caminho}  ({os.path.getsize(caminho) / 1024 / 1024:.1f} MiB)")
+        if not backups: print(f"Nenhum backup em {args.pasta}.")
+        return 0
+    try:
+        if args.acao == "criar":
+            caminho = criar_backup(args.pasta, args.manter, _print_progress)
+            print(f"\nBackup gravado em {caminho}.")
+            return 0
+        caminho = args.arquivo or (backups[0] if backups else None)
+        if caminho is None:
+            print(f"Nenhum backup em {args.pasta}.")
+            return 1
+        resultados = verificar_backup(caminho)
+        for nome, resultado in resultados.items():
+            print(f"{caminho} [{nome}]: {resultado}")
+        integro = all(r == "ok" for r in resultados.values())
+        if args.acao == "verificar" or not integro: # um backup corrompido nunca é restaurado
+            return 0 if integro else 1
+        if os.path.exists(args.db or DATABASE_NAME): # o estado atual também pode ser recuperado depois
+            print(f"\nEstado atual salvo em {criar_backup(args.pasta, args.manter + 1, _print_progress)}.")
+        close_pool()
+        restaurar_backup(caminho, verificar=False) # já verificado acima
+    except (BackupError, OSError, sqlite3.Error) as e:
+        print(f"\nFalha: {e}")
+        return 1
+    setup_database() # um backup de versão anterior recebe as migrações pendentes
+    print(f"Banco restaurado de {caminho}.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
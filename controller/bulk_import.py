@@ -0,0 +1,179 @@
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import unicodedata
+from model.database import get_connection, set_database, setup_database
+from model.agendamento import AgendamentoModel
+from controller.validation import validate_agendamento, ValidationError
+
+BATCH_SIZE = 5000 # Linhas por chamada de executemany
+
+# Nomes de coluna aceitos no arquivo (sem acentos, minúsculos) -> campo do formulário
+FIELD_ALIASES = {
+    "nome": "Nome", "cliente": "Nome",
+    "telefone": "Telefone", "fone": "Telefone",
+    "email": "Email", "e-mail": "Email",
+    "data": "Data",
+    "horario": "Horário", "hora": "Horário",
+    "valor": "Valor", "valor_servico": "Valor",
+    "servico": "Serviço",
+    "duracao": "Duração", "duracao (min)": "Duração",
+}
+
+class ImportResult:
+    """Resumo de uma importação: linhas inseridas, duplicadas e erros por linha."""
+    def __init__(self):
+        """Inicializa os contadores zerados."""
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors = [] # (número da linha/registro, mensagem)
+        self.aborted = False
+
+    def to_dict(self):
+        """Representação em JSON, usada pela API HTTP."""
+        return {"inserted": self.inserted, "duplicates": self.duplicates,
+                "errors": self.errors, "aborted": self.aborted}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstrói o resultado a partir de to_dict()."""
+        result = cls()
+        result.inserted, result.duplicates = data["inserted"], data["duplicates"]
+        result.errors = [tuple(error) for error in data["errors"]]
+        result.aborted = data["aborted"]
+        return result
+
+    def summary(self):
+        """Retorna um texto curto com o resultado da importação."""
+        if self.aborted:
+            return "Importação cancelada por erro no banco; nenhuma linha foi gravada."
+        return (f"{self.inserted} agendamento(s) importado(s), {self.duplicates} duplicado(s) "
+                f"ignorado(s), {len(self.errors)} linha(s) com erro.")
+
+def _normalize_key(key):
+    """Normaliza o nome de uma coluna para consulta em FIELD_ALIASES."""
+    key = unicodedata.normalize("NFKD", (key or "").strip().lower())
+    return "".join(ch for ch in key if not unicodedata.combining(ch))
+
+def _to_form_data(record):
+    """Converte um registro do arquivo para o dicionário no formato do formulário."""
+    form_data = {"Nome": "", "Telefone": "", "Email": "", "Data": "", "Horário": "", "Duração": "", "Valor": "", "Serviço": ""}
+    for key, value in record.items():
+        field = FIELD_ALIASES.get(_normalize_key(key))
+        if field:
+            form_data[field] = str(value).strip() if value is not None else ""
+    if not form_data["Horário"] and " " in form_data["Data"]: # "DD/MM/AAAA HH:MM" numa só coluna
+        form_data["Data"], form_data["Horário"] = form_data["Data"].split(" ", 1)
+    return form_data
+
+def dedup_hash(nome, data, servico):
+    """Hash compacto de (nome, data, servico) usado para detectar agendamentos repetidos."""
+    key = "\x1f".join((nome.strip().casefold(), str(data), servico.strip().casefold()))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+def iter_records(path):
+    """Gera (número da linha, registro) a partir de um CSV, JSON Lines ou array JSON.
+
+    Linhas JSON que não puderem ser lidas geram o registro None.
+    """
+    lower_path = path.lower()
+    if lower_path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.DictReader(f, dialect=dialect)
+            for record in reader:
+                yield reader.line_num, record
+    elif lower_path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+    elif lower_path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            for index, record in enumerate(json.load(f), start=1):
+                yield index, record
+    else:
+        raise ValueError("Formato não suportado; use .csv, .json ou .jsonl.")
+
+def import_agendamentos(path, model=None, batch_size=BATCH_SIZE):
+    """Importa agendamentos de um arquivo em uma única transação.
+
+    Cada registro passa pela mesma validação do formulário; registros inválidos
+    ou duplicados (mesmo nome, data e serviço) são contabilizados e ignorados sem
+    interromper a importação. Um erro do banco desfaz a importação inteira.
+    """
+    model = model or AgendamentoModel()
+    result = ImportResult()
+    batch = []
+    try:
+        # BEGIN IMMEDIATE: nenhum outro terminal grava entre a leitura das chaves e os inserts
+        with get_connection(immediate=True):
+            seen = {dedup_hash(*key) for key in model.iter_dedup_keys()}
+            for line_number, record in iter_records(path):
+                if not isinstance(record, dict):
+                    result.errors.append((line_number, "Registro inválido."))
+                    continue
+                try:
+                    data = validate_agendamento(_to_form_data(record))
+                except ValidationError as ve:
+                    result.errors.append((line_number, ve.message))
+                    continue
+                key = dedup_hash(data["Nome"], data["Data"], data["Serviço"])
+                if key in seen:
+                    result.duplicates += 1
+                    continue
+                seen.add(key)
+                batch.append((data["Nome"], data["Telefone"], data["Email"],
+                              data["Data"], data["Valor"], data["Serviço"], data["Duração"]))
+                if len(batch) >= batch_size:
+                    _flush(model, batch, result)
+            if batch:
+                _flush(model, batch, result)
+    except sqlite3.Error as e:
+        print(f"Erro SQLite durante a importação: {e}")
+        result.aborted = True
+    if result.aborted:
+        result.inserted = 0
+    return result
+
+def _flush(model, batch, result):
+    """Grava um lote pendente; aborta a transação se o banco recusar."""
+    count = model.add_many_agendamentos(batch)
+    if count is None:
+        result.aborted = True
+        raise sqlite3.DatabaseError("Falha ao gravar lote de agendamentos.")
+    result.inserted += count
+    batch.clear()
+
+def main(argv=None):
+    """Ponto de entrada da importação sem interface gráfica."""
+    parser = argparse.ArgumentParser(description="Importa agendamentos de arquivos CSV/JSON.")
+    parser.add_argument("arquivo", help="Arquivo .csv, .json ou .jsonl a importar")
+    parser.add_argument("--db", default=None, help="Arquivo do banco de dados (padrão: database.db)")
+    args = parser.parse_args(argv)
+    if args.db:
+        set_database(args.db)
+    setup_database()
+    try:
+        result = import_agendamentos(args.arquivo)
+    except (OSError, ValueError) as e:
+        print(f"Não foi possível ler o arquivo: {e}")
+        return 1
+    for line_number, message in result.errors:
+        print(f"Linha {line_number}: {message}")
+    print(result.summary())
+    return 1 if result.aborted else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
@@ -0,0 +1,94 @@
+import argparse
+import csv
+import json
+from model import codec
+from model.database import set_database, setup_database
+from model.agendamento import AgendamentoModel
+
+# Mesmos nomes aceitos por controller.bulk_import, para que o arquivo possa ser reimportado
+EXPORT_COLUMNS = ("id", "nome", "telefone", "email", "data", "valor", "servico", "duracao")
+EXPORT_FORMATS = ("csv", "json", "jsonl")
+
+def parse_date_range(inicio=None, fim=None):
+    """Converte datas DD/MM/AAAA (fim inclusivo) para o intervalo [inicio, fim) em minutos.
+
+    Levanta ValueError se alguma data for inválida.
+    """
+    db_inicio = db_fim = None
+    if inicio:
+        db_inicio = codec.parse_form_date(inicio)
+    if fim:
+        db_fim = codec.parse_form_date(fim) + codec.MINUTES_PER_DAY
+    return db_inicio, db_fim
+
+def export_format(path):
+    """Formato de exportação correspondente à extensão do arquivo (CSV se não for .json nem .jsonl)."""
+    lower_path = path.lower()
+    if lower_path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "json" if lower_path.endswith(".json") else "csv"
+
+def _export_row(row):
+    """Converte uma linha do banco para os textos gravados no arquivo."""
+    agendamento_id, nome, telefone, email, data, valor_centavos, servico, duracao = row[:8]
+    return (agendamento_id, nome, telefone, email, codec.format_datetime(data),
+            codec.format_money(valor_centavos), servico, duracao)
+
+def export_agendamentos(path, fmt=None, inicio=None, fim=None, servico=None, model=None):
+    """Grava os agendamentos filtrados em CSV, JSON (uma lista) ou JSON Lines, sem carregá-los todos na memória.
+
+    `inicio`/`fim` são minutos (ver parse_date_range). Datas saem como
+    DD/MM/AAAA HH:MM e valores como 50.00. Sem `fmt`, o formato vem da extensão
+    de `path`. Retorna o número de linhas exportadas.
+    """
+    model = model or AgendamentoModel()
+    fmt = fmt or export_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    rows = model.iter_agendamentos(inicio, fim, servico)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for row in rows:
+                writer.writerow(_export_row(row))
+                count += 1
+        elif fmt == "json": # a lista é escrita aos poucos, um registro por linha
+            f.write("[")
+            for row in rows:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(dict(zip(EXPORT_COLUMNS, _export_row(row))), ensure_ascii=False))
+                count += 1
+            f.write("\n]\n")
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(EXPORT_COLUMNS, _export_row(row))), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    return count
+
+def main(argv=None):
+    """Ponto de entrada da exportação sem interface gráfica."""
+    parser = argparse.ArgumentParser(description="Exporta agendamentos para CSV, JSON ou JSON Lines.")
+    parser.add_argument("arquivo", help="Arquivo de saída (.csv, .json ou .jsonl)")
+    parser.add_argument("--formato", choices=EXPORT_FORMATS, default=None)
+    parser.add_argument("--inicio", help="Data inicial DD/MM/AAAA (inclusiva)")
+    parser.add_argument("--fim", help="Data final DD/MM/AAAA (inclusiva)")
+    parser.add_argument("--servico", help="Exporta apenas este serviço")
+    parser.add_argument("--db", default=None, help="Arquivo do banco de dados (padrão: database.db)")
+    args = parser.parse_args(argv)
+    try:
+        inicio, fim = parse_date_range(args.inicio, args.fim)
+    except ValueError:
+        print("Datas inválidas; use DD/MM/AAAA.")
+        return 1
+    if args.db:
+        set_database(args.db)
+    setup_database()
+    count = export_agendamentos(args.arquivo, args.formato, inicio, fim, args.servico)
+    print(f"{count} agendamento(s) exportado(s) para {args.arquivo}.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
@@ -0,0 +1,131 @@
+from datetime import datetime
+from model import codec
+from model.agendamento import DURACAO_PADRAO
+from model.disponibilidade import MAX_DURACAO
+from model.recorrencia import FREQUENCIAS, MAX_OCORRENCIAS, excede_maximo
+
+REQUIRED_FIELDS = ("Nome", "Serviço", "Data", "Horário")
+
+class ValidationError(ValueError):
+    """Erro de validação com título e mensagem prontos para exibição."""
+    def __init__(self, title, message):
+        """Guarda o título e a mensagem do erro."""
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+def validate_agendamento(form_data):
+    """Valida um dicionário no formato do formulário e o converte para o banco.
+
+    Retorna um novo dicionário com "Valor" em centavos, "Duração" em minutos e "Data"
+    em minutos desde a época (sem a chave "Horário"), como gravados no banco; levanta
+    ValidationError se algum campo for inválido.
+    """
+    data = dict(form_data)
+    if not all(data.get(key) for key in REQUIRED_FIELDS):
+        raise ValidationError("Campos Obrigatórios", "Nome, Serviço, Data e Horário são obrigatórios.")
+    try:
+        data["Valor"] = codec.parse_money(data["Valor"]) if data.get("Valor") else 0
+    except ValueError:
+        raise ValidationError("Valor Inválido", "Valor deve ser numérico (ex: 50.00).") from None
+    try:
+        data["Duração"] = int(data["Duração"]) if data.get("Duração") else DURACAO_PADRAO
+    except ValueError:
+        data["Duração"] = 0
+    if not 0 < data["Duração"] <= MAX_DURACAO:
+        raise ValidationError("Duração Inválida", f"Duração deve ser de 1 a {MAX_DURACAO} minutos.")
+    try:
+        data["Data"] = codec.parse_form_datetime(data["Data"], data["Horário"])
+    except ValueError:
+        raise ValidationError("Data/Horário Inválido", "Use DD/MM/AAAA e HH:MM válidos.") from None
+    del data["Horário"]
+    return data
+
+def validate_recorrencia(form_data, data):
+    """Valida a repetição de um novo agendamento marcado em `data` (minutos).
+
+    Retorna None para "não repete" ou {"frequencia", "ate" (minutos, exclusivo: o dia
+    seguinte ao digitado), "vezes"}; exige um dos dois limites e levanta ValidationError.
+    """
+    frequencia = form_data.get("Repetir") or None
+    if frequencia is None:
+        return None
+    if frequencia not in FREQUENCIAS:
+        raise ValidationError("Repetição Inválida", f"Repetição desconhecida: {frequencia}.")
+    ate = vezes = None
+    if form_data.get("Até"):
+        try:
+            ate = codec.parse_form_date(form_data["Até"]) + codec.MINUTES_PER_DAY
+        except ValueError:
+            raise ValidationError("Data Inválida", "Use DD/MM/AAAA válido em \"Até\".") from None
+        if ate <= data:
+            raise ValidationError("Data Inválida", "\"Até\" deve ser igual ou posterior à data do agendamento.")
+    if form_data.get("Vezes"):
+        try:
+            vezes = int(form_data["Vezes"])
+        except ValueError:
+            vezes = 0
+        if not 0 < vezes <= MAX_OCORRENCIAS:
+            raise ValidationError("Repetição Inválida", f"Vezes deve ser de 1 a {MAX_OCORRENCIAS}.")
+    if ate is None and vezes is None:
+        raise ValidationError("Repetição Inválida", "Informe até quando (data) ou quantas vezes repetir.")
+    if excede_maximo(data, frequencia, ate, vezes):
+        raise ValidationError("Repetição Inválida", f"A série passaria de {MAX_OCORRENCIAS} agendamentos; "
+                                                    "escolha uma data final mais próxima ou informe as vezes.")
+    return {"frequencia": frequencia, "ate": ate, "vezes": vezes}
+
+def validate_servico(form_data):
+    """Valida os campos do cadastro de serviço ({"Nome", "Valor", "Duração"}) e os converte para o banco.
+
+    Retorna {"Nome", "Valor" em centavos, "Duração" em minutos}; levanta ValidationError.
+    """
+    nome = (form_data.get("Nome") or "").strip()
+    if not nome:
+        raise ValidationError("Campos Obrigatórios", "O nome do serviço é obrigatório.")
+    try:
+        valor = codec.parse_money(form_data["Valor"]) if form_data.get("Valor") else 0
+    except ValueError:
+        raise ValidationError("Valor Inválido", "Valor deve ser numérico (ex: 50.00).") from None
+    try:
+        duracao = int(form_data["Duração"]) if form_data.get("Duração") else DURACAO_PADRAO
+    except ValueError:
+        duracao = 0
+    if not 0 < duracao <= MAX_DURACAO:
+        raise ValidationError("Duração Inválida", f"Duração deve ser de 1 a {MAX_DURACAO} minutos.")
+    return {"Nome": nome, "Valor": valor, "Duração": duracao}
+
+# Períodos da listagem principal; "hoje_e_proximos" é o padrão ao abrir o sistema
+PERIODOS = ("hoje_e_proximos", "hoje", "semana", "proximos", "intervalo", "todos")
+
+def validate_list_filters(filters, agora=None):
+    """Converte os filtros da listagem ({"periodo", "inicio", "fim", "servico"}) para o banco.
+
+    Retorna {"inicio", "fim", "servico"} com o intervalo [inicio, fim) em minutos
+    (None quando aberto); levanta ValidationError se o intervalo digitado for inválido.
+    """
+    agora = codec.datetime_to_minutes(agora or datetime.now())
+    hoje = agora - agora % codec.MINUTES_PER_DAY
+    periodo = filters.get("periodo") or PERIODOS[0]
+    inicio = fim = None
+    if periodo == "hoje_e_proximos":
+        inicio = hoje
+    elif periodo == "hoje":
+        inicio, fim = hoje, hoje + codec.MINUTES_PER_DAY
+    elif periodo == "semana": # segunda a domingo
+        inicio = hoje - codec.minutes_to_datetime(hoje).weekday() * codec.MINUTES_PER_DAY
+        fim = inicio + 7 * codec.MINUTES_PER_DAY
+    elif periodo == "proximos":
+        inicio = agora
+    elif periodo == "intervalo":
+        try:
+            if filters.get("inicio"):
+                inicio = codec.parse_form_date(filters["inicio"])
+            if filters.get("fim"):
+                fim = codec.parse_form_date(filters["fim"]) + codec.MINUTES_PER_DAY
+        except ValueError:
+            raise ValidationError("Período Inválido", "Use datas DD/MM/AAAA no intervalo.") from None
+        if inicio is not None and fim is not None and fim <= inicio:
+            raise ValidationError("Período Inválido", "A data final deve ser igual ou posterior à inicial.")
+    elif periodo != "todos":
+        raise ValidationError("Período Inválido", f"Período desconhecido: {periodo}")
+    return {"inicio": inicio, "fim": fim, "servico": (filters.get("servico") or "").strip() or None}
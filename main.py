@@ -1,11 +1,42 @@
+import time
+INICIO = time.perf_counter() # Antes dos demais imports, para medir também o carregamento dos módulos
+import argparse
+import os
 import tkinter as tk
-from controller.app_controller import AppController
+from controller.app_controller import AppController, BACKUP_INTERVAL_HOURS
+from model import metricas
+from model.historico import HORIZONTE_DIAS
 
 if __name__ == "__main__":
     """Ponto de entrada principal da aplicação."""
+    parser = argparse.ArgumentParser(description="Agendamentos - Salão de Beleza Neide Leila")
+    parser.add_argument("--servidor", default=os.environ.get("SALAO_API_URL"),
+                        help="Usa o serviço HTTP (ex.: http://127.0.0.1:8765) em vez do database.db local")
+    parser.add_argument("--token", default=os.environ.get("SALAO_API_TOKEN"),
+                        help="Token de acesso do serviço HTTP")
+    parser.add_argument("--metricas", default=os.environ.get("SALAO_METRICAS"), metavar="ARQUIVO",
+                        help="Coleta métricas de desempenho desde o início e as grava neste JSON ao sair")
+    parser.add_argument("--limite-lento", type=float, default=metricas.LIMITE_LENTO_MS, metavar="MS",
+                        help="Chamadas acima deste tempo entram no log de lentas (padrão: 100 ms)")
+    parser.add_argument("--arquivar-apos", type=int, default=HORIZONTE_DIAS, metavar="DIAS",
+                        help=f"Move para o histórico os agendamentos com mais de DIAS dias (padrão: {HORIZONTE_DIAS}; "
+                             "0 desliga)")
+    parser.add_argument("--backup-intervalo", type=float, default=BACKUP_INTERVAL_HOURS, metavar="HORAS",
+                        help=f"Faz um backup quando o último tiver mais de HORAS horas (padrão: {BACKUP_INTERVAL_HOURS}; "
+                             "0 desliga)")
+    parser.add_argument("--backup-pasta", default=None, help="Pasta dos backups automáticos (padrão: backups)")
+    parser.add_argument("--tempo-inicio", action="store_true",
+                        help="Mostra quanto tempo cada fase da inicialização levou")
+    args = parser.parse_args()
+    if args.metricas:
+        metricas.ativar(args.limite_lento)
+    app_started = INICIO if args.tempo_inicio or args.metricas else None
     root = tk.Tk()
     root.withdraw() 
-    app = AppController(root)
+    app = AppController(root, args.servidor, args.token, args.metricas, app_started, args.arquivar_apos,
+                        args.backup_intervalo, args.backup_pasta)
+    app.mark_startup("módulos e Tk carregados")
     app.start_app()
     root.mainloop()
-    print("Aplicação encerrada.")
\ No newline at end of file
+    app.shutdown()
+    print("Aplicação encerrada.")
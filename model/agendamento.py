@@ -1,129 +1,346 @@
+import re
 import sqlite3 # Adicionado para referenciar os tipos de erro específicos
-from .database import connect_db
+from .database import get_connection
+from .disponibilidade import DisponibilidadeModel
+from .historico import get_limite_historico
+from .metricas import instrumentar
 
+PAGE_SIZE = 200 # Linhas por página na listagem paginada
+EXPORT_CHUNK_SIZE = 1000 # Linhas lidas por fetchmany ao percorrer o cursor
+DURACAO_PADRAO = 60 # Duração, em minutos, quando não informada
+SEARCH_LIMIT = 500 # Máximo de resultados exibidos por busca
+# Ordenações aceitas nas listagens: chave -> (expressão SQL, posição na linha) de cada coluna
+# do ORDER BY. Cada uma termina em id (desempate do keyset) e segue um índice existente.
+ORDENACOES = {
+    "data": (("data", 4), ("id", 0)),
+    "nome": (("nome COLLATE NOCASE", 1), ("id", 0)),
+    "servico": (("servico", 6), ("data", 4), ("id", 0)),
+    "valor": (("valor_centavos", 5), ("id", 0)),
+}
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def sort_key(row, ordenacao="data"):
+    """Chave de ordenação de uma linha, na mesma ordem do ORDER BY (usada como cursor do keyset)."""
+    return tuple(row[index].translate(_ASCII_LOWER) if "NOCASE" in expr and row[index] else row[index]
+                 for expr, index in ORDENACOES[ordenacao])
+
+def _order_by(ordenacao, descendente=False, alias=""):
+    """Monta o ORDER BY da ordenação pedida; só aceita chaves de ORDENACOES."""
+    direcao = " DESC" if descendente else ""
+    return ", ".join(f"{alias}{expr}{direcao}" for expr, _ in ORDENACOES[ordenacao])
+
+def _reread(conn, row):
+    """Relê a linha gravada: o RETURNING não enxerga a versão carimbada pelos gatilhos AFTER."""
+    if row is None:
+        return None
+    return conn.execute("SELECT * FROM agendamentos WHERE id = ?", (row[0],)).fetchone()
+
+class VersionConflictError(Exception):
+    """O agendamento foi alterado por outro terminal depois de ter sido lido para edição."""
+    def __init__(self, row):
+        """Guarda a linha atual do banco, para reexibição."""
+        super().__init__("Agendamento alterado por outro terminal.")
+        self.row = row
+
+def _filter_conditions(inicio=None, fim=None, servico=None):
+    """Monta as condições SQL (e parâmetros) de `inicio` <= data < `fim` e serviço exato."""
+    conditions, params = [], []
+    if inicio is not None:
+        conditions.append("data >= ?"); params.append(inicio)
+    if fim is not None:
+        conditions.append("data < ?"); params.append(fim)
+    if servico:
+        conditions.append("servico = ?"); params.append(servico)
+    return conditions, params
+
+def _com_historico(conn, where="", inicio=None):
+    """SELECT * da tabela principal, unido ao histórico só se o intervalo alcança datas arquivadas.
+
+    Retorna (sql, cópias): os parâmetros do `where` devem ser repetidos `cópias` vezes.
+    Com ORDER BY no final, o SQLite intercala as duas partes pelos índices, sem ordenar tudo.
+    """
+    sql = f"SELECT * FROM main.agendamentos {where}"
+    limite = get_limite_historico(conn)
+    if limite is None or (inicio is not None and inicio > limite):
+        return sql, 1
+    return f"{sql} UNION ALL SELECT * FROM historico.agendamentos {where}", 2
+
+@instrumentar()
 class AgendamentoModel:
-    """Gerencia as operações CRUD para agendamentos no banco de dados."""
+    """Gerencia as operações CRUD para agendamentos no banco de dados.
+
+    O trabalho do dia a dia (listagem, busca, edição) usa só a tabela principal;
+    agendamentos arquivados (ver model.historico) entram apenas no relatório e nas
+    exportações cujo período alcança o histórico.
+    """
 
-    def add_agendamento(self, nome, telefone, email, data, valor_servico, servico):
-        """Adiciona um novo agendamento ao banco de dados."""
-        conn = connect_db()
-        if conn is None:
-            return False
+    def add_agendamento(self, nome, telefone, email, data, valor_centavos, servico, duracao=DURACAO_PADRAO):
+        """Adiciona um novo agendamento e retorna a linha criada (None em caso de erro).
 
-        sql = ''' INSERT INTO agendamentos(nome, telefone, email, data, valor_servico, servico)
-                  VALUES(?,?,?,?,?,?) '''
+        `data` é em minutos desde a época e `valor_centavos` em centavos (ver model.codec).
+        """
+        sql = ''' INSERT INTO agendamentos(nome, telefone, email, data, valor_centavos, servico, duracao)
+                  VALUES(?,?,?,?,?,?,?) RETURNING * '''
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (nome, telefone, email, data, valor_servico, servico))
-            conn.commit()
-            return True
+            with get_connection() as conn:
+                return _reread(conn, conn.execute(sql, (nome, telefone, email, data, valor_centavos, servico,
+                                                        duracao)).fetchone())
         except sqlite3.IntegrityError as ie:
             print(f"Erro de integridade ao adicionar agendamento: {ie}")
-            return False
+            return None
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao adicionar agendamento: {oe}")
-            return False
+            return None
         except sqlite3.Error as e:
             print(f"Erro SQLite ao adicionar agendamento: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
-
-    def get_all_agendamentos(self):
-        """Retorna uma lista de todos os agendamentos, ordenados por data."""
-        conn = connect_db()
-        if conn is None:
+            return None
+
+    def add_many_agendamentos(self, rows):
+        """Insere várias linhas (nome, telefone, email, data, valor, servico, duracao) com executemany.
+
+        Retorna a quantidade inserida, ou None em caso de erro. Chamado dentro de um
+        bloco `get_connection()` externo, participa da transação desse bloco.
+        """
+        sql = ''' INSERT INTO agendamentos(nome, telefone, email, data, valor_centavos, servico, duracao)
+                  VALUES(?,?,?,?,?,?,?) '''
+        try:
+            with get_connection() as conn:
+                return conn.executemany(sql, rows).rowcount
+        except sqlite3.IntegrityError as ie:
+            print(f"Erro de integridade ao inserir agendamentos em lote: {ie}")
+            return None
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao inserir agendamentos em lote: {oe}")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao inserir agendamentos em lote: {e}")
+            return None
+
+    def iter_dedup_keys(self):
+        """Gera (nome, data, servico) de todos os agendamentos, inclusive os arquivados, para detectar duplicatas."""
+        with get_connection() as conn:
+            yield from conn.execute(f"SELECT nome, data, servico FROM ({_com_historico(conn)[0]})")
+
+    def get_all_agendamentos(self, ordenacao="data", descendente=False, historico=False, inicio=None, fim=None,
+                             servico=None):
+        """Retorna os agendamentos com `inicio` <= data < `fim` (minutos) na ordenação pedida (ver ORDENACOES).
+
+        `servico` filtra pelo serviço do catálogo, sem diferenciar maiúsculas nem acentos
+        (como os totais de model.relatorio).
+
+        Com `historico=True`, o banco de histórico só é consultado se `inicio` alcança
+        as datas arquivadas (ver get_limite_historico).
+        """
+        conditions, params = _filter_conditions(inicio, fim)
+        if servico:
+            conditions.append("servico_id = (SELECT id FROM servicos WHERE chave = normalizar(?))")
+            params.append(servico)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            with get_connection() as conn:
+                fonte, copias = _com_historico(conn, where, inicio) if historico else \
+                    (f"SELECT * FROM agendamentos {where}", 1)
+                return conn.execute(f"{fonte} ORDER BY {_order_by(ordenacao, descendente)}",
+                                    params * copias).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao buscar agendamentos: {oe}")
             return []
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar agendamentos: {e}")
+            return []
+
+    def get_agendamentos_page(self, cursor=None, direction="next", limit=PAGE_SIZE,
+                              inicio=None, fim=None, servico=None, ordenacao="data", descendente=False):
+        """Retorna (linhas, há_mais) de uma página na ordenação pedida (ver ORDENACOES).
+
+        `cursor` é a sort_key() da última linha já exibida (direction="next") ou da
+        primeira (direction="previous"); sem cursor, começa do início.
+        `inicio`/`fim` (minutos) e `servico` restringem a listagem como em
+        iter_agendamentos. As linhas sempre voltam na ordem de exibição.
+        """
+        colunas = ORDENACOES[ordenacao]
+        crescente = (direction == "previous") == descendente # sentido em que o índice é percorrido
+        conditions, params = _filter_conditions(inicio, fim, servico)
+        if cursor is not None:
+            exprs = ", ".join(expr for expr, _ in colunas)
+            marks = ", ".join("?" for _ in colunas)
+            conditions.append(f"({exprs}) {'>' if crescente else '<'} ({marks})")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT * FROM agendamentos {where} ORDER BY {_order_by(ordenacao, not crescente)} LIMIT ?"
+        params.append(limit + 1)
+        try:
+            with get_connection() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao buscar página de agendamentos: {oe}")
+            return [], False
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar página de agendamentos: {e}")
+            return [], False
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "previous":
+            rows.reverse()
+        return rows, has_more
+
+    def iter_agendamentos(self, inicio=None, fim=None, servico=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Gera agendamentos ordenados por data, lendo o cursor em blocos de `chunk_size`.
+
+        Filtros opcionais (aplicados no SQL): `inicio` <= data < `fim`, em minutos,
+        e serviço exato. Inclui os arquivados quando o período começa antes do fim do histórico.
+        """
+        conditions, params = _filter_conditions(inicio, fim)
+        if servico:
+            conditions.append("servico_id = (SELECT id FROM servicos WHERE chave = normalizar(?))")
+            params.append(servico)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with get_connection() as conn:
+            fonte, copias = _com_historico(conn, where, inicio)
+            cur = conn.execute(f"{fonte} ORDER BY data, id", params * copias)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def search_agendamentos(self, termo, limit=SEARCH_LIMIT, ordenacao="data", descendente=False):
+        """Busca por prefixo em nome, telefone, email e serviço (todas as palavras devem casar).
 
-        sql = "SELECT * FROM agendamentos ORDER BY data"
+        Usa o índice FTS5; se ele não existir, recorre a LIKE. Retorna linhas na ordenação pedida.
+        """
+        palavras = re.findall(r"\w+", termo)
+        if not palavras:
+            return []
+        fts_query = " ".join(f'"{palavra}"*' for palavra in palavras)
+        sql = f"""SELECT a.* FROM agendamentos_fts f JOIN agendamentos a ON a.id = f.rowid
+                  WHERE agendamentos_fts MATCH ?
+                  ORDER BY {_order_by(ordenacao, descendente, "a.")} LIMIT ?"""
         try:
-            cur = conn.cursor()
-            cur.execute(sql)
-            rows = cur.fetchall()
-            return rows
+            with get_connection() as conn:
+                try:
+                    return conn.execute(sql, (fts_query, limit)).fetchall()
+                except sqlite3.OperationalError as oe:
+                    if "no such table" not in str(oe):
+                        raise
+                conditions = " AND ".join(
+                    "(nome LIKE ? OR telefone LIKE ? OR email LIKE ? OR servico LIKE ?)" for _ in palavras)
+                params = [f"%{palavra}%" for palavra in palavras for _ in range(4)]
+                like_sql = (f"SELECT * FROM agendamentos WHERE {conditions} "
+                            f"ORDER BY {_order_by(ordenacao, descendente)} LIMIT ?")
+                return conn.execute(like_sql, params + [limit]).fetchall()
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao buscar agendamentos: {oe}")
             return []
         except sqlite3.Error as e:
             print(f"Erro SQLite ao buscar agendamentos: {e}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
     def get_agendamento_by_id(self, agendamento_id):
         """Retorna um agendamento específico pelo seu ID."""
-        conn = connect_db()
-        if conn is None:
-            return None
-
         sql = "SELECT * FROM agendamentos WHERE id = ?"
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (agendamento_id,))
-            row = cur.fetchone()
-            return row
+            with get_connection() as conn:
+                return conn.execute(sql, (agendamento_id,)).fetchone()
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao buscar agendamento por ID: {oe}")
             return None
         except sqlite3.Error as e:
             print(f"Erro SQLite ao buscar agendamento por ID: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
 
-    def update_agendamento(self, agendamento_id, nome, telefone, email, data, valor_servico, servico):
-        """Atualiza um agendamento existente no banco de dados."""
-        conn = connect_db()
-        if conn is None:
-            return False
+    def update_agendamento(self, agendamento_id, nome, telefone, email, data, valor_centavos, servico,
+                           duracao=DURACAO_PADRAO, versao=None):
+        """Atualiza um agendamento e retorna a linha resultante (None se não encontrado ou erro).
 
+        Com `versao`, só atualiza se a linha ainda estiver nessa versão (controle otimista);
+        caso contrário também retorna None.
+        """
         sql = ''' UPDATE agendamentos
                   SET nome = ?,
                       telefone = ?,
                       email = ?,
                       data = ?,
-                      valor_servico = ?,
-                      servico = ?
-                  WHERE id = ? '''
+                      valor_centavos = ?,
+                      servico = ?,
+                      duracao = ?
+                  WHERE id = ? AND (? IS NULL OR versao = ?)
+                  RETURNING * '''
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (nome, telefone, email, data, valor_servico, servico, agendamento_id))
-            conn.commit()
-            return True
+            with get_connection() as conn:
+                return _reread(conn, conn.execute(sql, (nome, telefone, email, data, valor_centavos, servico,
+                                                        duracao, agendamento_id, versao, versao)).fetchone())
         except sqlite3.IntegrityError as ie:
             print(f"Erro de integridade ao atualizar agendamento: {ie}")
-            return False
+            return None
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao atualizar agendamento: {oe}")
-            return False
+            return None
         except sqlite3.Error as e:
             print(f"Erro SQLite ao atualizar agendamento: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+            return None
 
-    def delete_agendamento(self, agendamento_id):
-        """Deleta um agendamento do banco de dados pelo seu ID."""
-        conn = connect_db()
-        if conn is None:
-            return False
+    def save_if_available(self, agendamento_id, nome, telefone, email, data, valor_centavos, servico,
+                          duracao=DURACAO_PADRAO, versao=None):
+        """Checa conflitos de horário e grava na mesma transação (BEGIN IMMEDIATE).
+
+        Sem `agendamento_id` insere; com ele, atualiza. Retorna (linha gravada, conflitos);
+        com conflitos, nada é gravado. Erros do banco na checagem são propagados.
+        Numa atualização com `versao`, levanta VersionConflictError se a linha mudou.
+        """
+        args = (nome, telefone, email, data, valor_centavos, servico, duracao)
+        with get_connection(immediate=True) as conn:
+            if agendamento_id is not None and versao is not None:
+                atual = conn.execute("SELECT * FROM agendamentos WHERE id = ?", (agendamento_id,)).fetchone()
+                if atual is None:
+                    return None, []
+                if atual[8] != versao:
+                    raise VersionConflictError(atual)
+            conflitos = DisponibilidadeModel().get_conflitos(data, duracao, agendamento_id)
+            if conflitos:
+                return None, conflitos
+            if agendamento_id is None:
+                return self.add_agendamento(*args), []
+            return self.update_agendamento(agendamento_id, *args, versao=versao), []
+
+    def get_versao(self):
+        """Versão atual do contador global de alterações (0 se indisponível)."""
+        try:
+            with get_connection() as conn:
+                return conn.execute("SELECT versao FROM alteracoes WHERE id = 1").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao ler a versão dos dados: {e}")
+            return 0
+
+    def get_alteracoes(self, desde):
+        """Retorna (versão atual, linhas alteradas, ids removidos) depois da versão `desde`.
 
-        sql = 'DELETE FROM agendamentos WHERE id = ?'
+        Sem alterações, custa só a leitura do contador. Remoções devem ser aplicadas
+        antes das linhas alteradas.
+        """
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (agendamento_id,))
-            conn.commit()
-            return True
+            with get_connection() as conn:
+                versao = conn.execute("SELECT versao FROM alteracoes WHERE id = 1").fetchone()[0]
+                if versao == desde:
+                    return versao, [], []
+                linhas = conn.execute("SELECT * FROM agendamentos WHERE versao > ? ORDER BY versao",
+                                      (desde,)).fetchall()
+                removidos = [row[0] for row in conn.execute(
+                    "SELECT id FROM agendamentos_removidos WHERE versao > ?", (desde,))]
+                return versao, linhas, removidos
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar alterações: {e}")
+            return desde, [], []
+
+    def delete_agendamento(self, agendamento_id):
+        """Deleta um agendamento pelo seu ID e retorna a linha removida (None se não encontrado ou erro)."""
+        sql = 'DELETE FROM agendamentos WHERE id = ? RETURNING *'
+        try:
+            with get_connection() as conn:
+                return conn.execute(sql, (agendamento_id,)).fetchone()
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao deletar agendamento: {oe}")
-            return False
+            return None
         except sqlite3.Error as e:
             print(f"Erro SQLite ao deletar agendamento: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Backups online com a API de backup do SQLite, compactados e com rotação.
+
+Cada backup é um par de arquivos gzip na pasta de backups (banco principal e
+histórico, ver model.historico), copiados de um mesmo instante por uma conexão
+própria, em passos de PAGINAS_POR_PASSO páginas. No modo WAL a cópia só mantém
+uma transação de leitura: os agendamentos continuam sendo gravados enquanto ela roda.
+"""
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from . import database
+from .database import _open_connection, historico_path
+
+BACKUP_DIR = "backups"
+MANTER_BACKUPS = 10 # Backups mantidos na pasta; os mais antigos são apagados
+PAGINAS_POR_PASSO = 256 # Páginas copiadas por passo (cerca de 1 MiB), para informar o progresso
+BLOCO_COMPRESSAO = 1024 * 1024 # Bytes lidos por vez ao compactar
+PREFIXO = "salao-"
+FORMATO_DATA = "%Y%m%d-%H%M%S"
+
+class BackupError(Exception):
+    """Backup ou restauração que não pôde ser concluído (arquivo ausente ou corrompido)."""
+
+def _arquivos(destino):
+    """(banco, arquivo) de cada parte de um backup; `destino` é o arquivo do banco principal."""
+    return (("main", destino), ("historico", historico_path(destino[:-len(".gz")]) + ".gz"))
+
+def _integridade(conn):
+    """Mensagem do PRAGMA integrity_check ("ok" se o banco estiver íntegro)."""
+    return "; ".join(row[0] for row in conn.execute("PRAGMA integrity_check"))
+
+def _comprimir(origem, destino, avancar=None):
+    """Compacta `origem` em `destino` (gravado à parte e renomeado) e apaga a origem.
+
+    `avancar(bytes)` é chamado a cada bloco compactado.
+    """
+    with open(origem, "rb") as entrada, gzip.open(f"{destino}.part", "wb", compresslevel=6) as saida:
+        while bloco := entrada.read(BLOCO_COMPRESSAO):
+            saida.write(bloco)
+            if avancar: avancar(len(bloco))
+    os.replace(f"{destino}.part", destino)
+    os.remove(origem)
+
+def _descomprimir(origem, destino):
+    """Descompacta o backup `origem` no arquivo `destino`."""
+    with gzip.open(origem, "rb") as entrada, open(destino, "wb") as saida:
+        shutil.copyfileobj(entrada, saida, 1024 * 1024)
+
+def listar_backups(pasta=BACKUP_DIR):
+    """Arquivos dos backups (parte principal) da pasta, do mais recente para o mais antigo."""
+    caminhos = glob.glob(os.path.join(glob.escape(pasta), f"{PREFIXO}*.db.gz"))
+    return sorted((c for c in caminhos if not c.endswith(f"{database.HISTORICO_SUFIXO}.db.gz")), reverse=True)
+
+def backup_vencido(pasta=BACKUP_DIR, intervalo_s=0):
+    """Verdadeiro se o backup mais recente tem mais de `intervalo_s` segundos (ou não existe)."""
+    backups = listar_backups(pasta)
+    if not backups:
+        return True
+    return datetime.now().timestamp() - os.path.getmtime(backups[0]) >= intervalo_s
+
+def _rotacionar(pasta, manter):
+    """Apaga os backups além dos `manter` mais recentes."""
+    for antigo in listar_backups(pasta)[manter:]:
+        for _, arquivo in _arquivos(antigo):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+
+def criar_backup(pasta=BACKUP_DIR, manter=MANTER_BACKUPS, progresso=None, arquivo_db=None):
+    """Copia o banco e o histórico para a pasta de backups e retorna o arquivo principal criado.
+
+    `progresso(fração)` é chamado a cada passo da cópia e da compactação (de 0 a 1). Cada parte é
+    verificada com PRAGMA integrity_check antes de ser compactada; se falhar, levanta
+    BackupError e nada é gravado. Erros do SQLite e de disco são propagados.
+    """
+    arquivo_db = arquivo_db or database.DATABASE_NAME
+    os.makedirs(pasta, exist_ok=True)
+    for padrao in (f"{PREFIXO}*.tmp", f"{PREFIXO}*.gz.part"): # sobras de backups interrompidos
+        for sobra in glob.glob(os.path.join(glob.escape(pasta), padrao)):
+            os.remove(sobra)
+    destino = os.path.join(pasta, f"{PREFIXO}{datetime.now().strftime(FORMATO_DATA)}.db.gz")
+    origem = _open_connection(arquivo_db, historico=True)
+    try:
+        if not origem.historico_anexado: # nada arquivado ainda: a parte do histórico sai vazia
+            origem.execute("ATTACH DATABASE ':memory:' AS historico")
+        # Uma transação de leitura fixa o instantâneo dos dois bancos durante toda a cópia, sem
+        # bloquear quem grava. O principal é lido primeiro: um lote de arquivamento concluído no
+        # meio aparece nos dois bancos (o próximo lote corrige), mas nunca some dos dois.
+        origem.execute("BEGIN")
+        tamanhos = {nome: origem.execute(f"PRAGMA {nome}.page_count").fetchone()[0]
+                          * origem.execute(f"PRAGMA {nome}.page_size").fetchone()[0] for nome in ("main", "historico")}
+        total, feito = 2 * sum(tamanhos.values()) or 1, 0 # cada byte é copiado e depois compactado
+        def avancar(quantidade):
+            nonlocal feito
+            feito += quantidade
+            if progresso: progresso(min(feito / total, 1.0))
+        for nome, arquivo in _arquivos(destino):
+            temporario = f"{arquivo[:-len('.gz')]}.tmp"
+            copia = sqlite3.connect(temporario)
+            inicio = feito
+            try:
+                def passo(status, restantes, paginas):
+                    if paginas: # histórico ainda vazio (nenhum arquivamento): 0 páginas
+                        avancar(inicio + tamanhos[nome] * (paginas - restantes) / paginas - feito)
+                origem.backup(copia, pages=PAGINAS_POR_PASSO, progress=passo, name=nome)
+                copia.execute("PRAGMA journal_mode = DELETE") # arquivo único, sem -wal, ao restaurar
+                resultado = _integridade(copia)
+            finally:
+                copia.close()
+            if resultado != "ok":
+                os.remove(temporario)
+                raise BackupError(f"Cópia de {nome} falhou na verificação de integridade: {resultado}")
+            avancar(inicio + tamanhos[nome] - feito)
+            _comprimir(temporario, arquivo, avancar)
+        origem.rollback()
+    finally:
+        origem.close()
+    _rotacionar(pasta, manter)
+    return destino
+
+def verificar_backup(caminho):
+    """Descompacta as partes do backup (ao lado dos arquivos) e retorna {banco: integrity_check}."""
+    resultados = {}
+    for nome, arquivo in _arquivos(caminho):
+        if not os.path.exists(arquivo):
+            raise BackupError(f"Parte ausente do backup: {arquivo}")
+        temporario = f"{arquivo[:-len('.gz')]}.tmp-verificar"
+        try:
+            _descomprimir(arquivo, temporario)
+            conn = sqlite3.connect(temporario)
+            try:
+                resultados[nome] = _integridade(conn)
+            except sqlite3.DatabaseError as e: # não é um banco SQLite
+                resultados[nome] = str(e)
+            finally:
+                conn.close()
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+    return resultados
+
+def restaurar_backup(caminho, arquivo_db=None, verificar=True):
+    """Substitui o conteúdo do banco e do histórico pelo backup `caminho`, após verificá-lo.
+
+    A gravação usa a própria API de backup sobre os arquivos atuais, então as
+    conexões do pool devem estar fechadas (close_pool) e os outros terminais parados.
+    """
+    arquivo_db = arquivo_db or database.DATABASE_NAME
+    falhas = {nome: r for nome, r in verificar_backup(caminho).items() if r != "ok"} if verificar else {}
+    if falhas:
+        raise BackupError(f"Backup corrompido, nada foi restaurado: {falhas}")
+    for (nome, arquivo), alvo_db in zip(_arquivos(caminho), (arquivo_db, historico_path(arquivo_db))):
+        temporario = f"{alvo_db}.tmp-restaurar"
+        try:
+            _descomprimir(arquivo, temporario)
+            fonte, alvo = sqlite3.connect(temporario), sqlite3.connect(alvo_db)
+            try:
+                fonte.backup(alvo)
+            finally:
+                fonte.close()
+                alvo.close()
+        finally:
+            os.remove(temporario)
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+from bisect import bisect_left, insort
+from .codec import normalizar
+from .database import get_connection
+from .metricas import instrumentar
+
+MAX_SUGESTOES = 8 # Clientes sugeridos por vez no autocompletar
+
+class IndiceClientes:
+    """Índice em memória para autocompletar clientes por prefixo de nome ou de telefone.
+
+    Guarda listas ordenadas de (chave, id): cada palavra do nome normalizado e o
+    telefone. Carregado uma vez com carregar() e mantido com atualizar(), sem
+    consultar o banco a cada tecla.
+    """
+    def __init__(self):
+        """Começa vazio."""
+        self.clientes = {} # id -> (id, nome, telefone, email)
+        self._palavras = {} # id -> palavras do nome normalizado
+        self._nomes = [] # (palavra do nome normalizado, id)
+        self._telefones = [] # (telefone, id)
+
+    def _chaves(self, cliente):
+        """Entradas (lista, chave) de um cliente nos índices."""
+        cliente_id, _nome, telefone, _email = cliente
+        chaves = [(self._nomes, (palavra, cliente_id)) for palavra in set(self._palavras[cliente_id])]
+        if telefone:
+            chaves.append((self._telefones, (telefone, cliente_id)))
+        return chaves
+
+    def carregar(self, clientes):
+        """Substitui o conteúdo do índice pelas linhas (id, nome, telefone, email)."""
+        self.clientes = {cliente[0]: tuple(cliente) for cliente in clientes}
+        self._palavras = {cliente_id: normalizar(cliente[1]).split() for cliente_id, cliente in self.clientes.items()}
+        self._nomes, self._telefones = [], []
+        for cliente in self.clientes.values():
+            for lista, chave in self._chaves(cliente):
+                lista.append(chave)
+        self._nomes.sort()
+        self._telefones.sort()
+
+    def atualizar(self, cliente):
+        """Inclui ou substitui um cliente (id, nome, telefone, email) no índice."""
+        cliente = tuple(cliente)
+        anterior = self.clientes.get(cliente[0])
+        if anterior == cliente:
+            return
+        if anterior:
+            for lista, chave in self._chaves(anterior):
+                posicao = bisect_left(lista, chave)
+                if posicao < len(lista) and lista[posicao] == chave:
+                    del lista[posicao]
+        self.clientes[cliente[0]] = cliente
+        self._palavras[cliente[0]] = normalizar(cliente[1]).split()
+        for lista, chave in self._chaves(cliente):
+            insort(lista, chave)
+
+    def _prefixo(self, lista, prefixo):
+        """Ids das chaves de `lista` que começam com `prefixo`, na ordem da lista."""
+        posicao = bisect_left(lista, (prefixo,))
+        while posicao < len(lista) and lista[posicao][0].startswith(prefixo):
+            yield lista[posicao][1]
+            posicao += 1
+
+    def buscar_nome(self, texto, limite=MAX_SUGESTOES):
+        """Clientes com uma palavra do nome começando por cada palavra de `texto`.
+
+        Vêm na ordem da palavra digitada mais longa (a mais seletiva, percorrida no
+        índice); a busca para ao juntar `limite` clientes.
+        """
+        palavras = normalizar(texto).split()
+        if not palavras:
+            return []
+        maior = max(palavras, key=len)
+        encontrados = {}
+        for cliente_id in self._prefixo(self._nomes, maior):
+            nome = self._palavras[cliente_id]
+            if cliente_id not in encontrados and all(
+                    any(parte.startswith(palavra) for parte in nome) for palavra in palavras):
+                encontrados[cliente_id] = self.clientes[cliente_id]
+                if len(encontrados) == limite:
+                    break
+        return list(encontrados.values())
+
+    def buscar_telefone(self, texto, limite=MAX_SUGESTOES):
+        """Clientes cujo telefone começa com `texto`."""
+        texto = texto.strip()
+        if not texto:
+            return []
+        ids = []
+        for cliente_id in self._prefixo(self._telefones, texto):
+            ids.append(cliente_id)
+            if len(ids) == limite:
+                break
+        return [self.clientes[cliente_id] for cliente_id in ids]
+
+@instrumentar()
+class ClienteModel:
+    """Consultas à tabela de clientes (mantida pelos triggers de agendamentos)."""
+
+    def get_all_clientes(self):
+        """Retorna todos os clientes como (id, nome, telefone, email)."""
+        sql = "SELECT id, nome, telefone, email FROM clientes"
+        try:
+            with get_connection() as conn:
+                return conn.execute(sql).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao buscar clientes: {oe}")
+            return []
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar clientes: {e}")
+            return []
+
+    def get_clientes(self, ids):
+        """Retorna os clientes (id, nome, telefone, email) com os ids informados."""
+        sql = "SELECT id, nome, telefone, email FROM clientes WHERE id IN (SELECT value FROM json_each(?))"
+        try:
+            with get_connection() as conn:
+                return conn.execute(sql, (json.dumps(list(ids)),)).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao buscar clientes: {oe}")
+            return []
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar clientes: {e}")
+            return []
@@ -0,0 +1,99 @@
+"""Conversão entre os tipos gravados no banco e os textos exibidos/digitados.
+
+Datas são minutos inteiros desde 1970-01-01 00:00 no horário local (sem fuso),
+e valores são centavos inteiros. Controller e Views usam apenas estas funções
+para interpretar e formatar esses campos.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+import unicodedata
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DATE = EPOCH.date()
+MINUTES_PER_DAY = 24 * 60
+FORM_DATE_FORMAT = "%d/%m/%Y"
+FORM_TIME_FORMAT = "%H:%M"
+
+def datetime_to_minutes(dt):
+    """Converte um datetime (ingênuo, horário local) em minutos desde a época."""
+    return (dt - EPOCH) // timedelta(minutes=1)
+
+def minutes_to_datetime(minutes):
+    """Converte minutos desde a época em datetime."""
+    return EPOCH + timedelta(minutes=minutes)
+
+def date_to_minutes(day):
+    """Minutos do início (00:00) de um `date`."""
+    return (day - EPOCH_DATE).days * MINUTES_PER_DAY
+
+def minutes_to_day(minutes):
+    """Número do dia (desde a época) que contém o instante dado."""
+    return minutes // MINUTES_PER_DAY
+
+def day_to_date(day):
+    """Converte o número do dia em `date`."""
+    return EPOCH_DATE + timedelta(days=day)
+
+def parse_form_date(text):
+    """Converte 'DD/MM/AAAA' em minutos do início do dia; levanta ValueError se inválida."""
+    return date_to_minutes(datetime.strptime(text, FORM_DATE_FORMAT).date())
+
+def parse_form_datetime(date_text, time_text):
+    """Converte 'DD/MM/AAAA' e 'HH:MM' em minutos; levanta ValueError se inválidos."""
+    parsed_time = datetime.strptime(time_text, FORM_TIME_FORMAT)
+    return parse_form_date(date_text) + parsed_time.hour * 60 + parsed_time.minute
+
+def parse_legacy_text(text):
+    """Converte o antigo TEXT 'AAAA-MM-DD HH:MM:SS' (ou só a data) em minutos; None se inválido."""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime_to_minutes(datetime.strptime(str(text).strip(), fmt))
+        except ValueError:
+            continue
+    return None
+
+@lru_cache(maxsize=8192)
+def format_day(day):
+    """'DD/MM/AAAA' de um número de dia (cacheado: poucos dias distintos por listagem)."""
+    return day_to_date(day).strftime(FORM_DATE_FORMAT)
+
+def format_date(minutes):
+    """'DD/MM/AAAA' do instante dado."""
+    return format_day(minutes // MINUTES_PER_DAY)
+
+def format_time(minutes):
+    """'HH:MM' do instante dado, sem passar por datetime."""
+    hours, mins = divmod(minutes % MINUTES_PER_DAY, 60)
+    return f"{hours:02d}:{mins:02d}"
+
+def format_datetime(minutes):
+    """'DD/MM/AAAA HH:MM' do instante dado."""
+    return f"{format_date(minutes)} {format_time(minutes)}"
+
+def parse_money(value):
+    """Converte '50', '50.5', '50,50' ou um número em centavos inteiros; levanta ValueError."""
+    if isinstance(value, int):
+        return value * 100
+    try:
+        amount = Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"Valor inválido: {value!r}")
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def format_money(cents):
+    """'50.00' a partir de centavos (aceita médias não inteiras)."""
+    if cents is None:
+        cents = 0
+    if not isinstance(cents, int):
+        cents = int(Decimal(str(cents)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    sign = "-" if cents < 0 else ""
+    reais, centavos = divmod(abs(cents), 100)
+    return f"{sign}{reais}.{centavos:02d}"
+
+def normalizar(texto):
+    """Texto em minúsculas e sem acentos, para comparar nomes digitados de formas diferentes."""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
@@ -1,65 +1,231 @@
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
 from sqlite3 import Error, OperationalError
+from .migrations import run_migrations, SCHEMA_VERSION
+from . import metricas, codec
 
 DATABASE_NAME = "database.db"
+HISTORICO_SUFIXO = "_historico" # database.db -> database_historico.db (agendamentos arquivados)
 
-def connect_db():
-    """Cria e retorna uma conexão com o banco de dados SQLite."""
-    conn = None
-    try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        return conn
-    except OperationalError as oe: # Erro ao tentar abrir/conectar o arquivo do BD
-        print(f"Erro operacional ao conectar ao banco de dados: {oe}")
-    except Error as e: # Outros erros genéricos do sqlite3
-        print(f"Erro ao conectar ao banco de dados: {e}")
-    return conn
+POOL_SIZE = 4 # Conexões mantidas abertas pelo pool
+STATEMENT_CACHE_SIZE = 256 # Instruções preparadas reaproveitadas por conexão
+BUSY_TIMEOUT_MS = 5000
+SQLITE_MINIMO = (3, 35, 0) # RETURNING e sqlite_schema, usados pelos Models e pelas migrações
 
-def create_table(conn, create_table_sql):
-    """Executa uma instrução SQL para criar uma tabela."""
-    try:
-        c = conn.cursor()
-        c.execute(create_table_sql)
-    except OperationalError as oe: 
-        print(f"Erro operacional ao criar tabela: {oe}")
-    except Error as e:
-        print(f"Erro ao criar tabela: {e}")
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size = -16000", # ~16 MiB de cache de páginas
+    "PRAGMA mmap_size = 268435456", # 256 MiB mapeados em memória
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
 
-def setup_database():
-    """Configura o banco de dados inicial, criando as tabelas se não existirem."""
-    sql_create_agendamentos_table = """
-    CREATE TABLE IF NOT EXISTS agendamentos (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL,
-        telefone TEXT,
-        email TEXT,
-        data TEXT NOT NULL,
-        valor_servico REAL,
-        servico TEXT NOT NULL
-    );
+class _Conexao(sqlite3.Connection):
+    """Conexão que informa às métricas (quando ativas) as instruções executadas."""
+    def execute(self, sql, parameters=()):
+        """Executa a instrução, anotando-a na chamada medida em andamento."""
+        if metricas.ativo: metricas.registrar_sql(sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        """Executa a instrução em lote, anotando-a sem os parâmetros."""
+        if metricas.ativo: metricas.registrar_sql(sql, "(executemany)")
+        return super().executemany(sql, seq_of_parameters)
+
+def _open_connection(database, check_same_thread=True, historico=False):
+    """Abre uma conexão SQLite e aplica os PRAGMAs de desempenho.
+
+    Com `historico=True`, anexa também o banco de histórico (ver historico_path), se o
+    arquivo já existir; conn.historico_anexado diz se ele foi anexado.
     """
+    conn = sqlite3.connect(database, timeout=BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=check_same_thread,
+                           cached_statements=STATEMENT_CACHE_SIZE, factory=_Conexao)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    # Chave dos nomes de serviço (servicos.chave), usada pelos gatilhos do catálogo
+    conn.create_function("normalizar", 1, lambda texto: None if texto is None else codec.normalizar(texto),
+                         deterministic=True)
+    conn.historico_anexado = historico and _anexar_historico(conn, database)
+    return conn
+
+def _anexar_historico(conn, database):
+    """Anexa o banco de histórico de `database` só se o arquivo existir (nada foi arquivado sem ele)."""
+    if database == ":memory:" or not os.path.exists(historico_path(database)):
+        return False
+    conn.execute("ATTACH DATABASE ? AS historico", (historico_path(database),))
+    return True
 
-    sql_create_usuarios_table = """
-    CREATE TABLE IF NOT EXISTS usuarios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        salt TEXT NOT NULL
-    );
+def historico_path(database):
+    """Arquivo do banco de histórico que acompanha `database` (ver model.historico)."""
+    raiz, extensao = os.path.splitext(database)
+    return f"{raiz}{HISTORICO_SUFIXO}{extensao or '.db'}"
+
+class ConnectionPool:
+    """Mantém conexões SQLite de longa duração e as entrega como context managers.
+
+    Cada conexão é usada por uma thread de cada vez. Chamadas aninhadas na
+    mesma thread reaproveitam a conexão já emprestada, e apenas o bloco mais
+    externo faz commit (ou rollback, em caso de exceção).
     """
+    def __init__(self, database=DATABASE_NAME, size=POOL_SIZE):
+        """Inicializa o pool sem abrir conexões (abertas sob demanda)."""
+        self.database = database
+        self.size = size
+        self._idle = LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _acquire(self):
+        """Obtém uma conexão ociosa ou abre uma nova se houver espaço no pool."""
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = _open_connection(self.database, check_same_thread=False, historico=True)
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def _release(self, conn):
+        """Devolve a conexão ao pool (ou a fecha se o pool já foi encerrado)."""
+        with self._lock:
+            if conn in self._all:
+                self._idle.put(conn)
+                return
+        conn.close()
 
-    conn = connect_db()
+    @contextmanager
+    def connection(self, immediate=False):
+        """Empresta uma conexão; commit ao final do bloco, rollback em exceção.
 
-    if conn is not None:
+        Com `immediate=True`, o bloco mais externo abre a transação com BEGIN
+        IMMEDIATE, reservando a escrita já antes das leituras (ler-e-gravar atômico).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn = self._acquire()
+        if not conn.historico_anexado: # o histórico pode ter sido criado depois que a conexão foi aberta
+            conn.historico_anexado = _anexar_historico(conn, self.database)
+        self._local.conn, self._local.depth = conn, 1
         try:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn, self._local.depth = None, 0
+            self._release(conn)
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas e esvazia o pool."""
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            if conn in conns:
+                conn.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Retorna o pool de conexões da aplicação, criando-o na primeira chamada."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_NAME)
+    return _pool
+
+def get_connection(immediate=False):
+    """Atalho para emprestar uma conexão do pool da aplicação."""
+    return get_pool().connection(immediate)
+
+def criar_historico():
+    """Cria o arquivo do banco de histórico, vazio, se ainda não existir.
+
+    As conexões do pool passam a anexá-lo na próxima vez em que forem emprestadas.
+    """
+    database = get_pool().database
+    if database != ":memory:":
+        sqlite3.connect(historico_path(database)).close()
+
+def set_database(database):
+    """Troca o arquivo de banco de dados usado pela aplicação (fecha o pool atual)."""
+    global DATABASE_NAME, _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        DATABASE_NAME = database
+        _pool = None
+
+def close_pool():
+    """Fecha as conexões do pool da aplicação (usado no encerramento)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = None
+
+def check_sqlite_version(versao=sqlite3.sqlite_version_info):
+    """Levanta NotSupportedError se a biblioteca SQLite do Python for anterior a SQLITE_MINIMO."""
+    if versao < SQLITE_MINIMO:
+        raise sqlite3.NotSupportedError(
+            f"SQLite {'.'.join(map(str, versao))} é antigo demais; a aplicação precisa do SQLite "
+            f"{'.'.join(map(str, SQLITE_MINIMO))} ou superior (atualize o Python).")
+
+def check_startup():
+    """Verifica, numa única consulta, se o esquema está atualizado e se há usuários.
+
+    Retorna (esquema_atual, has_users). Num banco novo, sem a tabela de usuários,
+    retorna (False, False), e o chamador deve rodar setup_database().
+    """
+    check_sqlite_version()
+    sql = "SELECT user_version, EXISTS (SELECT 1 FROM usuarios) FROM pragma_user_version"
+    try:
+        with get_connection() as conn:
+            version, has_users = conn.execute(sql).fetchone()
+        return version >= SCHEMA_VERSION, bool(has_users)
+    except OperationalError: # banco novo: a tabela usuarios ainda não existe
+        return False, False
+
+def setup_database():
+    """Configura o banco de dados, aplicando as migrações de esquema pendentes.
+
+    Levanta NotSupportedError (ver check_sqlite_version) antes de tocar no banco.
+    """
+    check_sqlite_version()
+    try:
+        with get_connection() as conn:
             print("Criando/Verificando tabelas...")
-            create_table(conn, sql_create_agendamentos_table)
-            create_table(conn, sql_create_usuarios_table)
-            conn.commit()
+            applied = run_migrations(conn)
+            if applied:
+                print(f"Migrações aplicadas: {', '.join(map(str, applied))}")
             print("Configuração do banco de dados concluída.")
-        except Error as e:
-            print(f"Erro durante o setup do banco de dados: {e}")
-        finally:
-            conn.close()
-    else:
-        print("Erro! Não foi possível criar uma conexão com o banco de dados para o setup.")
\ No newline at end of file
+    except OperationalError as oe:
+        print(f"Erro! Não foi possível criar uma conexão com o banco de dados para o setup: {oe}")
+    except Error as e:
+        print(f"Erro durante o setup do banco de dados: {e}")
\ No newline at end of file
@@ -0,0 +1,107 @@
+import sqlite3
+from bisect import bisect_right
+from .database import get_connection
+from .codec import date_to_minutes
+from .recorrencia import ocorrencias_virtuais
+from .metricas import instrumentar
+CAPACIDADE_SIMULTANEA = 1 # Atendimentos que podem ocorrer ao mesmo tempo
+MAX_DURACAO = 8 * 60 # Maior duração aceita, em minutos; limita a busca retroativa
+HORARIO_ABERTURA = 8 * 60 # Minutos desde a meia-noite
+HORARIO_FECHAMENTO = 20 * 60
+PASSO_HORARIOS = 30 # Intervalo entre horários sugeridos, em minutos
+
+class OcupacaoIntervalos:
+    """Função-degrau de ocupação construída por varredura dos intervalos [início, fim).
+
+    Responde "qual a maior ocupação dentro de [a, b)?" com busca binária sobre
+    os pontos de mudança, sem reexaminar todos os agendamentos.
+    """
+    def __init__(self, intervalos):
+        """Monta os pontos de mudança a partir de pares (início, fim) em minutos."""
+        eventos = {}
+        for inicio, fim in intervalos:
+            eventos[inicio] = eventos.get(inicio, 0) + 1
+            eventos[fim] = eventos.get(fim, 0) - 1
+        self.pontos, self.ocupacao = [], []
+        atual = 0
+        for instante in sorted(eventos):
+            atual += eventos[instante]
+            self.pontos.append(instante)
+            self.ocupacao.append(atual)
+
+    def maxima(self, inicio, fim):
+        """Maior número de atendimentos simultâneos em [inicio, fim)."""
+        i = bisect_right(self.pontos, inicio) - 1
+        maior = self.ocupacao[i] if i >= 0 else 0
+        for j in range(i + 1, len(self.pontos)):
+            if self.pontos[j] >= fim:
+                break
+            maior = max(maior, self.ocupacao[j])
+        return maior
+
+@instrumentar()
+class DisponibilidadeModel:
+    """Verifica conflitos de horário e lista horários livres usando consultas por faixa de data."""
+
+    def _get_intervalos(self, inicio, fim, ignorar_id=None, ignorar_serie=None):
+        """Busca (id, nome, início, fim) dos agendamentos que cruzam [inicio, fim), em minutos.
+
+        Usa o índice de data: só precisa olhar até MAX_DURACAO antes de `inicio`. Inclui,
+        com id None, as ocorrências de séries ainda não geradas (menos as de `ignorar_serie`).
+        """
+        sql = """SELECT id, nome, data, data + duracao FROM agendamentos
+                  WHERE data >= ? AND data < ? AND data + duracao > ? AND id IS NOT ?"""
+        with get_connection() as conn:
+            intervalos = conn.execute(sql, (inicio - MAX_DURACAO, fim, inicio, ignorar_id)).fetchall()
+            virtuais = ocorrencias_virtuais(conn, inicio, fim, ignorar_serie)
+        return intervalos + [(None, nome, data, data + duracao) for _, nome, data, duracao in virtuais]
+
+    def get_conflitos(self, data, duracao, ignorar_id=None, capacidade=CAPACIDADE_SIMULTANEA):
+        """Retorna (id, nome, data, duracao) dos agendamentos que impedem marcar `data` (minutos) por `duracao` minutos.
+
+        Lista vazia significa que o horário está livre. `ignorar_id` exclui o próprio
+        agendamento numa edição. Erros do banco são propagados, para que uma falha
+        na checagem nunca seja tratada como horário livre.
+        """
+        inicio, fim = data, data + duracao
+        intervalos = self._get_intervalos(inicio, fim, ignorar_id)
+        if not intervalos:
+            return []
+        ocupacao = OcupacaoIntervalos((comeco, termino) for _, _, comeco, termino in intervalos)
+        if ocupacao.maxima(inicio, fim) < capacidade:
+            return []
+        return [(agendamento_id, nome, comeco, termino - comeco)
+                for agendamento_id, nome, comeco, termino in intervalos]
+
+    def get_conflitos_lote(self, datas, duracao, ignorar_ids=(), ignorar_serie=None,
+                           capacidade=CAPACIDADE_SIMULTANEA):
+        """Retorna [(data, conflitos)] das datas (minutos, em ordem) que não cabem por `duracao` minutos.
+
+        Uma única consulta cobre todo o período das datas (ocorrências de uma série).
+        `ignorar_ids` e `ignorar_serie` excluem os agendamentos e as ocorrências que
+        serão movidos junto. Erros do banco são propagados, como em get_conflitos.
+        """
+        if not datas:
+            return []
+        ignorar_ids = set(ignorar_ids)
+        intervalos = [intervalo for intervalo in self._get_intervalos(datas[0], datas[-1] + duracao,
+                                                                      ignorar_serie=ignorar_serie)
+                      if intervalo[0] is None or intervalo[0] not in ignorar_ids]
+        ocupacao = OcupacaoIntervalos((comeco, termino) for _, _, comeco, termino in intervalos)
+        return [(data, [(agendamento_id, nome, comeco, termino - comeco)
+                        for agendamento_id, nome, comeco, termino in intervalos
+                        if comeco < data + duracao and termino > data])
+                for data in datas if ocupacao.maxima(data, data + duracao) >= capacidade]
+
+    def get_horarios_livres(self, dia, duracao, passo=PASSO_HORARIOS, capacidade=CAPACIDADE_SIMULTANEA):
+        """Lista os horários de início (minutos) em `dia` (date) com espaço para `duracao` minutos."""
+        abertura = date_to_minutes(dia) + HORARIO_ABERTURA
+        fechamento = date_to_minutes(dia) + HORARIO_FECHAMENTO
+        try:
+            intervalos = self._get_intervalos(abertura, fechamento)
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao listar horários livres: {e}")
+            return []
+        ocupacao = OcupacaoIntervalos((comeco, termino) for _, _, comeco, termino in intervalos)
+        return [inicio for inicio in range(abertura, fechamento - duracao + 1, passo)
+                if ocupacao.maxima(inicio, inicio + duracao) < capacidade]
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+from .database import get_connection, criar_historico
+from .metricas import instrumentar
+
+HORIZONTE_DIAS = 730 # Agendamentos mais antigos que isso (em dias) vão para o banco de histórico
+LOTE_ARQUIVAMENTO = 2000 # Linhas movidas por transação, para não travar os demais terminais
+
+# Tabela do banco anexado `historico`: mesmas colunas, na mesma ordem, de agendamentos
+# (as consultas fazem UNION ALL de SELECT * das duas). O id é o mesmo da tabela principal.
+ESQUEMA_HISTORICO = (
+    "PRAGMA historico.journal_mode = WAL",
+    """
+    CREATE TABLE IF NOT EXISTS historico.agendamentos (
+        id INTEGER PRIMARY KEY,
+        nome TEXT NOT NULL,
+        telefone TEXT,
+        email TEXT,
+        data INTEGER NOT NULL,
+        valor_centavos INTEGER NOT NULL DEFAULT 0,
+        servico TEXT NOT NULL,
+        duracao INTEGER NOT NULL DEFAULT 60,
+        versao INTEGER NOT NULL DEFAULT 0,
+        cliente_id INTEGER,
+        servico_id INTEGER,
+        serie_id INTEGER
+    )
+    """,
+    # Os mesmos índices de ordenação da tabela principal, para o UNION ALL ordenado ser uma intercalação
+    "CREATE INDEX IF NOT EXISTS historico.idx_historico_data ON agendamentos(data, id)",
+    "CREATE INDEX IF NOT EXISTS historico.idx_historico_nome ON agendamentos(nome COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS historico.idx_historico_servico ON agendamentos(servico, data)",
+    "CREATE INDEX IF NOT EXISTS historico.idx_historico_valor ON agendamentos(valor_centavos)",
+)
+
+def get_limite_historico(conn):
+    """Maior data (minutos) já arquivada, ou None se o histórico estiver vazio ou ausente."""
+    try:
+        return conn.execute("SELECT MAX(data) FROM historico.agendamentos").fetchone()[0]
+    except sqlite3.OperationalError: # banco em memória (sem histórico) ou nada arquivado ainda
+        return None
+
+@instrumentar()
+class HistoricoModel:
+    """Move agendamentos antigos para o banco de histórico anexado (ATTACH ... AS historico)."""
+
+    def criar_esquema(self):
+        """Cria o banco de histórico, sua tabela e seus índices, se ainda não existirem."""
+        criar_historico()
+        with get_connection() as conn:
+            for sql in ESQUEMA_HISTORICO:
+                conn.execute(sql)
+
+    def arquivar_lote(self, antes_de, lote=LOTE_ARQUIVAMENTO):
+        """Move até `lote` agendamentos com data < `antes_de` (minutos) e retorna quantos moveu.
+
+        A cópia e a remoção são duas transações, cada uma gravando um só arquivo: no
+        modo WAL, um commit envolvendo dois bancos não é atômico. Se o programa cair
+        entre as duas, as linhas ficam nos dois bancos e o próximo lote as regrava
+        (INSERT OR REPLACE) e remove. O resumo_diario não muda: a remoção pelos gatilhos
+        é compensada pelas linhas arquivadas. Retorna None em caso de erro.
+        """
+        selecao = "SELECT id FROM main.agendamentos WHERE data < ? ORDER BY data, id LIMIT ?"
+        ids_lote = "id IN (SELECT value FROM json_each(?))"
+        try:
+            with get_connection() as conn:
+                if not conn.execute("SELECT EXISTS (SELECT 1 FROM main.agendamentos WHERE data < ?)",
+                                    (antes_de,)).fetchone()[0]:
+                    return 0 # nada a arquivar: o banco de histórico nem precisa existir
+            self.criar_esquema()
+            with get_connection(immediate=True) as conn:
+                ids = json.dumps([row[0] for row in conn.execute(selecao, (antes_de, lote))])
+                conn.execute(f"INSERT OR REPLACE INTO historico.agendamentos "
+                             f"SELECT * FROM main.agendamentos WHERE {ids_lote}", (ids,))
+            with get_connection(immediate=True) as conn:
+                removidos = conn.execute(f"DELETE FROM main.agendamentos WHERE {ids_lote}", (ids,)).rowcount
+                conn.execute(f"""
+                    INSERT INTO resumo_diario(dia, servico_id, quantidade, total_centavos)
+                    SELECT data / 1440, servico_id, COUNT(*), SUM(valor_centavos)
+                      FROM historico.agendamentos WHERE {ids_lote}
+                     GROUP BY data / 1440, servico_id
+                    ON CONFLICT(dia, servico_id) DO UPDATE
+                        SET quantidade = quantidade + excluded.quantidade,
+                            total_centavos = total_centavos + excluded.total_centavos""", (ids,))
+            return removidos
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao arquivar agendamentos: {oe}")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao arquivar agendamentos: {e}")
+            return None
+
+    def contar(self):
+        """Retorna (agendamentos na tabela principal, agendamentos no histórico)."""
+        try:
+            with get_connection() as conn:
+                ativos = conn.execute("SELECT COUNT(*) FROM main.agendamentos").fetchone()[0]
+                try:
+                    arquivados = conn.execute("SELECT COUNT(*) FROM historico.agendamentos").fetchone()[0]
+                except sqlite3.OperationalError:
+                    arquivados = 0
+            return ativos, arquivados
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao contar agendamentos arquivados: {e}")
+            return 0, 0
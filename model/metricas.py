@@ -0,0 +1,186 @@
+"""Métricas de desempenho: latência por método, linhas retornadas e log de chamadas lentas.
+
+Models e AppController são decorados com `instrumentar`; cada chamada medida entra
+num histograma por nome ("AgendamentoModel.get_all_agendamentos",
+"AppController.handle_show_report"...). Chamadas acima de `limite_lento_ms` vão
+para o log de lentas junto com as instruções SQL (e parâmetros) que executaram.
+
+Desligadas (padrão), o custo por chamada é um teste de uma variável global.
+"""
+import functools
+import json
+import re
+import threading
+import time
+from types import FunctionType
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+
+LIMITE_LENTO_MS = 100 # Chamadas mais demoradas que isso entram no log de lentas
+TAMANHO_LOG_LENTAS = 200 # Entradas mantidas no log de lentas (as mais antigas saem)
+MAX_SQL_POR_CHAMADA = 20 # Instruções SQL guardadas por chamada medida
+MAX_TEXTO_PARAMETROS = 200 # Caracteres dos parâmetros guardados no log
+# Limites superiores (ms) das faixas do histograma; a última faixa é "acima de 10 s"
+FAIXAS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+ativo = False # Lido a cada chamada instrumentada; altere com ativar()/desativar()
+limite_lento_ms = LIMITE_LENTO_MS
+
+_lock = threading.Lock()
+_medidas = {} # nome -> _Medida
+_lentas = deque(maxlen=TAMANHO_LOG_LENTAS)
+_local = threading.local() # Pilha de listas de SQL das chamadas em andamento nesta thread
+_CO_GENERATOR = 0x20 # inspect.CO_GENERATOR, sem importar o inspect (lento) na inicialização
+
+class _Medida:
+    """Acumulado de um nome: chamadas, tempos, linhas e histograma."""
+    __slots__ = ("chamadas", "total", "maximo", "linhas", "faixas")
+
+    def __init__(self):
+        """Começa zerada."""
+        self.chamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.linhas = 0
+        self.faixas = [0] * (len(FAIXAS_MS) + 1)
+
+    def percentil(self, fracao):
+        """Estimativa (limite superior da faixa, em ms) do percentil dado."""
+        alvo = fracao * self.chamadas
+        acumulado = 0
+        for indice, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return FAIXAS_MS[indice] if indice < len(FAIXAS_MS) else self.maximo
+        return 0.0
+
+def ativar(limite_ms=LIMITE_LENTO_MS):
+    """Liga a coleta, com o limite (ms) do log de chamadas lentas."""
+    global ativo, limite_lento_ms
+    limite_lento_ms = limite_ms
+    ativo = True
+
+def desativar():
+    """Desliga a coleta; o que já foi medido é mantido."""
+    global ativo
+    ativo = False
+
+def zerar():
+    """Descarta todas as medidas e o log de lentas."""
+    with _lock:
+        _medidas.clear()
+        _lentas.clear()
+
+def registrar(nome, segundos, linhas=None, consultas=None):
+    """Soma uma chamada às medidas de `nome` e, se lenta, ao log de lentas."""
+    ms = segundos * 1000
+    with _lock:
+        medida = _medidas.get(nome)
+        if medida is None:
+            medida = _medidas[nome] = _Medida()
+        medida.chamadas += 1
+        medida.total += ms
+        medida.maximo = max(medida.maximo, ms)
+        medida.faixas[bisect_left(FAIXAS_MS, ms)] += 1
+        if linhas is not None:
+            medida.linhas += linhas
+        if ms >= limite_lento_ms:
+            _lentas.append({"quando": datetime.now().isoformat(timespec="milliseconds"), "nome": nome,
+                            "ms": round(ms, 3), "linhas": linhas, "sql": consultas or []})
+
+def registrar_sql(sql, parametros):
+    """Anota uma instrução executada na chamada medida em andamento nesta thread (se houver)."""
+    pilha = getattr(_local, "pilha", None)
+    if pilha and len(pilha[-1]) < MAX_SQL_POR_CHAMADA:
+        # Parâmetros de consultas a usuários podem conter hashes e salts: não vão para o log
+        texto = "(omitidos)" if "usuarios" in sql else repr(parametros)[:MAX_TEXTO_PARAMETROS]
+        pilha[-1].append((re.sub(r"\s+", " ", sql).strip(), texto))
+
+def _contar_linhas(resultado):
+    """Linhas de um retorno: tamanho de listas e de páginas (linhas, há_mais); None nos demais."""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, tuple) and resultado and isinstance(resultado[0], list):
+        return len(resultado[0])
+    return None
+
+def _medir(nome, func, args, kwargs):
+    """Executa func medindo tempo, linhas e as instruções SQL executadas durante a chamada."""
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    consultas = []
+    pilha.append(consultas)
+    inicio = time.perf_counter()
+    try:
+        resultado = func(*args, **kwargs)
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        if pilha: # a chamada externa também executou estas instruções
+            pilha[-1].extend(consultas[:MAX_SQL_POR_CHAMADA - len(pilha[-1])])
+    registrar(nome, duracao, _contar_linhas(resultado), consultas)
+    return resultado
+
+def _envolver(nome, func):
+    """Versão medida de `func` (geradores são medidos até o fim da iteração)."""
+    if func.__code__.co_flags & _CO_GENERATOR:
+        @functools.wraps(func)
+        def gerador_medido(*args, **kwargs):
+            if not ativo:
+                yield from func(*args, **kwargs)
+                return
+            inicio, linhas = time.perf_counter(), 0
+            try:
+                for item in func(*args, **kwargs):
+                    linhas += 1
+                    yield item
+            finally:
+                registrar(nome, time.perf_counter() - inicio, linhas)
+        return gerador_medido
+
+    @functools.wraps(func)
+    def medido(*args, **kwargs):
+        if not ativo:
+            return func(*args, **kwargs)
+        return _medir(nome, func, args, kwargs)
+    return medido
+
+def instrumentar(prefixos=None):
+    """Decorador de classe: mede os métodos públicos, ou só os que começam com `prefixos`."""
+    def decorar(cls):
+        for nome, func in list(vars(cls).items()):
+            if not isinstance(func, FunctionType) or nome.startswith("__"):
+                continue
+            if prefixos is None and nome.startswith("_"):
+                continue
+            if prefixos is not None and not nome.startswith(prefixos):
+                continue
+            setattr(cls, nome, _envolver(f"{cls.__name__}.{nome}", func))
+        return cls
+    return decorar
+
+def resumo():
+    """Medidas por nome, da maior soma de tempo para a menor (tempos em ms)."""
+    rotulos = [f"<={limite}" for limite in FAIXAS_MS] + [f">{FAIXAS_MS[-1]}"]
+    with _lock:
+        linhas = [{
+            "nome": nome, "chamadas": medida.chamadas, "total_ms": round(medida.total, 3),
+            "media_ms": round(medida.total / medida.chamadas, 3), "p50_ms": medida.percentil(0.5),
+            "p95_ms": medida.percentil(0.95), "max_ms": round(medida.maximo, 3), "linhas": medida.linhas,
+            "histograma": dict(zip(rotulos, medida.faixas)),
+        } for nome, medida in _medidas.items()]
+    return sorted(linhas, key=lambda linha: linha["total_ms"], reverse=True)
+
+def lentas():
+    """Cópia do log de chamadas lentas, da mais recente para a mais antiga."""
+    with _lock:
+        return list(reversed(_lentas))
+
+def exportar(caminho):
+    """Grava medidas e log de lentas em JSON."""
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"gerado_em": datetime.now().isoformat(timespec="seconds"), "ativo": ativo,
+                   "limite_lento_ms": limite_lento_ms, "medidas": resumo(), "lentas": lentas()},
+                  f, ensure_ascii=False, indent=2)
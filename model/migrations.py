@@ -0,0 +1,623 @@
+"""Migrações versionadas do esquema, controladas por PRAGMA user_version.
+
+Cada migração é um par (versão, passos); os passos são instruções SQL ou
+funções que recebem a conexão. Todas devem ser idempotentes, pois bancos
+criados antes do controle de versão começam em user_version = 0.
+"""
+import sqlite3
+from . import codec
+
+def _add_column(table, column, definition):
+    """Passo de migração que adiciona uma coluna apenas se ela ainda não existir.
+
+    `table` pode vir com o banco anexado à frente (ex.: "historico.agendamentos").
+    """
+    schema, _, name = table.rpartition(".")
+    def step(conn):
+        columns = {row[1] for row in conn.execute(f"PRAGMA {schema or 'main'}.table_info({name})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+def _migracao_tabelas_iniciais():
+    """Tabelas originais da aplicação (já existentes em bancos antigos)."""
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS agendamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT,
+            data TEXT NOT NULL,
+            valor_servico REAL,
+            servico TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL
+        )
+        """,
+    )
+
+def _migracao_indices_agendamentos():
+    """Índices para a listagem ordenada por data e buscas por cliente."""
+    return (
+        # Cobre a listagem principal (id, nome, data, serviço, valor) sem tocar a tabela.
+        """
+        CREATE INDEX IF NOT EXISTS idx_agendamentos_data
+            ON agendamentos(data, id, nome, servico, valor_servico)
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_nome ON agendamentos(nome COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_telefone ON agendamentos(telefone)",
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_servico ON agendamentos(servico, data)",
+    )
+
+def _resumo_diario_triggers(dia, grupo, valor, total, colunas, grupo_novo=None, grupo_atualizado=None):
+    """Triggers que mantêm resumo_diario a cada INSERT, DELETE e UPDATE OF `colunas` em agendamentos.
+
+    `dia` e `valor` são expressões com `{linha}` no lugar de NEW/OLD; `grupo` e `total` são as
+    colunas de resumo_diario. O grupo da linha nova é NEW.<grupo>, salvo `grupo_novo` (no
+    INSERT) e `grupo_atualizado` (no UPDATE). Cada versão do esquema gera os seus a partir daqui.
+    """
+    grupo_novo = grupo_novo or f"NEW.{grupo}"
+    somar = f"""INSERT INTO resumo_diario(dia, {grupo}, quantidade, {total})
+            VALUES ({dia.format(linha="NEW")}, {{grupo}}, 1, {valor.format(linha="NEW")})
+            ON CONFLICT(dia, {grupo}) DO UPDATE
+                SET quantidade = quantidade + 1, {total} = {total} + excluded.{total}"""
+    subtrair = f"""UPDATE resumo_diario
+               SET quantidade = quantidade - 1, {total} = {total} - {valor.format(linha="OLD")}
+             WHERE dia = {dia.format(linha="OLD")} AND {grupo} = OLD.{grupo};
+            DELETE FROM resumo_diario
+             WHERE dia = {dia.format(linha="OLD")} AND {grupo} = OLD.{grupo} AND quantidade <= 0"""
+    return (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_insert AFTER INSERT ON agendamentos
+        BEGIN
+            {somar.format(grupo=grupo_novo)};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_delete AFTER DELETE ON agendamentos
+        BEGIN
+            {subtrair};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_update
+        AFTER UPDATE OF {colunas} ON agendamentos
+        BEGIN
+            {subtrair};
+            {somar.format(grupo=grupo_atualizado or grupo_novo)};
+        END
+        """,
+    )
+
+def _migracao_resumo_diario():
+    """Tabela de totais por dia e serviço, mantida por triggers em agendamentos."""
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS resumo_diario (
+            dia TEXT NOT NULL,
+            servico TEXT NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, servico)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_resumo_diario_servico ON resumo_diario(servico, dia)",
+        *_resumo_diario_triggers("substr({linha}.data, 1, 10)", "servico", "COALESCE({linha}.valor_servico, 0)",
+                                 "total", "data, servico, valor_servico"),
+        # Recalcula o resumo a partir do histórico já existente.
+        "DELETE FROM resumo_diario",
+        """
+        INSERT INTO resumo_diario(dia, servico, quantidade, total)
+        SELECT substr(data, 1, 10), servico, COUNT(*), COALESCE(SUM(valor_servico), 0)
+          FROM agendamentos
+         GROUP BY substr(data, 1, 10), servico
+        """,
+    )
+
+def _migracao_duracao():
+    """Duração (em minutos) de cada agendamento, usada na checagem de conflitos."""
+    return (
+        _add_column("agendamentos", "duracao", "INTEGER NOT NULL DEFAULT 60"),
+    )
+
+def _create_busca_fts(conn):
+    """Cria o índice FTS5 de busca e seus triggers (ignorado se o SQLite não tiver FTS5)."""
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS agendamentos_fts USING fts5(
+                nome, telefone, email, servico,
+                content='agendamentos', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as oe:
+        print(f"FTS5 indisponível; a busca usará LIKE: {oe}")
+        return
+    for sql in (
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agendamentos_fts_insert AFTER INSERT ON agendamentos
+        BEGIN
+            INSERT INTO agendamentos_fts(rowid, nome, telefone, email, servico)
+            VALUES (NEW.id, NEW.nome, NEW.telefone, NEW.email, NEW.servico);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agendamentos_fts_delete AFTER DELETE ON agendamentos
+        BEGIN
+            INSERT INTO agendamentos_fts(agendamentos_fts, rowid, nome, telefone, email, servico)
+            VALUES ('delete', OLD.id, OLD.nome, OLD.telefone, OLD.email, OLD.servico);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agendamentos_fts_update
+        AFTER UPDATE OF nome, telefone, email, servico ON agendamentos
+        BEGIN
+            INSERT INTO agendamentos_fts(agendamentos_fts, rowid, nome, telefone, email, servico)
+            VALUES ('delete', OLD.id, OLD.nome, OLD.telefone, OLD.email, OLD.servico);
+            INSERT INTO agendamentos_fts(rowid, nome, telefone, email, servico)
+            VALUES (NEW.id, NEW.nome, NEW.telefone, NEW.email, NEW.servico);
+        END
+        """,
+        "INSERT INTO agendamentos_fts(agendamentos_fts) VALUES ('rebuild')",
+    ):
+        conn.execute(sql)
+
+def _migracao_busca_fts():
+    """Índice de texto completo sobre nome, telefone, email e serviço."""
+    return (_create_busca_fts,)
+
+# Triggers do resumo_diario com datas em minutos e valores em centavos (migração 6)
+RESUMO_DIARIO_TRIGGERS = _resumo_diario_triggers("{linha}.data / 1440", "servico", "{linha}.valor_centavos",
+                                                 "total_centavos", "data, servico, valor_centavos")
+
+def _legacy_minutes(text):
+    """Data TEXT antiga -> minutos; datas ilegíveis viram 0 (01/01/1970) para não perder a linha."""
+    minutes = codec.parse_legacy_text(text)
+    if minutes is None:
+        print(f"Data inválida convertida para 01/01/1970: {text!r}")
+        return 0
+    return minutes
+
+def _legacy_cents(value):
+    """Valor REAL antigo -> centavos inteiros."""
+    try:
+        return codec.parse_money(value) if value is not None else 0
+    except ValueError:
+        return 0
+
+def _converter_tipos(conn):
+    """Reconstrói agendamentos com data em minutos (INTEGER) e valor em centavos (INTEGER)."""
+    conn.create_function("_legacy_minutes", 1, _legacy_minutes, deterministic=True)
+    conn.create_function("_legacy_cents", 1, _legacy_cents, deterministic=True)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(agendamentos)")}
+    if "valor_centavos" in columns:
+        return
+    for sql in (
+        """
+        CREATE TABLE agendamentos_novo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT,
+            data INTEGER NOT NULL,
+            valor_centavos INTEGER NOT NULL DEFAULT 0,
+            servico TEXT NOT NULL,
+            duracao INTEGER NOT NULL DEFAULT 60
+        )
+        """,
+        """
+        INSERT INTO agendamentos_novo(id, nome, telefone, email, data, valor_centavos, servico, duracao)
+        SELECT id, nome, telefone, email, _legacy_minutes(data), _legacy_cents(valor_servico), servico, duracao
+          FROM agendamentos
+        """,
+        "DROP TABLE agendamentos",
+        "ALTER TABLE agendamentos_novo RENAME TO agendamentos",
+        """
+        CREATE INDEX idx_agendamentos_data
+            ON agendamentos(data, id, nome, servico, valor_centavos)
+        """,
+        "CREATE INDEX idx_agendamentos_nome ON agendamentos(nome COLLATE NOCASE)",
+        "CREATE INDEX idx_agendamentos_telefone ON agendamentos(telefone)",
+        "CREATE INDEX idx_agendamentos_servico ON agendamentos(servico, data)",
+        "DROP TABLE IF EXISTS resumo_diario",
+        """
+        CREATE TABLE resumo_diario (
+            dia INTEGER NOT NULL,
+            servico TEXT NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            total_centavos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, servico)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX idx_resumo_diario_servico ON resumo_diario(servico, dia)",
+        *RESUMO_DIARIO_TRIGGERS,
+        """
+        INSERT INTO resumo_diario(dia, servico, quantidade, total_centavos)
+        SELECT data / 1440, servico, COUNT(*), SUM(valor_centavos)
+          FROM agendamentos
+         GROUP BY data / 1440, servico
+        """,
+    ):
+        conn.execute(sql)
+    _create_busca_fts(conn) # Os triggers de busca caíram junto com a tabela antiga
+
+def _migracao_tipos_compactos():
+    """Datas em minutos inteiros e valores em centavos inteiros."""
+    return (_converter_tipos,)
+
+def _migracao_indice_valor():
+    """Índice para ordenar a listagem por valor sem ordenar a tabela inteira."""
+    return (
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_valor ON agendamentos(valor_centavos)",
+    )
+
+def _migracao_kdf_senhas():
+    """Algoritmo e parâmetros do hash de cada usuário; os existentes são SHA-256 legado."""
+    return (
+        _add_column("usuarios", "algoritmo", "TEXT NOT NULL DEFAULT 'sha256'"),
+        _add_column("usuarios", "parametros", "TEXT NOT NULL DEFAULT ''"),
+    )
+
+def _migracao_versoes():
+    """Contador global de alterações, versão por linha e registro das remoções.
+
+    Permite a outro terminal buscar só o que mudou desde a última versão vista e
+    detectar edições concorrentes (ver AgendamentoModel.get_alteracoes).
+    """
+    carimbo = "UPDATE alteracoes SET versao = versao + 1 WHERE id = 1;"
+    versao_atual = "(SELECT versao FROM alteracoes WHERE id = 1)"
+    return (
+        _add_column("agendamentos", "versao", "INTEGER NOT NULL DEFAULT 0"),
+        """
+        CREATE TABLE IF NOT EXISTS alteracoes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            versao INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO alteracoes(id, versao) VALUES (1, 0)",
+        """
+        CREATE TABLE IF NOT EXISTS agendamentos_removidos (
+            id INTEGER PRIMARY KEY,
+            versao INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_versao ON agendamentos(versao)",
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_removidos_versao ON agendamentos_removidos(versao)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_versao_insert AFTER INSERT ON agendamentos
+        BEGIN
+            {carimbo}
+            UPDATE agendamentos SET versao = {versao_atual} WHERE id = NEW.id;
+        END
+        """,
+        # A lista de colunas exclui `versao`, então o próprio carimbo não dispara o trigger de novo
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_versao_update
+        AFTER UPDATE OF nome, telefone, email, data, valor_centavos, servico, duracao ON agendamentos
+        BEGIN
+            {carimbo}
+            UPDATE agendamentos SET versao = {versao_atual} WHERE id = NEW.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_versao_delete AFTER DELETE ON agendamentos
+        BEGIN
+            {carimbo}
+            INSERT OR REPLACE INTO agendamentos_removidos(id, versao) VALUES (OLD.id, {versao_atual});
+        END
+        """,
+    )
+
+# Encontra o cliente de um agendamento: pelo telefone, senão pelo email e, se o agendamento não
+# tiver nenhum dos dois, pelo nome de um cliente também sem contato. Os campos vêm de `{nome}`,
+# `{telefone}` e `{email}` (NEW.* nos triggers, parâmetros nomeados na migração).
+_ID_CLIENTE = """COALESCE(
+    (SELECT id FROM clientes WHERE telefone = NULLIF({telefone}, '')),
+    (SELECT id FROM clientes WHERE email = NULLIF({email}, '') COLLATE NOCASE),
+    (SELECT id FROM clientes
+      WHERE COALESCE({telefone}, '') = '' AND COALESCE({email}, '') = ''
+        AND nome = {nome} COLLATE NOCASE AND +telefone IS NULL AND +email IS NULL
+      ORDER BY id LIMIT 1))""" # `+` deixa o nome escolher o índice: há muitos clientes sem contato
+# Cria o cliente se ainda não existe, completa telefone/email que faltavam (se ninguém mais
+# os usa) e grava cliente_id no agendamento `{id}` da `{tabela}`.
+_VINCULAR_CLIENTE = (
+    f"""INSERT INTO clientes(nome, telefone, email)
+        SELECT {{nome}}, NULLIF({{telefone}}, ''), NULLIF({{email}}, '') WHERE {_ID_CLIENTE} IS NULL""",
+    f"""UPDATE clientes SET telefone = {{telefone}}
+         WHERE id = {_ID_CLIENTE} AND telefone IS NULL AND COALESCE({{telefone}}, '') <> ''
+           AND NOT EXISTS (SELECT 1 FROM clientes WHERE telefone = {{telefone}})""",
+    f"""UPDATE clientes SET email = {{email}}
+         WHERE id = {_ID_CLIENTE} AND email IS NULL AND COALESCE({{email}}, '') <> ''
+           AND NOT EXISTS (SELECT 1 FROM clientes WHERE email = {{email}} COLLATE NOCASE)""",
+    f"UPDATE {{tabela}} SET cliente_id = {_ID_CLIENTE} WHERE id = {{id}}",
+)
+# Só nos triggers: o agendamento gravado por último dá o nome do cliente (a migração, que vai do
+# mais recente ao mais antigo, consegue o mesmo efeito sem renomear)
+_RENOMEAR_CLIENTE = f"UPDATE clientes SET nome = {{nome}} WHERE id = {_ID_CLIENTE} AND nome IS NOT {{nome}}"
+
+def _tem_historico(conn):
+    """Verdadeiro se o banco de histórico está anexado e já tem a tabela de agendamentos."""
+    if not conn.execute("SELECT 1 FROM pragma_database_list WHERE name = 'historico'").fetchone():
+        return False
+    return conn.execute("SELECT 1 FROM historico.sqlite_schema WHERE name = 'agendamentos'").fetchone() is not None
+
+def _vincular_clientes(conn):
+    """Cria os clientes a partir dos agendamentos existentes (inclusive os arquivados).
+
+    Percorre do agendamento mais recente para o mais antigo, com as mesmas regras
+    dos triggers, para que o nome mais recente de cada cliente prevaleça.
+    """
+    campos = {"nome": ":nome", "telefone": ":telefone", "email": ":email", "id": ":id"}
+    tabelas = ["main.agendamentos"]
+    if _tem_historico(conn):
+        _add_column("historico.agendamentos", "cliente_id", "INTEGER")(conn)
+        tabelas.append("historico.agendamentos")
+    for tabela in tabelas:
+        sqls = [sql.format(tabela=tabela, **campos) for sql in _VINCULAR_CLIENTE]
+        linhas = conn.execute(f"SELECT id, nome, telefone, email FROM {tabela} WHERE cliente_id IS NULL "
+                              f"ORDER BY id DESC").fetchall()
+        for agendamento_id, nome, telefone, email in linhas:
+            params = {"id": agendamento_id, "nome": nome, "telefone": telefone, "email": email}
+            for sql in sqls:
+                conn.execute(sql, params)
+
+def _migracao_clientes():
+    """Tabela de clientes (telefone e email únicos) referenciada por agendamentos.cliente_id.
+
+    Nome, telefone e email continuam em agendamentos como os dados usados naquele
+    atendimento (e nos índices de listagem e busca); triggers mantêm o vínculo e o nome
+    do cliente igual ao do agendamento gravado por último.
+    """
+    novo = {"nome": "NEW.nome", "telefone": "NEW.telefone", "email": "NEW.email", "id": "NEW.id",
+            "tabela": "agendamentos"}
+    corpo = ";\n".join(sql.format(**novo) for sql in (*_VINCULAR_CLIENTE, _RENOMEAR_CLIENTE))
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_telefone ON clientes(telefone)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_email ON clientes(email COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes(nome COLLATE NOCASE)",
+        _add_column("agendamentos", "cliente_id", "INTEGER REFERENCES clientes(id)"),
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_cliente ON agendamentos(cliente_id)",
+        _vincular_clientes,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clientes_insert AFTER INSERT ON agendamentos
+        BEGIN
+            {corpo};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clientes_update AFTER UPDATE OF nome, telefone, email ON agendamentos
+        BEGIN
+            {corpo};
+        END
+        """,
+    )
+
+def _resumir_historico(conn):
+    """Soma ao resumo_diario os agendamentos já arquivados, se houver histórico."""
+    if _tem_historico(conn):
+        conn.execute("""
+            INSERT INTO resumo_diario(dia, servico_id, quantidade, total_centavos)
+            SELECT data / 1440, servico_id, COUNT(*), SUM(valor_centavos)
+              FROM historico.agendamentos
+             GROUP BY data / 1440, servico_id
+            ON CONFLICT(dia, servico_id) DO UPDATE
+                SET quantidade = quantidade + excluded.quantidade,
+                    total_centavos = total_centavos + excluded.total_centavos""")
+
+def _catalogar_servicos(conn):
+    """Cria o catálogo a partir dos nomes de serviço já usados (inclusive nos arquivados).
+
+    Nomes que só diferem em maiúsculas ou acentos (codec.normalizar) viram um único
+    serviço, com o nome, o valor e a duração do agendamento mais recente; depois grava
+    servico_id em cada agendamento.
+    """
+    tabelas = ["main.agendamentos"]
+    if _tem_historico(conn):
+        _add_column("historico.agendamentos", "servico_id", "INTEGER")(conn)
+        tabelas.append("historico.agendamentos")
+    # Último uso de cada grafia (MAX traz as demais colunas da mesma linha), do mais recente ao mais antigo
+    usos = sorted((row for tabela in tabelas for row in conn.execute(
+        f"SELECT MAX(data), servico, valor_centavos, duracao FROM {tabela} GROUP BY servico")), reverse=True)
+    catalogo = {codec.normalizar(nome): servico_id for servico_id, nome in conn.execute("SELECT id, nome FROM servicos")}
+    ids = {}
+    for _data, servico, valor_centavos, duracao in usos:
+        chave = codec.normalizar(servico)
+        if chave not in catalogo:
+            catalogo[chave] = conn.execute(
+                "INSERT INTO servicos(nome, chave, valor_centavos, duracao) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET nome = nome RETURNING id",
+                (servico, chave, valor_centavos, duracao)).fetchone()[0]
+        ids[servico] = catalogo[chave]
+    for tabela in tabelas:
+        conn.executemany(f"UPDATE {tabela} SET servico_id = ? WHERE servico = ? AND servico_id IS NULL",
+                         [(servico_id, servico) for servico, servico_id in ids.items()])
+
+def _migracao_servicos():
+    """Catálogo de serviços (nome, valor e duração padrão) e resumo_diario agrupado pelo seu id.
+
+    O texto de agendamentos.servico continua gravado como o nome usado no atendimento;
+    servico_id é mantido pelos triggers a partir dele (criando o serviço no catálogo se
+    ainda não existir) e não muda quando o serviço é renomeado no catálogo. Os nomes são
+    comparados pela chave normalizada (função normalizar, registrada em cada conexão),
+    para que grafias com e sem acento caiam no mesmo serviço.
+    """
+    id_novo = "(SELECT id FROM servicos WHERE chave = normalizar(NEW.servico))"
+    # Mesmo serviço da linha antiga se o nome não mudou (ele pode ter sido renomeado no catálogo)
+    id_atualizado = f"CASE WHEN NEW.servico IS OLD.servico THEN OLD.servico_id ELSE {id_novo} END"
+    catalogar = (f"INSERT INTO servicos(nome, chave, valor_centavos, duracao) "
+                 f"SELECT NEW.servico, normalizar(NEW.servico), NEW.valor_centavos, NEW.duracao "
+                 f"WHERE {id_novo} IS NULL")
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS servicos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL COLLATE NOCASE UNIQUE,
+            chave TEXT NOT NULL UNIQUE, -- codec.normalizar(nome): minúsculas e sem acentos
+            valor_centavos INTEGER NOT NULL DEFAULT 0,
+            duracao INTEGER NOT NULL DEFAULT 60
+        )
+        """,
+        _add_column("agendamentos", "servico_id", "INTEGER REFERENCES servicos(id)"),
+        _catalogar_servicos,
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_servico_id ON agendamentos(servico_id)",
+        "DROP TRIGGER IF EXISTS trg_resumo_diario_insert",
+        "DROP TRIGGER IF EXISTS trg_resumo_diario_delete",
+        "DROP TRIGGER IF EXISTS trg_resumo_diario_update",
+        "DROP TABLE IF EXISTS resumo_diario",
+        """
+        CREATE TABLE resumo_diario (
+            dia INTEGER NOT NULL,
+            servico_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            total_centavos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, servico_id)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX idx_resumo_diario_servico ON resumo_diario(servico_id, dia)",
+        # O serviço entra no catálogo antes da linha, para os triggers AFTER já encontrarem seu id
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_servicos_insert BEFORE INSERT ON agendamentos
+        BEGIN
+            {catalogar};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_servicos_update BEFORE UPDATE OF servico ON agendamentos
+        WHEN NEW.servico IS NOT OLD.servico
+        BEGIN
+            {catalogar};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_servicos_id_insert AFTER INSERT ON agendamentos
+        BEGIN
+            UPDATE agendamentos SET servico_id = {id_novo} WHERE id = NEW.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_servicos_id_update AFTER UPDATE OF servico ON agendamentos
+        WHEN NEW.servico IS NOT OLD.servico
+        BEGIN
+            UPDATE agendamentos SET servico_id = {id_novo} WHERE id = NEW.id;
+        END
+        """,
+        *_resumo_diario_triggers("{linha}.data / 1440", "servico_id", "{linha}.valor_centavos", "total_centavos",
+                                 "data, servico, valor_centavos", grupo_novo=id_novo,
+                                 grupo_atualizado=id_atualizado),
+        # Recalcula o resumo (inclusive dos arquivados, que continuam nos totais)
+        """
+        INSERT INTO resumo_diario(dia, servico_id, quantidade, total_centavos)
+        SELECT data / 1440, servico_id, COUNT(*), SUM(valor_centavos)
+          FROM agendamentos
+         GROUP BY data / 1440, servico_id
+        """,
+        _resumir_historico,
+    )
+
+def _serie_no_historico(conn):
+    """Acrescenta serie_id ao histórico já existente, mantendo as colunas iguais às de agendamentos."""
+    if _tem_historico(conn):
+        _add_column("historico.agendamentos", "serie_id", "INTEGER")(conn)
+
+def _migracao_series():
+    """Séries de agendamentos recorrentes: a regra fica em series e as ocorrências viram agendamentos.
+
+    `gerada_ate` marca até onde (minutos, exclusivo) as ocorrências já foram gravadas
+    em agendamentos (com serie_id); `termino` é a data da última ocorrência da regra e
+    series_excecoes guarda as datas puladas. Ver model.recorrencia.
+    """
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS series (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT,
+            servico TEXT NOT NULL,
+            valor_centavos INTEGER NOT NULL DEFAULT 0,
+            duracao INTEGER NOT NULL DEFAULT 60,
+            inicio INTEGER NOT NULL,
+            frequencia TEXT NOT NULL CHECK (frequencia IN ('semanal', 'quinzenal', 'mensal')),
+            ate INTEGER,
+            vezes INTEGER,
+            termino INTEGER NOT NULL,
+            gerada_ate INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_series_gerada ON series(gerada_ate)",
+        """
+        CREATE TABLE IF NOT EXISTS series_excecoes (
+            serie_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+            data INTEGER NOT NULL,
+            PRIMARY KEY (serie_id, data)
+        ) WITHOUT ROWID
+        """,
+        _add_column("agendamentos", "serie_id", "INTEGER REFERENCES series(id)"),
+        "CREATE INDEX IF NOT EXISTS idx_agendamentos_serie ON agendamentos(serie_id, data)",
+        _serie_no_historico,
+    )
+
+MIGRATIONS = (
+    (1, _migracao_tabelas_iniciais()),
+    (2, _migracao_indices_agendamentos()),
+    (3, _migracao_resumo_diario()),
+    (4, _migracao_duracao()),
+    (5, _migracao_busca_fts()),
+    (6, _migracao_tipos_compactos()),
+    (7, _migracao_indice_valor()),
+    (8, _migracao_kdf_senhas()),
+    (9, _migracao_versoes()),
+    (10, _migracao_clientes()),
+    (11, _migracao_servicos()),
+    (12, _migracao_series()),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Retorna a versão do esquema gravada no banco (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(conn):
+    """Aplica, em ordem, as migrações pendentes; cada uma em sua própria transação.
+
+    Retorna a lista de versões aplicadas (vazia se o esquema já está atualizado).
+    """
+    current = get_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return []
+    applied = []
+    for version, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        try:
+            conn.execute("BEGIN")
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Regras de recorrência das séries de agendamentos e sua expansão sob demanda.
+
+Uma série guarda só a regra (primeira data, frequência e limite por data ou por
+número de vezes). As ocorrências são calculadas apenas para a janela consultada,
+sem percorrer as anteriores, e as que ainda não viraram agendamentos (data >=
+series.gerada_ate) entram na checagem de horários como ocupadas.
+"""
+import calendar
+from . import codec
+
+# Frequências aceitas -> dias entre ocorrências (None: mesmo dia do mês seguinte)
+FREQUENCIAS = {"semanal": 7, "quinzenal": 14, "mensal": None}
+MAX_OCORRENCIAS = 260 # Maior série aceita (cinco anos de ocorrências semanais)
+
+def _somar_meses(minutos, meses):
+    """Mesmo dia e horário `meses` meses depois (ou o último dia, em meses mais curtos)."""
+    dt = codec.minutes_to_datetime(minutos)
+    total = dt.month - 1 + meses
+    ano, mes = dt.year + total // 12, total % 12 + 1
+    dia = min(dt.day, calendar.monthrange(ano, mes)[1])
+    return codec.datetime_to_minutes(dt.replace(year=ano, month=mes, day=dia))
+
+def _enesima(inicio, frequencia, k):
+    """Data (minutos) da ocorrência de índice `k` (0 é a primeira) da regra."""
+    passo = FREQUENCIAS[frequencia]
+    return inicio + k * passo * codec.MINUTES_PER_DAY if passo else _somar_meses(inicio, k)
+
+def excede_maximo(inicio, frequencia, ate=None, vezes=None):
+    """Indica se a regra teria mais de MAX_OCORRENCIAS ocorrências (e seria cortada em silêncio)."""
+    if vezes is not None and vezes <= MAX_OCORRENCIAS:
+        return False
+    return ate is None or _enesima(inicio, frequencia, MAX_OCORRENCIAS) < ate
+
+def ocorrencias(inicio, frequencia, ate=None, vezes=None, de=None, antes_de=None):
+    """Gera em ordem as datas (minutos) das ocorrências da regra que caem em [de, antes_de).
+
+    `ate` (minutos, exclusivo) e `vezes` limitam a série; sem nenhum dos dois, ela
+    para em MAX_OCORRENCIAS. A expansão começa direto na ocorrência de `de`.
+    """
+    passo = FREQUENCIAS[frequencia]
+    vezes = min(vezes or MAX_OCORRENCIAS, MAX_OCORRENCIAS)
+    limites = [limite for limite in (ate, antes_de) if limite is not None]
+    limite = min(limites) if limites else None
+    k = 0
+    if de is not None and de > inicio:
+        if passo:
+            k = -(-(de - inicio) // (passo * codec.MINUTES_PER_DAY))
+        else:
+            primeira, alvo = codec.minutes_to_datetime(inicio), codec.minutes_to_datetime(de)
+            k = max(0, (alvo.year - primeira.year) * 12 + alvo.month - primeira.month - 1)
+    while k < vezes:
+        data = _enesima(inicio, frequencia, k)
+        if limite is not None and data >= limite:
+            break
+        if de is None or data >= de:
+            yield data
+        k += 1
+
+def ultima_ocorrencia(inicio, frequencia, ate=None, vezes=None):
+    """Data (minutos) da última ocorrência da regra, ou None se ela não tiver nenhuma."""
+    ultima = None
+    for ultima in ocorrencias(inicio, frequencia, ate, vezes):
+        pass
+    return ultima
+
+def ocorrencias_virtuais(conn, inicio, fim, ignorar_serie=None):
+    """(serie_id, nome, data, duracao) das ocorrências ainda não geradas que cruzam [inicio, fim)."""
+    sql = """SELECT id, nome, inicio, frequencia, ate, vezes, gerada_ate, duracao FROM series
+              WHERE gerada_ate < ? AND termino >= gerada_ate AND termino + duracao > ? AND id IS NOT ?"""
+    resultado = []
+    for serie_id, nome, primeira, frequencia, ate, vezes, gerada_ate, duracao in conn.execute(
+            sql, (fim, inicio, ignorar_serie)).fetchall():
+        de = max(gerada_ate, inicio - duracao + 1)
+        excecoes = {row[0] for row in conn.execute(
+            "SELECT data FROM series_excecoes WHERE serie_id = ? AND data >= ? AND data < ?", (serie_id, de, fim))}
+        resultado.extend((serie_id, nome, data, duracao)
+                         for data in ocorrencias(primeira, frequencia, ate, vezes, de, fim) if data not in excecoes)
+    return resultado
@@ -0,0 +1,54 @@
+import sqlite3
+from .database import get_connection
+from .codec import minutes_to_day
+from .metricas import instrumentar
+
+# Agrupamentos disponíveis: expressão SQL sobre resumo_diario usada no GROUP BY.
+# `dia` é o número do dia desde 1970-01-01 (ver model.codec).
+AGRUPAMENTOS = {
+    "dia": "dia",
+    "mes": "strftime('%m/%Y', dia * 86400, 'unixepoch')",
+    "ano": "strftime('%Y', dia * 86400, 'unixepoch')",
+    "servico": "servico_id",
+}
+# Rótulo exibido no lugar da chave do grupo, quando ela não é legível
+ROTULOS = {"servico": "(SELECT nome FROM servicos WHERE id = servico_id)"}
+
+@instrumentar()
+class RelatorioModel:
+    """Relatórios agregados (quantidade, total e média) lidos da tabela resumo_diario."""
+
+    def get_resumo(self, agrupamento, inicio=None, fim=None, servico=None):
+        """Retorna linhas (grupo, quantidade, total, média) para o agrupamento pedido.
+
+        Total e média são em centavos; `inicio`/`fim` (minutos) filtram o intervalo
+        [inicio, fim) pelos dias que os contêm.
+        """
+        grupo = AGRUPAMENTOS[agrupamento]
+        conditions, params = [], []
+        if inicio is not None:
+            conditions.append("dia >= ?"); params.append(minutes_to_day(inicio))
+        if fim is not None:
+            conditions.append("dia < ?"); params.append(minutes_to_day(fim))
+        if servico:
+            conditions.append("servico_id = (SELECT id FROM servicos WHERE chave = normalizar(?))"); params.append(servico)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "total DESC" if agrupamento == "servico" else "MIN(dia)"
+        sql = f"""SELECT {ROTULOS.get(agrupamento, grupo)}, SUM(quantidade), SUM(total_centavos) AS total,
+                         CAST(SUM(total_centavos) AS REAL) / SUM(quantidade)
+                    FROM resumo_diario {where}
+                   GROUP BY {grupo}
+                   ORDER BY {order}"""
+        try:
+            with get_connection() as conn:
+                return conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao gerar relatório agregado: {oe}")
+            return []
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao gerar relatório agregado: {e}")
+            return []
+
+    def get_todos_resumos(self, inicio=None, fim=None, servico=None):
+        """Retorna um dicionário {agrupamento: linhas} com todos os agrupamentos."""
+        return {agrupamento: self.get_resumo(agrupamento, inicio, fim, servico) for agrupamento in AGRUPAMENTOS}
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""Models que falam com o serviço HTTP (controller.api_server) em vez do SQLite local.
+
+Têm os mesmos métodos usados pelo AppController nos Models locais, para que ele
+funcione igual nos dois modos. Falhas de rede levantam RemoteError, tratada pelo
+callback de erro do worker do banco.
+"""
+import http.client
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlencode, quote
+from .agendamento import DURACAO_PADRAO, PAGE_SIZE, SEARCH_LIMIT, VersionConflictError
+from .metricas import instrumentar
+
+REQUEST_TIMEOUT = 30 # Segundos de espera por uma resposta
+DOWNLOAD_CHUNK_SIZE = 64 * 1024 # Bytes por leitura ao baixar exportações
+IDLE_REUSE_SECONDS = 30 # Conexões ociosas há mais tempo são reabertas (o servidor fecha em 60 s)
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE") # Podem ser reenviados se a conexão cair
+
+class RemoteError(Exception):
+    """Falha ao falar com o serviço HTTP (rede ou resposta de erro)."""
+    def __init__(self, message, status=None, payload=None):
+        """Guarda a mensagem, o status HTTP (None para falhas de rede) e o corpo de erro."""
+        super().__init__(message)
+        self.status = status
+        self.payload = payload or {}
+
+class ApiClient:
+    """Cliente HTTP/JSON com uma conexão keep-alive por thread."""
+
+    def __init__(self, base_url, token=None, timeout=REQUEST_TIMEOUT):
+        """Guarda o endereço (ex.: http://127.0.0.1:8765) e o token de acesso opcional."""
+        url = urlsplit(base_url)
+        if url.scheme != "http" or not url.hostname:
+            raise ValueError(f"Endereço do servidor inválido: {base_url}")
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        """Conexão HTTP da thread atual, aberta sob demanda (e reaberta se ficou ociosa)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and time.monotonic() - self._local.last_used > IDLE_REUSE_SECONDS:
+            self.close()
+            conn = None
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        self._local.last_used = time.monotonic()
+        return conn
+
+    def _send(self, method, path, body, content_type):
+        """Envia a requisição e retorna a resposta.
+
+        Se a conexão keep-alive tiver caído, reabre e reenvia uma vez, apenas para
+        métodos idempotentes (um POST repetido poderia gravar em dobro).
+        """
+        headers = {"Content-Type": content_type}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self.close()
+                if attempt or method not in IDEMPOTENT_METHODS:
+                    raise RemoteError(f"Conexão com o servidor perdida: {e}") from e
+            except OSError as e:
+                self.close()
+                raise RemoteError(f"Servidor indisponível em {self.host}:{self.port}: {e}") from e
+
+    def _check(self, response):
+        """Levanta RemoteError para respostas de erro, com a mensagem do servidor."""
+        if response.status == 200:
+            return
+        try:
+            payload = json.loads(response.read())
+        except ValueError:
+            payload = {}
+        message = payload.get("erro", response.reason)
+        raise RemoteError(f"{response.status}: {message}", response.status, payload)
+
+    def request(self, method, path, params=None, body=None):
+        """Faz uma chamada JSON e retorna o objeto decodificado da resposta."""
+        if params:
+            path += "?" + urlencode({key: value for key, value in params.items() if value is not None})
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        response = self._send(method, path, data, "application/json")
+        self._check(response)
+        return json.loads(response.read())
+
+    def import_file(self, path):
+        """Envia um arquivo de importação; retorna o resultado (ImportResult.to_dict)."""
+        with open(path, "rb") as f:
+            data = f.read()
+        response = self._send("POST", "/importacao?nome=" + quote(os.path.basename(path)), data,
+                              "application/octet-stream")
+        self._check(response)
+        return json.loads(response.read())
+
+    def export_file(self, path, fmt=None, inicio=None, fim=None, servico=None):
+        """Baixa uma exportação para `path`, em blocos; retorna o número de linhas."""
+        if fmt is None: # mesma regra de controller.export.export_format
+            lower_path = path.lower()
+            fmt = ("jsonl" if lower_path.endswith((".jsonl", ".ndjson"))
+                   else "json" if lower_path.endswith(".json") else "csv")
+        params = {"formato": fmt, "inicio": inicio, "fim": fim, "servico": servico}
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        response = self._send("GET", f"/exportacao?{query}", None, "application/json")
+        self._check(response)
+        with open(path, "wb") as f:
+            while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+        return int(response.getheader("X-Total-Linhas", "0"))
+
+    def close(self):
+        """Fecha a conexão da thread atual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+def _sort_params(ordenacao, descendente):
+    """Parâmetros de ordenação na forma da query string."""
+    return {"ordenacao": ordenacao, "descendente": "1" if descendente else "0"}
+
+@instrumentar()
+class RemoteAgendamentoModel:
+    """Mesmas consultas de AgendamentoModel, feitas pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def get_all_agendamentos(self, ordenacao="data", descendente=False, historico=False, inicio=None, fim=None,
+                             servico=None):
+        """Agendamentos do período na ordenação pedida (com os arquivados, se `historico`)."""
+        params = {**_sort_params(ordenacao, descendente), "historico": "1" if historico else "0",
+                  "inicio": inicio, "fim": fim, "servico": servico}
+        return self.client.request("GET", "/agendamentos/todos", params)["rows"]
+
+    def get_agendamentos_page(self, cursor=None, direction="next", limit=PAGE_SIZE,
+                              inicio=None, fim=None, servico=None, ordenacao="data", descendente=False):
+        """Página keyset (linhas, há_mais), como em AgendamentoModel."""
+        params = {"cursor": json.dumps(list(cursor)) if cursor is not None else None, "direction": direction,
+                  "limit": limit, "inicio": inicio, "fim": fim, "servico": servico,
+                  **_sort_params(ordenacao, descendente)}
+        result = self.client.request("GET", "/agendamentos", params)
+        return result["rows"], result["has_more"]
+
+    def search_agendamentos(self, termo, limit=SEARCH_LIMIT, ordenacao="data", descendente=False):
+        """Busca por prefixo."""
+        params = {"termo": termo, "limit": limit, **_sort_params(ordenacao, descendente)}
+        return self.client.request("GET", "/agendamentos/busca", params)["rows"]
+
+    def get_agendamento_by_id(self, agendamento_id):
+        """Um agendamento pelo id (None se não existir)."""
+        try:
+            return self.client.request("GET", f"/agendamentos/{int(agendamento_id)}")["row"]
+        except RemoteError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def save_if_available(self, agendamento_id, nome, telefone, email, data, valor_centavos, servico,
+                          duracao=DURACAO_PADRAO, versao=None):
+        """Checa conflitos e grava no servidor; retorna (linha gravada, conflitos).
+
+        Levanta VersionConflictError se `versao` não for mais a do servidor.
+        """
+        body = {"nome": nome, "telefone": telefone, "email": email, "data": data,
+                "valor_centavos": valor_centavos, "servico": servico, "duracao": duracao}
+        if agendamento_id is None:
+            result = self.client.request("POST", "/agendamentos", body=body)
+        else:
+            try:
+                result = self.client.request("PUT", f"/agendamentos/{int(agendamento_id)}",
+                                             body={**body, "versao": versao})
+            except RemoteError as e:
+                if e.status == 409:
+                    raise VersionConflictError(e.payload.get("row")) from None
+                raise
+        return result["row"], result["conflitos"]
+
+    def get_versao(self):
+        """Versão atual do contador de alterações do servidor."""
+        return self.client.request("GET", "/alteracoes")["versao"]
+
+    def get_alteracoes(self, desde):
+        """(versão atual, linhas alteradas, ids removidos) depois de `desde`."""
+        result = self.client.request("GET", "/alteracoes", {"desde": desde})
+        return result["versao"], result["rows"], result["removidos"]
+
+    def delete_agendamento(self, agendamento_id):
+        """Remove um agendamento; retorna a linha removida (None se não encontrado)."""
+        return self.client.request("DELETE", f"/agendamentos/{int(agendamento_id)}")["row"]
+
+@instrumentar()
+class RemoteUserModel:
+    """Cadastro e login pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def has_users(self):
+        """Verifica se existe algum usuário cadastrado."""
+        return self.client.request("GET", "/status")["has_users"]
+
+    def create_user(self, username, password):
+        """Cadastra o primeiro usuário; retorna (sucesso, mensagem)."""
+        try:
+            result = self.client.request("POST", "/usuarios", body={"username": username, "password": password})
+        except RemoteError as e:
+            return False, str(e)
+        return result["ok"], result["message"]
+
+    def check_credentials(self, username, password_to_check):
+        """Verifica usuário e senha no servidor."""
+        return self.client.request("POST", "/login", body={"username": username,
+                                                           "password": password_to_check})["valid"]
+
+@instrumentar()
+class RemoteRelatorioModel:
+    """Relatórios agregados pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def get_todos_resumos(self, inicio=None, fim=None, servico=None):
+        """Totais por dia, mês, ano e serviço."""
+        return self.client.request("GET", "/resumos", {"inicio": inicio, "fim": fim, "servico": servico})["resumos"]
+
+@instrumentar()
+class RemoteDisponibilidadeModel:
+    """Horários livres pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def get_horarios_livres(self, dia, duracao):
+        """Horários de início (minutos) livres em `dia` (date)."""
+        return self.client.request("GET", "/horarios-livres",
+                                   {"dia": dia.isoformat(), "duracao": duracao})["horarios"]
+
+@instrumentar()
+class RemoteClienteModel:
+    """Clientes pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def get_all_clientes(self):
+        """Todos os clientes (id, nome, telefone, email)."""
+        return self.client.request("GET", "/clientes")["clientes"]
+
+    def get_clientes(self, ids):
+        """Os clientes com os ids informados."""
+        return self.client.request("GET", "/clientes", {"ids": json.dumps(list(ids))})["clientes"]
+
+@instrumentar()
+class RemoteServicoModel:
+    """Catálogo de serviços pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def get_all_servicos(self):
+        """Todos os serviços (id, nome, valor_centavos, duracao)."""
+        return self.client.request("GET", "/servicos")["servicos"]
+
+    def save_servico(self, servico_id, nome, valor_centavos, duracao):
+        """Cria (servico_id None) ou altera um serviço; retorna (sucesso, mensagem)."""
+        body = {"nome": nome, "valor_centavos": valor_centavos, "duracao": duracao}
+        if servico_id is None:
+            result = self.client.request("POST", "/servicos", body=body)
+        else:
+            result = self.client.request("PUT", f"/servicos/{int(servico_id)}", body=body)
+        return result["ok"], result["message"]
+
+    def delete_servico(self, servico_id):
+        """Remove um serviço ainda não usado; retorna (sucesso, mensagem)."""
+        result = self.client.request("DELETE", f"/servicos/{int(servico_id)}")
+        return result["ok"], result["message"]
+
+@instrumentar()
+class RemoteSerieModel:
+    """Séries de agendamentos recorrentes pelo serviço HTTP."""
+    def __init__(self, client):
+        """Guarda o cliente HTTP compartilhado."""
+        self.client = client
+
+    def prever_serie(self, data, duracao, frequencia, ate=None, vezes=None):
+        """(datas das ocorrências, [(data, conflitos)]) de uma série ainda não gravada."""
+        result = self.client.request("POST", "/series/previa", body={"data": data, "duracao": duracao,
+                                                                      "frequencia": frequencia, "ate": ate,
+                                                                      "vezes": vezes})
+        return result["datas"], result["conflitos"]
+
+    def criar_serie(self, nome, telefone, email, data, valor_centavos, servico, duracao, frequencia,
+                    ate=None, vezes=None, pular=()):
+        """Grava a série no servidor; retorna (serie_id, agendamentos criados, conflitos)."""
+        body = {"nome": nome, "telefone": telefone, "email": email, "data": data,
+                "valor_centavos": valor_centavos, "servico": servico, "duracao": duracao,
+                "frequencia": frequencia, "ate": ate, "vezes": vezes, "pular": list(pular)}
+        result = self.client.request("POST", "/series", body=body)
+        return result["serie_id"], result["criados"], result["conflitos"]
+
+    def gerar_ocorrencias(self, ate=None):
+        """Grava no servidor as ocorrências das séries com data < `ate`; retorna quantas criou."""
+        return self.client.request("POST", "/series/geracao", body={"ate": ate})["criados"]
+
+    def alterar_seguintes(self, agendamento_id, nome, telefone, email, data, valor_centavos, servico, duracao,
+                          versao=None):
+        """Edita esta ocorrência e as seguintes; retorna (linhas alteradas, conflitos).
+
+        Levanta VersionConflictError se `versao` não for mais a do servidor.
+        """
+        body = {"nome": nome, "telefone": telefone, "email": email, "data": data,
+                "valor_centavos": valor_centavos, "servico": servico, "duracao": duracao, "versao": versao}
+        try:
+            result = self.client.request("PUT", f"/agendamentos/{int(agendamento_id)}/seguintes", body=body)
+        except RemoteError as e:
+            if e.status == 409:
+                raise VersionConflictError(e.payload.get("row")) from None
+            raise
+        return result["rows"], result["conflitos"]
+
+    def cancelar_seguintes(self, agendamento_id):
+        """Remove esta ocorrência e as seguintes da série; retorna os ids removidos."""
+        return self.client.request("DELETE", f"/agendamentos/{int(agendamento_id)}/seguintes")["removidos"]
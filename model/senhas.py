@@ -0,0 +1,91 @@
+"""Hash de senhas com KDF (PBKDF2 ou scrypt do hashlib) e custo calibrado para esta máquina.
+
+Cada usuário guarda o algoritmo e os parâmetros usados no seu hash, então o custo
+pode subir com o tempo sem invalidar senhas antigas: basta refazer o hash no login.
+"""
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+
+ALGORITMO_PADRAO = "pbkdf2_sha256" # Ou "scrypt"
+ALGORITMO_LEGADO = "sha256" # Um único SHA-256 de salt + senha (bancos antigos)
+TEMPO_ALVO = 0.25 # Segundos desejados por verificação de senha
+PBKDF2_ITERACOES_MINIMAS = 600_000
+SCRYPT_N_MINIMO = 2 ** 14
+SCRYPT_R, SCRYPT_P = 8, 1
+SCRYPT_MAXMEM = 256 * 1024 * 1024 # Limite de memória repassado ao hashlib.scrypt
+TAMANHO_HASH = 32 # Bytes gerados pelo KDF
+
+def encode_parametros(parametros):
+    """Serializa {"n": 16384, "r": 8} como "n=16384,r=8" para a coluna `parametros`."""
+    return ",".join(f"{chave}={valor}" for chave, valor in sorted(parametros.items()))
+
+def decode_parametros(texto):
+    """Inverso de encode_parametros; texto vazio vira dicionário vazio."""
+    if not texto:
+        return {}
+    return {chave: int(valor) for chave, valor in (item.split("=", 1) for item in texto.split(","))}
+
+def hash_senha(senha, salt, algoritmo, parametros):
+    """Calcula o hash hexadecimal de `senha` com o algoritmo e os parâmetros dados."""
+    if algoritmo == ALGORITMO_LEGADO:
+        return hashlib.sha256((salt + senha).encode("utf-8")).hexdigest()
+    senha_bytes, salt_bytes = senha.encode("utf-8"), salt.encode("utf-8")
+    if algoritmo == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", senha_bytes, salt_bytes, parametros["iteracoes"],
+                                   TAMANHO_HASH).hex()
+    if algoritmo == "scrypt":
+        return hashlib.scrypt(senha_bytes, salt=salt_bytes, n=parametros["n"], r=parametros["r"],
+                              p=parametros["p"], maxmem=SCRYPT_MAXMEM, dklen=TAMANHO_HASH).hex()
+    raise ValueError(f"Algoritmo de senha desconhecido: {algoritmo}")
+
+def verificar_senha(senha, salt, algoritmo, parametros, hash_esperado):
+    """Compara o hash da senha com o gravado em tempo constante."""
+    return hmac.compare_digest(hash_senha(senha, salt, algoritmo, parametros), hash_esperado)
+
+def _medir(algoritmo, parametros):
+    """Tempo (segundos) de um hash com os parâmetros dados."""
+    inicio = time.perf_counter()
+    hash_senha("calibracao", "0" * 32, algoritmo, parametros)
+    return time.perf_counter() - inicio
+
+def calibrar(algoritmo=ALGORITMO_PADRAO, tempo_alvo=TEMPO_ALVO):
+    """Escolhe parâmetros cujo hash leva cerca de `tempo_alvo` segundos nesta máquina.
+
+    Nunca fica abaixo dos mínimos (PBKDF2_ITERACOES_MINIMAS, SCRYPT_N_MINIMO).
+    """
+    if algoritmo == "pbkdf2_sha256":
+        amostra = 50_000
+        duracao = max(_medir(algoritmo, {"iteracoes": amostra}), 1e-6)
+        iteracoes = int(amostra * tempo_alvo / duracao) // 1000 * 1000
+        return {"iteracoes": max(iteracoes, PBKDF2_ITERACOES_MINIMAS)}
+    if algoritmo == "scrypt":
+        parametros = {"n": SCRYPT_N_MINIMO, "r": SCRYPT_R, "p": SCRYPT_P}
+        # Dobra n (custo e memória: 128 * n * r bytes) enquanto couber no tempo e, com folga
+        # de 2x, no limite de memória
+        while (_medir(algoritmo, parametros) * 2 <= tempo_alvo
+               and 128 * (parametros["n"] * 2) * SCRYPT_R * 2 <= SCRYPT_MAXMEM):
+            parametros["n"] *= 2
+        return parametros
+    raise ValueError(f"Algoritmo de senha desconhecido: {algoritmo}")
+
+@lru_cache(maxsize=None)
+def _parametros_calibrados(algoritmo, tempo_alvo):
+    """Calibração feita uma vez por processo e algoritmo, na forma serializada."""
+    return encode_parametros(calibrar(algoritmo, tempo_alvo))
+
+def parametros_atuais(algoritmo=ALGORITMO_PADRAO, tempo_alvo=TEMPO_ALVO):
+    """Retorna (algoritmo, parâmetros serializados) a usar em novos hashes."""
+    return algoritmo, _parametros_calibrados(algoritmo, tempo_alvo)
+
+def precisa_rehash(algoritmo, parametros, tempo_alvo=TEMPO_ALVO):
+    """Indica se o hash gravado usa algoritmo legado/diferente ou menos da metade do custo atual.
+
+    A margem evita refazer o hash a cada login só por variação na calibração.
+    """
+    atual_algoritmo, atuais = parametros_atuais(tempo_alvo=tempo_alvo)
+    if algoritmo != atual_algoritmo:
+        return True
+    gravados, atuais = decode_parametros(parametros), decode_parametros(atuais)
+    return any(gravados.get(chave, 0) * 2 <= valor for chave, valor in atuais.items())
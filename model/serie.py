@@ -0,0 +1,172 @@
+import sqlite3
+from datetime import datetime
+from .database import get_connection
+from .agendamento import VersionConflictError
+from .disponibilidade import DisponibilidadeModel
+from .recorrencia import ocorrencias, ultima_ocorrencia
+from .metricas import instrumentar
+from . import codec
+
+HORIZONTE_SERIES_DIAS = 60 # Ocorrências até essa distância de hoje (em dias) já ficam gravadas como agendamentos
+
+_INSERIR_OCORRENCIA = """INSERT INTO agendamentos(nome, telefone, email, data, valor_centavos, servico, duracao, serie_id)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+def horizonte(agora=None):
+    """Data (minutos, meia-noite) até a qual as ocorrências das séries devem estar gravadas."""
+    agora = codec.datetime_to_minutes(agora or datetime.now())
+    return agora - agora % codec.MINUTES_PER_DAY + (HORIZONTE_SERIES_DIAS + 1) * codec.MINUTES_PER_DAY
+
+@instrumentar()
+class SerieModel:
+    """Séries de agendamentos recorrentes: criação, geração das ocorrências e edição "desta em diante".
+
+    A regra é gravada uma vez em series; as ocorrências só viram linhas de agendamentos
+    (com serie_id) até o horizonte pedido, em lote, numa única transação. As demais são
+    calculadas sob demanda (model.recorrencia) e contam como ocupadas na checagem de horários.
+    """
+
+    def prever_serie(self, data, duracao, frequencia, ate=None, vezes=None):
+        """Retorna (datas das ocorrências, [(data, conflitos)]) de uma série ainda não gravada."""
+        datas = list(ocorrencias(data, frequencia, ate, vezes))
+        return datas, DisponibilidadeModel().get_conflitos_lote(datas, duracao)
+
+    def criar_serie(self, nome, telefone, email, data, valor_centavos, servico, duracao, frequencia,
+                    ate=None, vezes=None, pular=(), gerar_ate=None):
+        """Grava a regra e as ocorrências até `gerar_ate` (padrão: horizonte()) numa só transação.
+
+        As datas de `pular` (conflitos já mostrados ao usuário) ficam como exceções da série.
+        Retorna (serie_id, agendamentos criados, conflitos); se surgirem conflitos fora de
+        `pular`, nada é gravado e serie_id é None. Erros do banco são propagados.
+        """
+        gerar_ate = horizonte() if gerar_ate is None else gerar_ate
+        pular = set(pular)
+        datas = list(ocorrencias(data, frequencia, ate, vezes))
+        if not datas:
+            return None, 0, []
+        with get_connection(immediate=True) as conn:
+            conflitos = [conflito for conflito in DisponibilidadeModel().get_conflitos_lote(datas, duracao)
+                         if conflito[0] not in pular]
+            if conflitos:
+                return None, 0, conflitos
+            gerada_ate = max(gerar_ate, data) if datas[-1] >= gerar_ate else datas[-1] + 1
+            serie_id = conn.execute(
+                """INSERT INTO series(nome, telefone, email, servico, valor_centavos, duracao, inicio,
+                                      frequencia, ate, vezes, termino, gerada_ate)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (nome, telefone, email, servico, valor_centavos, duracao, data, frequencia, ate, vezes,
+                 datas[-1], gerada_ate)).lastrowid
+            conn.executemany("INSERT INTO series_excecoes(serie_id, data) VALUES (?, ?)",
+                             [(serie_id, excecao) for excecao in sorted(pular)])
+            linhas = [(nome, telefone, email, ocorrencia, valor_centavos, servico, duracao, serie_id)
+                      for ocorrencia in datas if ocorrencia < gerada_ate and ocorrencia not in pular]
+            conn.executemany(_INSERIR_OCORRENCIA, linhas)
+        return serie_id, len(linhas), []
+
+    def gerar_ocorrencias(self, ate=None):
+        """Grava como agendamentos as ocorrências de todas as séries com data < `ate` (padrão: horizonte()).
+
+        Tudo num único executemany e numa única transação; retorna quantos agendamentos
+        criou (None em caso de erro). Sem séries pendentes, custa uma consulta indexada.
+        """
+        ate = horizonte() if ate is None else ate
+        sql = """SELECT id, nome, telefone, email, servico, valor_centavos, duracao, inicio, frequencia,
+                        ate, vezes, gerada_ate FROM series
+                  WHERE gerada_ate < ? AND termino >= gerada_ate"""
+        try:
+            with get_connection(immediate=True) as conn:
+                linhas, geradas = [], []
+                for (serie_id, nome, telefone, email, servico, valor_centavos, duracao, inicio, frequencia,
+                     limite, vezes, gerada_ate) in conn.execute(sql, (ate,)).fetchall():
+                    excecoes = {row[0] for row in conn.execute(
+                        "SELECT data FROM series_excecoes WHERE serie_id = ? AND data >= ? AND data < ?",
+                        (serie_id, gerada_ate, ate))}
+                    linhas.extend((nome, telefone, email, ocorrencia, valor_centavos, servico, duracao, serie_id)
+                                  for ocorrencia in ocorrencias(inicio, frequencia, limite, vezes, gerada_ate, ate)
+                                  if ocorrencia not in excecoes)
+                    geradas.append((ate, serie_id))
+                conn.executemany(_INSERIR_OCORRENCIA, linhas)
+                conn.executemany("UPDATE series SET gerada_ate = ? WHERE id = ?", geradas)
+            return len(linhas)
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao gerar ocorrências das séries: {oe}")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao gerar ocorrências das séries: {e}")
+            return None
+
+    def alterar_seguintes(self, agendamento_id, nome, telefone, email, data, valor_centavos, servico, duracao,
+                          versao=None):
+        """Aplica a edição a esta ocorrência e às seguintes da série (gravadas ou não).
+
+        As ocorrências seguintes recebem os mesmos dados e o mesmo deslocamento de
+        horário desta; as anteriores não mudam. Retorna (linhas alteradas, conflitos);
+        com conflitos, nada é gravado. Levanta VersionConflictError se a linha mudou.
+        """
+        with get_connection(immediate=True) as conn:
+            atual = conn.execute("SELECT * FROM agendamentos WHERE id = ?", (agendamento_id,)).fetchone()
+            if atual is None or atual[11] is None:
+                return [], []
+            if versao is not None and atual[8] != versao:
+                raise VersionConflictError(atual)
+            serie_id, desde, deslocamento = atual[11], atual[4], data - atual[4]
+            serie = conn.execute("SELECT inicio, frequencia, ate, vezes, gerada_ate FROM series WHERE id = ?",
+                                 (serie_id,)).fetchone()
+            inicio, frequencia, limite, vezes, gerada_ate = serie
+            seguintes = conn.execute("SELECT id, data FROM agendamentos WHERE serie_id = ? AND data >= ? "
+                                     "ORDER BY data", (serie_id, desde)).fetchall()
+            excecoes = {row[0] for row in conn.execute(
+                "SELECT data FROM series_excecoes WHERE serie_id = ? AND data >= ?", (serie_id, gerada_ate))}
+            virtuais = [ocorrencia for ocorrencia in ocorrencias(inicio, frequencia, limite, vezes, gerada_ate)
+                        if ocorrencia not in excecoes]
+            conflitos = DisponibilidadeModel().get_conflitos_lote(
+                [ocorrencia + deslocamento for _, ocorrencia in seguintes] + [v + deslocamento for v in virtuais],
+                duracao, ignorar_ids=[row[0] for row in seguintes], ignorar_serie=serie_id)
+            if conflitos:
+                return [], [conflito for _, lista in conflitos for conflito in lista]
+            conn.execute("""UPDATE series SET nome = ?, telefone = ?, email = ?, servico = ?, valor_centavos = ?,
+                                   duracao = ?, inicio = inicio + ?, ate = ate + ?, termino = termino + ?,
+                                   gerada_ate = gerada_ate + ?
+                             WHERE id = ?""",
+                         (nome, telefone, email, servico, valor_centavos, duracao, deslocamento, deslocamento,
+                          deslocamento, deslocamento, serie_id))
+            if deslocamento:
+                conn.execute("UPDATE series_excecoes SET data = data + ? WHERE serie_id = ? AND data >= ?",
+                             (deslocamento, serie_id, gerada_ate))
+            alterados = {row[0] for row in conn.execute(
+                """UPDATE agendamentos SET nome = ?, telefone = ?, email = ?, data = data + ?,
+                          valor_centavos = ?, servico = ?, duracao = ?
+                    WHERE serie_id = ? AND data >= ?
+                   RETURNING id""",
+                (nome, telefone, email, deslocamento, valor_centavos, servico, duracao, serie_id, desde))}
+            # Relidas depois do UPDATE: o RETURNING não enxerga a versão carimbada pelos gatilhos AFTER
+            return [row for row in conn.execute(
+                "SELECT * FROM agendamentos WHERE serie_id = ? AND data >= ? ORDER BY data",
+                (serie_id, min(desde, data))) if row[0] in alterados], []
+
+    def cancelar_seguintes(self, agendamento_id):
+        """Remove esta ocorrência e as seguintes da série e encerra a regra antes dela.
+
+        Retorna os ids removidos (lista vazia se o agendamento não pertence a uma série,
+        None em caso de erro).
+        """
+        try:
+            with get_connection(immediate=True) as conn:
+                atual = conn.execute("SELECT serie_id, data FROM agendamentos WHERE id = ?",
+                                     (agendamento_id,)).fetchone()
+                if atual is None or atual[0] is None:
+                    return []
+                serie_id, desde = atual
+                inicio, frequencia, vezes = conn.execute(
+                    "SELECT inicio, frequencia, vezes FROM series WHERE id = ?", (serie_id,)).fetchone()
+                ultima = ultima_ocorrencia(inicio, frequencia, desde, vezes)
+                conn.execute("UPDATE series SET ate = ?, termino = ? WHERE id = ?",
+                             (desde, ultima if ultima is not None else inicio - 1, serie_id))
+                return [row[0] for row in conn.execute(
+                    "DELETE FROM agendamentos WHERE serie_id = ? AND data >= ? RETURNING id", (serie_id, desde))]
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao cancelar ocorrências da série: {oe}")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao cancelar ocorrências da série: {e}")
+            return None
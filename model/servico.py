@@ -0,0 +1,98 @@
+import sqlite3
+from .codec import normalizar
+from .database import get_connection
+from .metricas import instrumentar
+
+class CatalogoServicos:
+    """Cópia em memória do catálogo de serviços, para preencher valor e duração sem consultar o banco.
+
+    Carregada com carregar() e descartada com invalidar() sempre que o catálogo é
+    editado (ou surge um agendamento com um serviço que ela não conhece).
+    """
+    def __init__(self):
+        """Começa vazio e inválido."""
+        self.servicos = {} # id -> (id, nome, valor_centavos, duracao)
+        self._por_nome = {} # nome normalizado (codec.normalizar) -> (id, nome, valor_centavos, duracao)
+        self.valido = False
+
+    def carregar(self, servicos):
+        """Substitui o conteúdo pelas linhas (id, nome, valor_centavos, duracao)."""
+        self.servicos = {servico[0]: tuple(servico) for servico in servicos}
+        self._por_nome = {normalizar(servico[1]): servico for servico in self.servicos.values()}
+        self.valido = True
+
+    def invalidar(self):
+        """Marca o conteúdo como desatualizado (o próximo carregar() o substitui)."""
+        self.valido = False
+
+    def buscar(self, nome):
+        """Serviço com esse nome (sem diferenciar maiúsculas nem acentos), ou None."""
+        return self._por_nome.get(normalizar(nome.strip()))
+
+    def nomes(self):
+        """Nomes dos serviços em ordem alfabética."""
+        return sorted((servico[1] for servico in self.servicos.values()), key=str.casefold)
+
+@instrumentar()
+class ServicoModel:
+    """Cadastro de serviços (nome, valor e duração padrão) usado pelos agendamentos."""
+
+    def get_all_servicos(self):
+        """Retorna todos os serviços como (id, nome, valor_centavos, duracao), por nome."""
+        sql = "SELECT id, nome, valor_centavos, duracao FROM servicos ORDER BY nome"
+        try:
+            with get_connection() as conn:
+                return conn.execute(sql).fetchall()
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao buscar serviços: {oe}")
+            return []
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao buscar serviços: {e}")
+            return []
+
+    def save_servico(self, servico_id, nome, valor_centavos, duracao):
+        """Cria (servico_id None) ou altera um serviço; retorna (sucesso, mensagem).
+
+        Renomear não altera o nome gravado nos agendamentos já feitos, que continuam
+        ligados ao serviço pelo id (e somados sob o novo nome nos relatórios).
+        """
+        try:
+            with get_connection() as conn:
+                if servico_id is None:
+                    conn.execute("INSERT INTO servicos(nome, chave, valor_centavos, duracao) VALUES (?, ?, ?, ?)",
+                                 (nome, normalizar(nome), valor_centavos, duracao))
+                    return True, "Serviço cadastrado!"
+                if conn.execute("UPDATE servicos SET nome = ?, chave = ?, valor_centavos = ?, duracao = ? WHERE id = ?",
+                                (nome, normalizar(nome), valor_centavos, duracao, servico_id)).rowcount == 0:
+                    return False, "Serviço não encontrado."
+                return True, "Serviço atualizado!"
+        except sqlite3.IntegrityError:
+            return False, f"Já existe um serviço chamado {nome}."
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao salvar serviço: {oe}")
+            return False, f"Erro operacional ao salvar serviço: {oe}"
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao salvar serviço: {e}")
+            return False, f"Erro ao salvar serviço: {e}"
+
+    def delete_servico(self, servico_id):
+        """Remove um serviço que nenhum agendamento (nem arquivado) usa; retorna (sucesso, mensagem)."""
+        usos = ["SELECT 1 FROM main.agendamentos WHERE servico_id = ?"]
+        try:
+            with get_connection(immediate=True) as conn:
+                try:
+                    conn.execute("SELECT 1 FROM historico.agendamentos LIMIT 0")
+                    usos.append("SELECT 1 FROM historico.agendamentos WHERE servico_id = ?")
+                except sqlite3.OperationalError: # banco em memória ou histórico ainda não criado
+                    pass
+                if any(conn.execute(f"{sql} LIMIT 1", (servico_id,)).fetchone() for sql in usos):
+                    return False, "O serviço já foi usado em agendamentos e não pode ser removido."
+                if conn.execute("DELETE FROM servicos WHERE id = ?", (servico_id,)).rowcount == 0:
+                    return False, "Serviço não encontrado."
+                return True, "Serviço removido!"
+        except sqlite3.OperationalError as oe:
+            print(f"Erro operacional ao remover serviço: {oe}")
+            return False, f"Erro operacional ao remover serviço: {oe}"
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao remover serviço: {e}")
+            return False, f"Erro ao remover serviço: {e}"
@@ -1,8 +1,10 @@
 import sqlite3
-import hashlib
 import os
-from .database import connect_db
+from .database import get_connection
+from . import senhas
+from .metricas import instrumentar
 
+@instrumentar()
 class UserModel:
     """Gerencia as operações relacionadas a usuários no banco de dados."""
 
@@ -11,26 +13,25 @@ class UserModel:
         return os.urandom(16).hex()
 
     def _hash_password(self, password, salt):
-        """Gera o hash de uma senha usando SHA256 com um salt."""
-        salted_password = salt + password
-        hashed = hashlib.sha256(salted_password.encode('utf-8')).hexdigest()
-        return hashed
+        """Gera o hash de uma senha com o KDF e o custo calibrado atuais.
+
+        Retorna (hash, algoritmo, parâmetros serializados). Lento de propósito:
+        deve rodar no worker do banco, nunca na thread do Tk.
+        """
+        algoritmo, parametros = senhas.parametros_atuais()
+        password_hash = senhas.hash_senha(password, salt, algoritmo, senhas.decode_parametros(parametros))
+        return password_hash, algoritmo, parametros
 
     def create_user(self, username, password):
         """Cria um novo usuário com senha hasheada e salt."""
-        conn = connect_db()
-        if conn is None:
-            return False, "Erro de conexão com o banco."
-
         salt = self._generate_salt()
-        password_hash = self._hash_password(password, salt)
+        password_hash, algoritmo, parametros = self._hash_password(password, salt)
         
-        sql = ''' INSERT INTO usuarios(username, password_hash, salt)
-                  VALUES(?,?,?) '''
+        sql = ''' INSERT INTO usuarios(username, password_hash, salt, algoritmo, parametros)
+                  VALUES(?,?,?,?,?) '''
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (username, password_hash, salt))
-            conn.commit()
+            with get_connection() as conn:
+                conn.execute(sql, (username, password_hash, salt, algoritmo, parametros))
             return True, "Usuário criado com sucesso!"
         except sqlite3.IntegrityError:
             return False, "Nome de usuário já existe."
@@ -40,57 +41,69 @@ class UserModel:
         except sqlite3.Error as e:
             print(f"Erro SQLite ao criar usuário: {e}")
             return False, f"Erro ao criar usuário: {e}"
-        finally:
-            if conn:
-                conn.close()
 
     def check_credentials(self, username, password_to_check):
-        """Verifica as credenciais (username e senha) de um usuário."""
-        conn = connect_db()
-        if conn is None:
-            return False
+        """Verifica as credenciais (username e senha) de um usuário.
+
+        Hashes legados (SHA-256) ou com custo abaixo do atual são refeitos com o KDF
+        atual após um login bem-sucedido, quando a senha em texto está disponível.
+        """
+        valid, rehash = self.verify_credentials(username, password_to_check)
+        if rehash:
+            self.update_password_hash(*rehash)
+        return valid
 
-        sql = "SELECT password_hash, salt FROM usuarios WHERE username = ?"
+    def verify_credentials(self, username, password_to_check):
+        """Verifica as credenciais sem gravar nada; retorna (válidas, novo hash ou None).
+
+        O novo hash, (user_id, hash, salt, algoritmo, parâmetros), vem preenchido quando
+        o gravado precisa ser refeito e deve ser passado a update_password_hash.
+        """
+        sql = "SELECT id, password_hash, salt, algoritmo, parametros FROM usuarios WHERE username = ?"
         try:
-            cur = conn.cursor()
-            cur.execute(sql, (username,))
-            row = cur.fetchone()
-            
-            if row:
-                stored_password_hash, salt = row
-                hash_to_check = self._hash_password(password_to_check, salt)
-                if hash_to_check == stored_password_hash:
-                    return True
-            return False
+            with get_connection() as conn:
+                row = conn.execute(sql, (username,)).fetchone()
+            if not row:
+                # Mesmo custo de um usuário existente, para o tempo de resposta não revelar quem existe
+                algoritmo, parametros = senhas.parametros_atuais()
+                senhas.verificar_senha(password_to_check, self._generate_salt(), algoritmo,
+                                       senhas.decode_parametros(parametros), "0" * 2 * senhas.TAMANHO_HASH)
+                return False, None
+            user_id, stored_password_hash, salt, algoritmo, parametros = row
+            if not senhas.verificar_senha(password_to_check, salt, algoritmo,
+                                          senhas.decode_parametros(parametros), stored_password_hash):
+                return False, None
+            if senhas.precisa_rehash(algoritmo, parametros):
+                salt = self._generate_salt()
+                password_hash, algoritmo, parametros = self._hash_password(password_to_check, salt)
+                return True, (user_id, password_hash, salt, algoritmo, parametros)
+            return True, None
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao verificar credenciais: {oe}")
-            return False
+            return False, None
         except sqlite3.Error as e:
             print(f"Erro SQLite ao verificar credenciais: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+            return False, None
+
+    def update_password_hash(self, user_id, password_hash, salt, algoritmo, parametros):
+        """Grava o hash refeito por verify_credentials (falha apenas é registrada)."""
+        sql = "UPDATE usuarios SET password_hash = ?, salt = ?, algoritmo = ?, parametros = ? WHERE id = ?"
+        try:
+            with get_connection() as conn:
+                conn.execute(sql, (password_hash, salt, algoritmo, parametros, user_id))
+        except sqlite3.Error as e:
+            print(f"Erro SQLite ao atualizar hash de senha: {e}")
 
     def has_users(self):
         """Verifica se existe algum usuário cadastrado no sistema."""
-        conn = connect_db()
-        if conn is None:
-            print("Não foi possível conectar ao DB para verificar usuários.")
-            return False 
-
         sql = "SELECT COUNT(id) FROM usuarios"
         try:
-            cur = conn.cursor()
-            cur.execute(sql)
-            count = cur.fetchone()[0]
+            with get_connection() as conn:
+                count = conn.execute(sql).fetchone()[0]
             return count > 0
         except sqlite3.OperationalError as oe:
             print(f"Erro operacional ao contar usuários: {oe}")
             return False 
         except sqlite3.Error as e:
             print(f"Erro SQLite ao contar usuários: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
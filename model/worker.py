@@ -0,0 +1,54 @@
+import threading
+from queue import SimpleQueue, Empty
+
+class DatabaseWorker:
+    """Executa chamadas aos Models em uma thread dedicada ao banco de dados.
+
+    Os resultados não chamam callbacks na thread do worker: ficam em uma fila
+    até que a thread da interface chame `process_results()` (via `after()`).
+    Usa uma thread simples em vez de concurrent.futures, cujo import (com logging)
+    pesa na abertura do programa.
+    """
+    def __init__(self):
+        """Inicializa as filas de trabalhos e de resultados e inicia a thread."""
+        self._jobs = SimpleQueue()
+        self._results = SimpleQueue()
+        self.pending = 0
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Laço da thread: executa os trabalhos em ordem até receber None."""
+        while (job := self._jobs.get()) is not None:
+            func, args, kwargs, on_success, on_error = job
+            try:
+                self._results.put((None, func(*args, **kwargs), on_success, on_error))
+            except Exception as e:
+                self._results.put((e, None, on_success, on_error))
+
+    def submit(self, func, *args, on_success=None, on_error=None, **kwargs):
+        """Agenda `func(*args, **kwargs)` no worker; os callbacks rodam em process_results()."""
+        self.pending += 1
+        self._jobs.put((func, args, kwargs, on_success, on_error))
+
+    def process_results(self):
+        """Executa os callbacks dos trabalhos concluídos. Deve ser chamado na thread da UI."""
+        while True:
+            try:
+                error, result, on_success, on_error = self._results.get_nowait()
+            except Empty:
+                return
+            self.pending -= 1
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"Erro no worker do banco de dados: {error!r}")
+            elif on_success:
+                on_success(result)
+
+    def shutdown(self, wait=True):
+        """Encerra a thread do worker, aguardando os trabalhos em andamento."""
+        self._jobs.put(None)
+        if wait:
+            self._thread.join()
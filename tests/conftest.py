@@ -0,0 +1,19 @@
+"""Fixtures compartilhadas: cada teste usa um banco novo num diretório temporário."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import database
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco migrado em tmp_path, usado pelo pool da aplicação durante o teste."""
+    caminho = str(tmp_path / "database.db")
+    database.set_database(caminho)
+    database.setup_database()
+    yield caminho
+    database.close_pool()
@@ -0,0 +1,52 @@
+"""Paginação por keyset da listagem de agendamentos."""
+import pytest
+
+from model.agendamento import ORDENACOES, AgendamentoModel, sort_key
+
+DATA = 30_000_000 # minutos (2027)
+NOMES = ["bia", "Ana", "carla", "Beto", "ana", "Davi", "Édson"]
+
+
+@pytest.fixture
+def model(banco):
+    model = AgendamentoModel()
+    for i, nome in enumerate(NOMES):
+        # Datas e valores repetidos, para o desempate por id entrar em jogo
+        model.add_agendamento(nome, "", "", DATA + (i % 3) * 60, 1000 * (i % 2), "Corte" if i % 2 else "Barba")
+    return model
+
+
+def _todas_as_paginas(model, limit, **filtros):
+    paginas, cursor = [], None
+    while True:
+        rows, has_more = model.get_agendamentos_page(cursor, "next", limit, **filtros)
+        paginas.append(rows)
+        if not has_more:
+            return paginas
+        cursor = sort_key(rows[-1], filtros.get("ordenacao", "data"))
+
+
+@pytest.mark.parametrize("ordenacao", sorted(ORDENACOES))
+@pytest.mark.parametrize("descendente", [False, True])
+def test_paginas_cobrem_a_listagem_completa(model, ordenacao, descendente):
+    completa, has_more = model.get_agendamentos_page(limit=100, ordenacao=ordenacao, descendente=descendente)
+    assert not has_more and len(completa) == len(NOMES)
+    paginas = _todas_as_paginas(model, 2, ordenacao=ordenacao, descendente=descendente)
+    assert [len(p) for p in paginas] == [2, 2, 2, 1]
+    assert [row for pagina in paginas for row in pagina] == completa
+    chaves = [sort_key(row, ordenacao) for row in completa]
+    assert chaves == sorted(chaves, reverse=descendente)
+
+
+def test_pagina_anterior_volta_na_ordem_de_exibicao(model):
+    primeira, _ = model.get_agendamentos_page(limit=3, ordenacao="nome")
+    segunda, _ = model.get_agendamentos_page(sort_key(primeira[-1], "nome"), "next", 3, ordenacao="nome")
+    anterior, has_more = model.get_agendamentos_page(sort_key(segunda[0], "nome"), "previous", 3, ordenacao="nome")
+    assert anterior == primeira and not has_more
+
+
+def test_filtros_de_periodo_e_servico(model):
+    rows, _ = model.get_agendamentos_page(limit=100, inicio=DATA + 60, fim=DATA + 120)
+    assert [row[1] for row in rows] == ["Ana", "ana"]
+    rows, _ = model.get_agendamentos_page(limit=100, inicio=DATA + 60, servico="Corte")
+    assert [row[1] for row in rows] == ["Ana", "Davi"]
@@ -0,0 +1,143 @@
+"""Serviço HTTP de verdade em 127.0.0.1 (porta livre escolhida pelo sistema), usado pelo ApiClient."""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from controller.api_server import ApiServer
+from model import codec, senhas
+from model.database import get_connection
+from model.remote import ApiClient, RemoteAgendamentoModel, RemoteError, RemoteUserModel
+from model.agendamento import VersionConflictError, sort_key
+
+
+@pytest.fixture
+def servidor(banco):
+    """ApiServer rodando num loop próprio em outra thread; retorna (servidor, cliente)."""
+    server = ApiServer("127.0.0.1", 0)
+    loop = asyncio.new_event_loop()
+    pronto = threading.Event()
+    def rodar():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        pronto.set()
+        loop.run_forever()
+    thread = threading.Thread(target=rodar, daemon=True)
+    thread.start()
+    assert pronto.wait(10)
+    client = ApiClient(f"http://127.0.0.1:{server.port}")
+    yield server, client
+    client.close()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    server.close()
+    pendentes = asyncio.all_tasks(loop) # conexões keep-alive ainda abertas
+    for task in pendentes:
+        task.cancel()
+    if pendentes:
+        loop.run_until_complete(asyncio.wait(pendentes))
+    loop.close()
+
+
+def _registrar_threads(monkeypatch, model, nome, threads):
+    """Troca model.nome por um wrapper que anota a thread em que foi chamado."""
+    original = getattr(model, nome)
+    def wrapper(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(model, nome, wrapper)
+
+
+def _minutos(dia, hora):
+    return codec.datetime_to_minutes(datetime(2030, 1, dia, hora))
+
+
+def test_login(servidor):
+    _, client = servidor
+    usuarios = RemoteUserModel(client)
+    assert usuarios.has_users() is False
+    assert usuarios.create_user("ana", "segredo") == (True, "Usuário criado com sucesso!")
+    assert usuarios.check_credentials("ana", "segredo") is True
+    assert usuarios.check_credentials("ana", "errada") is False
+    assert usuarios.check_credentials("bia", "segredo") is False
+    assert usuarios.create_user("bia", "outra")[0] is False # só o primeiro cadastro é aceito
+
+
+def test_login_refaz_hash_legado_na_thread_de_escrita(servidor, monkeypatch):
+    server, client = servidor
+    with get_connection() as conn:
+        conn.execute("INSERT INTO usuarios(username, password_hash, salt, algoritmo, parametros) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     ("ana", senhas.hash_senha("segredo", "sal", "sha256", {}), "sal", "sha256", ""))
+    threads = []
+    _registrar_threads(monkeypatch, server.user_model, "update_password_hash", threads)
+    assert RemoteUserModel(client).check_credentials("ana", "segredo") is True
+    assert threads and all(nome.startswith("api-escrita") for nome in threads)
+    with get_connection() as conn:
+        assert conn.execute("SELECT algoritmo FROM usuarios").fetchone()[0] == senhas.ALGORITMO_PADRAO
+
+
+def test_paginacao_keyset(servidor):
+    _, client = servidor
+    model = RemoteAgendamentoModel(client)
+    for hora in range(8, 13):
+        row, conflitos = model.save_if_available(None, f"Cliente {hora}", "", "", _minutos(2, hora), 5000, "Corte")
+        assert row is not None and conflitos == []
+    vistos, cursor, has_more = [], None, True
+    while has_more:
+        rows, has_more = model.get_agendamentos_page(cursor, limit=2)
+        vistos.extend(row[1] for row in rows)
+        cursor = sort_key(rows[-1])
+    assert vistos == [f"Cliente {hora}" for hora in range(8, 13)]
+    rows, has_more = model.get_agendamentos_page(cursor, direction="previous", limit=2)
+    assert [row[1] for row in rows] == ["Cliente 10", "Cliente 11"] and has_more
+
+
+def test_cursor_invalido_e_limite(servidor):
+    _, client = servidor
+    for params in ({"cursor": "[1, 2, 3, 4]"}, {"cursor": '{"a": 1}'}, {"cursor": "[[1], 2]"}, {"limit": -1}):
+        with pytest.raises(RemoteError) as erro:
+            client.request("GET", "/agendamentos", params)
+        assert erro.value.status == 400
+
+
+def test_duracao_padrao_e_conflito_de_horario(servidor):
+    _, client = servidor
+    result = client.request("POST", "/agendamentos", body={"nome": "Ana", "servico": "Corte",
+                                                           "data": _minutos(3, 10)})
+    assert result["row"][7] == 60 and result["conflitos"] == []
+    result = client.request("POST", "/agendamentos", body={"nome": "Bia", "servico": "Corte",
+                                                           "data": _minutos(3, 10) + 30})
+    assert result["row"] is None and result["conflitos"][0][1] == "Ana"
+
+
+def test_conflito_de_versao(servidor):
+    _, client = servidor
+    model = RemoteAgendamentoModel(client)
+    row, _ = model.save_if_available(None, "Ana", "", "", _minutos(4, 9), 5000, "Corte")
+    atualizada, _ = model.save_if_available(row[0], "Ana Souza", "", "", row[4], 5000, "Corte", versao=row[8])
+    assert atualizada[1] == "Ana Souza" and atualizada[8] != row[8]
+    with pytest.raises(VersionConflictError) as erro:
+        model.save_if_available(row[0], "Ana Lima", "", "", row[4], 5000, "Corte", versao=row[8])
+    assert erro.value.row[1] == "Ana Souza"
+
+
+def test_escritas_passam_pela_thread_unica(servidor, monkeypatch):
+    server, client = servidor
+    threads = []
+    _registrar_threads(monkeypatch, server.agendamento_model, "save_if_available", threads)
+    model = RemoteAgendamentoModel(client)
+    clientes = [ApiClient(f"http://127.0.0.1:{server.port}") for _ in range(4)]
+    def gravar(indice):
+        RemoteAgendamentoModel(clientes[indice]).save_if_available(
+            None, f"Cliente {indice}", "", "", _minutos(5, 8 + indice), 5000, "Corte")
+    gravadores = [threading.Thread(target=gravar, args=(indice,)) for indice in range(4)]
+    for thread in gravadores:
+        thread.start()
+    for thread in gravadores:
+        thread.join(30)
+    for extra in clientes:
+        extra.close()
+    assert len(threads) == 4 and set(threads) == {threads[0]} and threads[0].startswith("api-escrita")
+    assert len(model.get_all_agendamentos()) == 4
@@ -0,0 +1,57 @@
+"""Backup compactado, verificação e restauração."""
+import gzip
+import os
+from datetime import datetime
+
+import pytest
+
+from model import codec, database
+from model.agendamento import AgendamentoModel
+from model.backup import BackupError, criar_backup, listar_backups, restaurar_backup, verificar_backup
+from model.historico import HistoricoModel
+
+
+def _minutos(ano):
+    return codec.datetime_to_minutes(datetime(ano, 3, 10, 9))
+
+
+def test_restaurar_volta_ao_estado_do_backup(banco, tmp_path):
+    model = AgendamentoModel()
+    model.add_agendamento("Ana", "", "", _minutos(2030), 5000, "Corte")
+    model.add_agendamento("Bia", "", "", _minutos(2020), 5000, "Corte")
+    assert HistoricoModel().arquivar_lote(_minutos(2025)) == 1
+    progresso = []
+    destino = criar_backup(str(tmp_path / "backups"), progresso=progresso.append, arquivo_db=banco)
+    assert progresso[-1] == 1.0 and progresso == sorted(progresso)
+    assert verificar_backup(destino) == {"main": "ok", "historico": "ok"}
+
+    model.add_agendamento("Cris", "", "", _minutos(2031), 5000, "Corte")
+    database.close_pool()
+    restaurar_backup(destino, arquivo_db=banco)
+    nomes = [row[1] for row in model.get_all_agendamentos(historico=True, inicio=_minutos(2000))]
+    assert nomes == ["Bia", "Ana"]
+
+
+def test_rotacao_mantem_os_mais_recentes(banco, tmp_path, monkeypatch):
+    pasta = str(tmp_path / "backups")
+    criados = []
+    for horario in ("20270101-100000", "20270102-100000", "20270103-100000"):
+        monkeypatch.setattr("model.backup.FORMATO_DATA", horario) # strftime devolve o texto fixo
+        criados.append(criar_backup(pasta, manter=2, arquivo_db=banco))
+    assert listar_backups(pasta) == criados[:0:-1]
+    assert not os.path.exists(criados[0])
+
+
+def test_backup_corrompido_nao_e_restaurado(banco, tmp_path):
+    AgendamentoModel().add_agendamento("Ana", "", "", _minutos(2030), 5000, "Corte")
+    destino = criar_backup(str(tmp_path / "backups"), arquivo_db=banco)
+    with gzip.open(destino, "wb") as arquivo:
+        arquivo.write(b"isto nao e um banco sqlite" * 100)
+    database.close_pool()
+    with pytest.raises(BackupError):
+        restaurar_backup(destino, arquivo_db=banco)
+    assert len(AgendamentoModel().get_all_agendamentos()) == 1
+
+    os.remove(destino)
+    with pytest.raises(BackupError):
+        verificar_backup(destino)
@@ -0,0 +1,50 @@
+"""Importação de arquivos CSV/JSON: validação, duplicados e transação."""
+import json
+import sqlite3
+
+import pytest
+
+from controller.bulk_import import import_agendamentos
+from model.agendamento import AgendamentoModel
+
+CABECALHO = "Nome,Telefone,Email,Data,Valor,Serviço\n"
+
+
+def test_importa_valida_e_descarta_duplicados(banco, tmp_path):
+    arquivo = tmp_path / "agenda.csv"
+    arquivo.write_text(CABECALHO
+                       + "Ana,11999990000,,10/03/2030 09:00,\"50,00\",Corte\n"
+                       + "ana,,,10/03/2030 09:00,50.00,corte\n" # mesmo nome, data e serviço
+                       + ",,,10/03/2030 10:00,50.00,Corte\n" # sem nome
+                       + "Bia,,,31/02/2030 10:00,50.00,Corte\n", # data inexistente
+                       encoding="utf-8")
+    resultado = import_agendamentos(str(arquivo))
+    assert (resultado.inserted, resultado.duplicates) == (1, 1)
+    assert [linha for linha, _ in resultado.errors] == [4, 5]
+    assert AgendamentoModel().get_all_agendamentos()[0][5] == 5000
+
+
+def test_json_e_jsonl(banco, tmp_path):
+    registros = [{"nome": "Ana", "data": "10/03/2030 09:00", "valor": "50", "servico": "Corte"},
+                 {"nome": "Bia", "data": "10/03/2030 11:00", "valor": "40", "servico": "Escova"}]
+    (tmp_path / "a.json").write_text(json.dumps(registros), encoding="utf-8")
+    (tmp_path / "a.jsonl").write_text("\n".join(map(json.dumps, registros)), encoding="utf-8")
+    assert import_agendamentos(str(tmp_path / "a.json")).inserted == 2
+    assert import_agendamentos(str(tmp_path / "a.jsonl")).duplicates == 2
+
+
+def test_trava_a_escrita_antes_de_ler_as_chaves(banco, tmp_path, monkeypatch):
+    arquivo = tmp_path / "agenda.csv"
+    arquivo.write_text(CABECALHO + "Ana,,,10/03/2030 09:00,50.00,Corte\n", encoding="utf-8")
+    model = AgendamentoModel()
+    original = model.iter_dedup_keys
+    def chaves_com_outro_terminal():
+        outro = sqlite3.connect(banco, timeout=0)
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                outro.execute("BEGIN IMMEDIATE") # outro terminal tentando gravar
+        finally:
+            outro.close()
+        yield from original()
+    monkeypatch.setattr(model, "iter_dedup_keys", chaves_com_outro_terminal)
+    assert import_agendamentos(str(arquivo), model).inserted == 1
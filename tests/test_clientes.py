@@ -0,0 +1,22 @@
+"""Clientes mantidos pelos triggers de agendamentos."""
+from model.agendamento import AgendamentoModel
+from model.cliente import ClienteModel
+
+DATA = 30_000_000 # minutos (2027)
+
+
+def test_mesmo_telefone_vira_um_cliente(banco):
+    model = AgendamentoModel()
+    primeiro = model.add_agendamento("Ana Silva", "11999990000", "", DATA, 5000, "Corte")
+    segundo = model.add_agendamento("Ana Silva", "11999990000", "ana@x.com", DATA + 120, 5000, "Corte")
+    assert primeiro[9] == segundo[9]
+    assert ClienteModel().get_all_clientes() == [(primeiro[9], "Ana Silva", "11999990000", "ana@x.com")]
+
+
+def test_renomear_agendamento_renomeia_cliente(banco):
+    model = AgendamentoModel()
+    row = model.add_agendamento("Ana Silva", "11999990000", "", DATA, 5000, "Corte")
+    model.update_agendamento(row[0], "Ana S.", "11999990000", "", DATA, 5000, "Corte")
+    assert ClienteModel().get_clientes([row[9]]) == [(row[9], "Ana S.", "11999990000", None)]
+    model.add_agendamento("Ana Souza", "11999990000", "", DATA + 120, 5000, "Corte")
+    assert ClienteModel().get_clientes([row[9]])[0][1] == "Ana Souza"
@@ -0,0 +1,64 @@
+"""Conversões de datas (minutos) e valores (centavos) em model.codec."""
+from datetime import date, datetime
+
+import pytest
+
+from model import codec
+
+
+def test_datas_vao_e_voltam():
+    dt = datetime(2027, 3, 1, 14, 30)
+    minutos = codec.datetime_to_minutes(dt)
+    assert codec.minutes_to_datetime(minutos) == dt
+    assert codec.date_to_minutes(date(2027, 3, 1)) == minutos - (14 * 60 + 30)
+    assert codec.day_to_date(codec.minutes_to_day(minutos)) == date(2027, 3, 1)
+    assert codec.format_datetime(minutos) == "01/03/2027 14:30"
+    assert codec.parse_form_datetime("01/03/2027", "14:30") == minutos
+    assert codec.parse_form_date("01/03/2027") == codec.date_to_minutes(date(2027, 3, 1))
+
+
+def test_datas_antes_da_epoca():
+    minutos = codec.datetime_to_minutes(datetime(1969, 12, 31, 23, 0))
+    assert minutos == -60
+    assert codec.format_datetime(minutos) == "31/12/1969 23:00"
+
+
+@pytest.mark.parametrize("data, horario", [("31/02/2027", "10:00"), ("2027-03-01", "10:00"),
+                                           ("01/03/2027", "24:00"), ("01/03/2027", "")])
+def test_data_do_formulario_invalida(data, horario):
+    with pytest.raises(ValueError):
+        codec.parse_form_datetime(data, horario)
+
+
+def test_texto_legado():
+    esperado = codec.datetime_to_minutes(datetime(2024, 5, 10, 14, 30))
+    assert codec.parse_legacy_text("2024-05-10 14:30:00") == esperado
+    assert codec.parse_legacy_text(" 2024-05-10 14:30 ") == esperado
+    assert codec.parse_legacy_text("2024-05-10") == esperado - (14 * 60 + 30)
+    assert codec.parse_legacy_text("10/05/2024") is None
+    assert codec.parse_legacy_text(None) is None
+
+
+@pytest.mark.parametrize("valor, centavos", [
+    ("50", 5000), ("50.5", 5050), ("50,50", 5050), (" 1,99 ", 199), ("0.005", 1), ("0.004", 0),
+    ("2.675", 268), (50, 5000), (50.5, 5050), (19.99, 1999),
+])
+def test_parse_money(valor, centavos):
+    assert codec.parse_money(valor) == centavos
+
+
+@pytest.mark.parametrize("valor", ["abc", "", "1,000.00", "nan", "inf"])
+def test_parse_money_invalido(valor):
+    with pytest.raises(ValueError):
+        codec.parse_money(valor)
+
+
+@pytest.mark.parametrize("centavos, texto", [(5000, "50.00"), (5, "0.05"), (-150, "-1.50"), (None, "0.00"),
+                                             (1234.5, "12.35")])
+def test_format_money(centavos, texto):
+    assert codec.format_money(centavos) == texto
+
+
+def test_normalizar():
+    assert codec.normalizar("Coloração") == codec.normalizar("COLORACAO") == "coloracao"
+    assert codec.normalizar("Straße") == "strasse"
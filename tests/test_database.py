@@ -0,0 +1,25 @@
+"""Verificação de versão do SQLite e transações do pool de conexões."""
+import sqlite3
+
+import pytest
+
+from model import database
+
+
+def test_sqlite_antigo_e_recusado():
+    with pytest.raises(sqlite3.NotSupportedError, match="3.35.0"):
+        database.check_sqlite_version((3, 31, 1))
+    database.check_sqlite_version((3, 35, 0))
+    database.check_sqlite_version()
+
+
+
+def test_blocos_aninhados_compartilham_a_transacao(banco):
+    with pytest.raises(RuntimeError):
+        with database.get_connection() as externa:
+            with database.get_connection() as interna:
+                assert interna is externa
+                interna.execute("INSERT INTO usuarios(username, password_hash, salt) VALUES ('ana', 'h', 's')")
+            raise RuntimeError("desfaz o bloco inteiro")
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0] == 0
@@ -0,0 +1,83 @@
+"""Checagem de conflitos de horário e horários livres."""
+from datetime import date, datetime
+
+import pytest
+
+from model import codec
+from model.agendamento import AgendamentoModel, VersionConflictError
+from model.disponibilidade import DisponibilidadeModel, OcupacaoIntervalos
+
+DIA = date(2027, 3, 1)
+
+
+def _minutos(hora, minuto=0):
+    return codec.datetime_to_minutes(datetime(DIA.year, DIA.month, DIA.day, hora, minuto))
+
+
+def test_ocupacao_vazia():
+    ocupacao = OcupacaoIntervalos([])
+    assert ocupacao.maxima(0, 100) == 0
+
+
+def test_ocupacao_sobreposta_e_adjacente():
+    ocupacao = OcupacaoIntervalos([(10, 20), (15, 30), (30, 40), (50, 60)])
+    assert ocupacao.maxima(0, 10) == 0
+    assert ocupacao.maxima(0, 11) == 1
+    assert ocupacao.maxima(12, 16) == 2
+    assert ocupacao.maxima(20, 30) == 1
+    assert ocupacao.maxima(25, 45) == 1 # (15, 30) termina onde (30, 40) começa
+    assert ocupacao.maxima(40, 50) == 0
+    assert ocupacao.maxima(0, 100) == 2
+    assert ocupacao.maxima(60, 100) == 0
+
+
+def test_ocupacao_com_intervalos_repetidos():
+    ocupacao = OcupacaoIntervalos([(10, 20)] * 3 + [(20, 30)])
+    assert ocupacao.maxima(19, 21) == 3
+    assert ocupacao.maxima(20, 21) == 1
+
+
+def test_horario_ocupado_nao_e_gravado(banco):
+    model = AgendamentoModel()
+    ana, conflitos = model.save_if_available(None, "Ana", "", "", _minutos(10), 5000, "Corte", 60)
+    assert ana is not None and conflitos == []
+
+    row, conflitos = model.save_if_available(None, "Bia", "", "", _minutos(10, 30), 5000, "Corte", 30)
+    assert row is None
+    assert conflitos == [(ana[0], "Ana", _minutos(10), 60)]
+    assert [r[1] for r in model.get_all_agendamentos()] == ["Ana"]
+
+    antes, _ = model.save_if_available(None, "Bia", "", "", _minutos(9), 5000, "Corte", 60)
+    depois, _ = model.save_if_available(None, "Cris", "", "", _minutos(11), 5000, "Corte", 60)
+    assert antes is not None and depois is not None # horários encostados não conflitam
+
+
+def test_edicao_ignora_o_proprio_agendamento(banco):
+    model = AgendamentoModel()
+    ana, _ = model.save_if_available(None, "Ana", "", "", _minutos(10), 5000, "Corte", 60)
+    model.save_if_available(None, "Bia", "", "", _minutos(12), 5000, "Corte", 60)
+
+    row, conflitos = model.save_if_available(ana[0], "Ana", "", "", _minutos(10, 30), 5000, "Corte", 60, ana[8])
+    assert conflitos == [] and row[4] == _minutos(10, 30)
+
+    row, conflitos = model.save_if_available(ana[0], "Ana", "", "", _minutos(11, 30), 5000, "Corte", 60, row[8])
+    assert row is None and [c[1] for c in conflitos] == ["Bia"]
+
+
+def test_versao_desatualizada(banco):
+    model = AgendamentoModel()
+    ana, _ = model.save_if_available(None, "Ana", "", "", _minutos(10), 5000, "Corte", 60)
+    atual, _ = model.save_if_available(ana[0], "Ana", "", "", _minutos(14), 5000, "Corte", 60, ana[8])
+    with pytest.raises(VersionConflictError) as erro:
+        model.save_if_available(ana[0], "Ana B.", "", "", _minutos(15), 5000, "Corte", 60, ana[8])
+    assert erro.value.row == atual
+
+
+def test_horarios_livres(banco):
+    model = AgendamentoModel()
+    model.add_agendamento("Ana", "", "", _minutos(9), 5000, "Corte", 90)
+    model.add_agendamento("Bia", "", "", _minutos(18), 5000, "Corte", 60)
+    livres = DisponibilidadeModel().get_horarios_livres(DIA, 60)
+    assert livres[:3] == [_minutos(8), _minutos(10, 30), _minutos(11)]
+    assert _minutos(17) in livres and _minutos(17, 30) not in livres
+    assert livres[-1] == _minutos(19)
@@ -0,0 +1,55 @@
+"""Arquivamento no banco de histórico, anexado só depois que existe."""
+import os
+from datetime import datetime
+
+from model import codec
+from model.agendamento import AgendamentoModel
+from model.backup import criar_backup, verificar_backup
+from model.database import get_connection, historico_path
+from model.historico import HistoricoModel
+
+
+def _minutos(ano):
+    return codec.datetime_to_minutes(datetime(ano, 3, 10, 9))
+
+
+def test_historico_so_e_criado_ao_arquivar(banco):
+    model = AgendamentoModel()
+    model.add_agendamento("Ana", "", "", _minutos(2030), 5000, "Corte")
+    assert HistoricoModel().arquivar_lote(_minutos(2025)) == 0
+    assert not os.path.exists(historico_path(banco))
+    assert len(model.get_all_agendamentos(historico=True, inicio=_minutos(2000))) == 1
+
+    model.add_agendamento("Bia", "", "", _minutos(2020), 5000, "Corte")
+    assert HistoricoModel().arquivar_lote(_minutos(2025)) == 1
+    assert os.path.exists(historico_path(banco))
+    assert [row[1] for row in model.get_all_agendamentos()] == ["Ana"]
+    assert [row[1] for row in model.get_all_agendamentos(historico=True, inicio=_minutos(2000))] == ["Bia", "Ana"]
+    assert HistoricoModel().contar() == (1, 1)
+
+
+def test_conexoes_abertas_antes_anexam_o_historico(banco):
+    with get_connection() as conn:
+        assert not conn.historico_anexado
+    AgendamentoModel().add_agendamento("Bia", "", "", _minutos(2020), 5000, "Corte")
+    assert HistoricoModel().arquivar_lote(_minutos(2025)) == 1
+    with get_connection() as conn:
+        assert conn.historico_anexado
+
+
+def test_backup_sem_historico(banco, tmp_path):
+    AgendamentoModel().add_agendamento("Ana", "", "", _minutos(2030), 5000, "Corte")
+    destino = criar_backup(str(tmp_path / "backups"), arquivo_db=banco)
+    assert verificar_backup(destino) == {"main": "ok", "historico": "ok"}
+    assert not os.path.exists(historico_path(banco))
+
+
+def test_importacao_nao_duplica_agendamentos_arquivados(banco, tmp_path):
+    from controller.bulk_import import import_agendamentos
+    arquivo = tmp_path / "antigos.csv"
+    arquivo.write_text("Nome,Telefone,Email,Data,Valor,Serviço\n"
+                       "Bia,,,10/03/2020 09:00,50.00,Corte\n", encoding="utf-8")
+    assert import_agendamentos(str(arquivo)).inserted == 1
+    assert HistoricoModel().arquivar_lote(_minutos(2025)) == 1
+    resultado = import_agendamentos(str(arquivo))
+    assert (resultado.inserted, resultado.duplicates) == (0, 1)
@@ -0,0 +1,12 @@
+"""Validação de digitação dos campos da tela principal (sem abrir janelas)."""
+import pytest
+
+from view.main_view import MainView
+
+
+@pytest.mark.parametrize("texto, aceito", [
+    ("", True), ("50", True), ("50.5", True), ("50,00", True), (",5", True),
+    ("50,0,0", False), ("50.0,0", False), ("5a", False), ("-5", False),
+])
+def test_valor_aceita_ponto_ou_virgula(texto, aceito):
+    assert MainView._validate_decimal_input(None, texto) is aceito
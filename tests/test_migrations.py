@@ -0,0 +1,97 @@
+"""Migração de um banco no esquema original (data TEXT e valor REAL) até a versão atual."""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from model import codec, database
+from model.agendamento import AgendamentoModel
+from model.migrations import SCHEMA_VERSION
+
+LEGADO = (
+    ("Ana Silva", "11999990000", "ana@x.com", "2024-05-10 14:30:00", 50.5, "Coloração"),
+    ("Bia", "11888880000", "", "2024-05-10 16:00:00", 40.0, "coloracao"),
+    ("Ana Silva", "11999990000", "", "2024-05-11 09:00:00", 19.99, "Corte"),
+    ("Cris", None, None, "data perdida", None, "Corte"),
+)
+
+
+@pytest.fixture
+def banco_legado(tmp_path):
+    """Banco criado pela primeira versão da aplicação (user_version 0), migrado pelo setup."""
+    caminho = str(tmp_path / "database.db")
+    conn = sqlite3.connect(caminho)
+    conn.executescript("""
+        CREATE TABLE agendamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT,
+            data TEXT NOT NULL,
+            valor_servico REAL,
+            servico TEXT NOT NULL
+        );
+        CREATE TABLE usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL
+        );
+    """)
+    conn.executemany("INSERT INTO agendamentos(nome, telefone, email, data, valor_servico, servico) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", LEGADO)
+    conn.execute("INSERT INTO usuarios(username, password_hash, salt) VALUES ('admin', 'abc', 'def')")
+    conn.commit()
+    conn.close()
+    database.set_database(caminho)
+    database.setup_database()
+    yield caminho
+    database.close_pool()
+
+
+def _minutos(*args):
+    return codec.datetime_to_minutes(datetime(*args))
+
+
+def test_esquema_atualizado(banco_legado):
+    with database.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        colunas = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(agendamentos)")}
+        usuario = conn.execute("SELECT username, password_hash, salt FROM usuarios").fetchone()
+    assert colunas["data"] == "INTEGER" and colunas["valor_centavos"] == "INTEGER"
+    assert "valor_servico" not in colunas
+    assert usuario == ("admin", "abc", "def")
+
+
+def test_datas_e_valores_convertidos(banco_legado):
+    rows = AgendamentoModel().get_all_agendamentos()
+    assert [(row[1], row[4], row[5], row[7]) for row in rows] == [
+        ("Cris", 0, 0, 60), # data ilegível vira 01/01/1970, sem perder a linha
+        ("Ana Silva", _minutos(2024, 5, 10, 14, 30), 5050, 60),
+        ("Bia", _minutos(2024, 5, 10, 16), 4000, 60),
+        ("Ana Silva", _minutos(2024, 5, 11, 9), 1999, 60),
+    ]
+
+
+def test_catalogos_e_resumo(banco_legado):
+    with database.get_connection() as conn:
+        servicos = conn.execute("SELECT nome, chave, valor_centavos FROM servicos ORDER BY chave").fetchall()
+        clientes = conn.execute("SELECT nome, telefone FROM clientes ORDER BY nome").fetchall()
+        resumo = conn.execute("""SELECT r.dia, s.chave, r.quantidade, r.total_centavos
+                                   FROM resumo_diario r JOIN servicos s ON s.id = r.servico_id
+                                  ORDER BY r.dia, s.chave""").fetchall()
+        sem_vinculo = conn.execute(
+            "SELECT COUNT(*) FROM agendamentos WHERE servico_id IS NULL").fetchone()[0]
+    # Grafias com e sem acento viram um serviço, com os dados do uso mais recente
+    assert servicos == [("coloracao", "coloracao", 4000), ("Corte", "corte", 1999)]
+    assert ("Ana Silva", "11999990000") in clientes and ("Bia", "11888880000") in clientes
+    dia = _minutos(2024, 5, 10) // codec.MINUTES_PER_DAY
+    assert resumo == [(0, "corte", 1, 0), (dia, "coloracao", 2, 9050), (dia + 1, "corte", 1, 1999)]
+    assert sem_vinculo == 0
+
+
+def test_setup_em_banco_atualizado_nao_migra_de_novo(banco_legado, capsys):
+    database.close_pool()
+    database.setup_database()
+    assert "Migrações aplicadas" not in capsys.readouterr().out
+    assert len(AgendamentoModel().get_all_agendamentos()) == len(LEGADO)
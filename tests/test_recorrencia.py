@@ -0,0 +1,41 @@
+"""Expansão das regras de recorrência."""
+from datetime import datetime
+
+from model import codec
+from model.recorrencia import MAX_OCORRENCIAS, excede_maximo, ocorrencias, ultima_ocorrencia
+
+
+def _minutos(*args):
+    return codec.datetime_to_minutes(datetime(*args))
+
+
+def test_semanal_por_vezes_e_por_data():
+    inicio = _minutos(2027, 3, 1, 10)
+    semana = 7 * codec.MINUTES_PER_DAY
+    assert list(ocorrencias(inicio, "semanal", vezes=3)) == [inicio, inicio + semana, inicio + 2 * semana]
+    assert list(ocorrencias(inicio, "quinzenal", ate=_minutos(2027, 3, 16))) == [inicio, _minutos(2027, 3, 15, 10)]
+    assert len(list(ocorrencias(inicio, "semanal"))) == MAX_OCORRENCIAS
+
+
+def test_mensal_usa_o_ultimo_dia_dos_meses_curtos():
+    inicio = _minutos(2027, 1, 31, 9)
+    assert list(ocorrencias(inicio, "mensal", vezes=4)) == [
+        _minutos(2027, 1, 31, 9), _minutos(2027, 2, 28, 9), _minutos(2027, 3, 31, 9), _minutos(2027, 4, 30, 9)]
+    assert ultima_ocorrencia(inicio, "mensal", ate=_minutos(2028, 3, 1)) == _minutos(2028, 2, 29, 9)
+
+
+def test_janela_comeca_direto_na_ocorrencia():
+    inicio = _minutos(2027, 1, 31, 9)
+    janela = list(ocorrencias(inicio, "mensal", de=_minutos(2027, 3, 1), antes_de=_minutos(2027, 5, 1)))
+    assert janela == [_minutos(2027, 3, 31, 9), _minutos(2027, 4, 30, 9)]
+    semanal = list(ocorrencias(_minutos(2027, 3, 1, 10), "semanal", vezes=3, de=_minutos(2027, 3, 2)))
+    assert semanal == [_minutos(2027, 3, 8, 10), _minutos(2027, 3, 15, 10)]
+
+
+def test_excede_maximo():
+    inicio = _minutos(2027, 3, 1, 10)
+    assert not excede_maximo(inicio, "semanal", vezes=MAX_OCORRENCIAS)
+    assert excede_maximo(inicio, "semanal", vezes=MAX_OCORRENCIAS + 1)
+    assert excede_maximo(inicio, "semanal")
+    assert not excede_maximo(inicio, "mensal", ate=_minutos(2040, 1, 1))
+    assert excede_maximo(inicio, "semanal", ate=_minutos(2040, 1, 1))
@@ -0,0 +1,57 @@
+"""Relatório: listagem e totais com os mesmos filtros de período e serviço."""
+from datetime import datetime
+
+from controller.app_controller import AppController
+from model import codec
+from model.agendamento import AgendamentoModel
+from model.relatorio import RelatorioModel
+
+
+def _minutos(mes, dia, hora=9):
+    return codec.datetime_to_minutes(datetime(2030, mes, dia, hora))
+
+
+def _popular():
+    model = AgendamentoModel()
+    model.add_agendamento("Ana", "", "", _minutos(1, 10), 5000, "Hidratação")
+    model.add_agendamento("Bia", "", "", _minutos(1, 11), 4000, "Corte")
+    model.add_agendamento("Cris", "", "", _minutos(2, 10), 6000, "hidratacao")
+    return model
+
+
+def test_listagem_e_totais_filtrados(banco):
+    model = _popular()
+    inicio, fim = _minutos(1, 1, 0), _minutos(2, 1, 0)
+    assert [row[1] for row in model.get_all_agendamentos(inicio=inicio, fim=fim)] == ["Ana", "Bia"]
+    assert [row[1] for row in model.get_all_agendamentos(servico="HIDRATAÇÃO")] == ["Ana", "Cris"]
+    resumos = RelatorioModel().get_todos_resumos(inicio, fim, "Hidratação")
+    assert [(quantidade, total) for _, quantidade, total, _ in resumos["mes"]] == [(1, 5000)]
+    assert [(quantidade, total) for _, quantidade, total, _ in RelatorioModel().get_todos_resumos()["ano"]] \
+        == [(3, 15000)]
+
+
+class _ReportView:
+    """Só registra o que o controller pede à janela de relatório."""
+    def __init__(self):
+        self.period, self.errors = None, []
+    def set_period(self, texto):
+        self.period = texto
+    def show_error(self, title, message):
+        self.errors.append(message)
+
+
+def test_filtrar_aplica_periodo_e_servico_as_abas():
+    controller = AppController.__new__(AppController)
+    controller.agendamento_model, controller.relatorio_model = AgendamentoModel(), RelatorioModel()
+    controller.report_sort, controller.report_range, controller.report_servico = ("data", False), (None, None), None
+    controller.report_view = _ReportView()
+    chamadas = []
+    controller._run_db = lambda func, *args, **kwargs: chamadas.append((func.__name__, args, kwargs))
+    controller.handle_report_filter({"Inicio": "01/01/2030", "Fim": "31/01/2030", "Serviço": "Corte"})
+    (_, _, listagem), (_, resumos_args, _) = chamadas
+    inicio, fim = codec.parse_form_date("01/01/2030"), codec.parse_form_date("01/02/2030")
+    assert (listagem["inicio"], listagem["fim"], listagem["servico"], listagem["historico"]) == (inicio, fim, "Corte", True)
+    assert resumos_args == (inicio, fim, "Corte")
+    assert controller.report_view.period == "De 01/01/2030 a 31/01/2030 — serviço: Corte"
+    controller.handle_report_filter({"Inicio": "32/01/2030"})
+    assert controller.report_view.errors and len(chamadas) == 2
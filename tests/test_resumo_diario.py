@@ -0,0 +1,36 @@
+"""resumo_diario mantido pelos triggers, conferido contra um GROUP BY de agendamentos."""
+from model.agendamento import AgendamentoModel
+from model.database import get_connection
+
+DIA = 1440
+DATA = 30_000_000 # minutos (2027), início de um dia
+RECALCULO = """SELECT data / 1440, servico_id, COUNT(*), SUM(valor_centavos)
+                 FROM agendamentos GROUP BY data / 1440, servico_id ORDER BY 1, 2"""
+
+
+def _resumo():
+    with get_connection() as conn:
+        return conn.execute("SELECT dia, servico_id, quantidade, total_centavos FROM resumo_diario "
+                            "ORDER BY dia, servico_id").fetchall()
+
+
+def _recalculado():
+    with get_connection() as conn:
+        return conn.execute(RECALCULO).fetchall()
+
+
+def test_insert_update_delete(banco):
+    model = AgendamentoModel()
+    ana = model.add_agendamento("Ana", "", "", DATA + 600, 5000, "Corte")
+    bia = model.add_agendamento("Bia", "", "", DATA + 660, 4000, "corte") # mesmo serviço do catálogo
+    cris = model.add_agendamento("Cris", "", "", DATA + DIA + 600, 7000, "Escova")
+    assert _resumo() == _recalculado() and _resumo()[0][2:] == (2, 9000)
+
+    model.update_agendamento(ana[0], "Ana", "", "", DATA + 2 * DIA + 600, 5500, "Escova") # muda dia, valor e serviço
+    model.update_agendamento(bia[0], "Bia Lima", "", "", bia[4], bia[5], bia[6]) # só o nome: totais iguais
+    assert _resumo() == _recalculado()
+
+    model.delete_agendamento(cris[0])
+    model.delete_agendamento(bia[0])
+    assert _resumo() == _recalculado()
+    assert [(dia, quantidade, total) for dia, _, quantidade, total in _resumo()] == [(DATA // DIA + 2, 1, 5500)]
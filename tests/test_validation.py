@@ -0,0 +1,98 @@
+"""Validação e conversão dos formulários em controller.validation."""
+from datetime import datetime
+
+import pytest
+
+from controller.validation import (ValidationError, validate_agendamento, validate_list_filters,
+                                   validate_recorrencia, validate_servico)
+from model import codec
+from model.recorrencia import MAX_OCORRENCIAS
+
+FORM = {"Nome": "Ana", "Telefone": "11999990000", "Email": "", "Serviço": "Corte",
+        "Data": "01/03/2027", "Horário": "14:30", "Valor": "50,50", "Duração": ""}
+AGORA = datetime(2027, 3, 3, 15, 20) # quarta-feira
+
+
+def _minutos(*args):
+    return codec.datetime_to_minutes(datetime(*args))
+
+
+def test_agendamento_convertido_para_o_banco():
+    data = validate_agendamento(FORM)
+    assert data["Data"] == _minutos(2027, 3, 1, 14, 30)
+    assert data["Valor"] == 5050
+    assert data["Duração"] == 60
+    assert "Horário" not in data
+    assert FORM["Horário"] == "14:30" # o formulário original não é alterado
+    assert validate_agendamento({**FORM, "Valor": "", "Duração": "45"})["Valor"] == 0
+
+
+@pytest.mark.parametrize("campos, titulo", [
+    ({"Nome": ""}, "Campos Obrigatórios"),
+    ({"Horário": ""}, "Campos Obrigatórios"),
+    ({"Valor": "cinquenta"}, "Valor Inválido"),
+    ({"Duração": "0"}, "Duração Inválida"),
+    ({"Duração": "481"}, "Duração Inválida"),
+    ({"Duração": "1h"}, "Duração Inválida"),
+    ({"Data": "30/02/2027"}, "Data/Horário Inválido"),
+    ({"Horário": "25:00"}, "Data/Horário Inválido"),
+])
+def test_agendamento_invalido(campos, titulo):
+    with pytest.raises(ValidationError) as erro:
+        validate_agendamento({**FORM, **campos})
+    assert erro.value.title == titulo
+
+
+def test_recorrencia():
+    data = _minutos(2027, 3, 1, 14, 30)
+    assert validate_recorrencia({"Repetir": ""}, data) is None
+    assert validate_recorrencia({"Repetir": "semanal", "Vezes": "4"}, data) == {
+        "frequencia": "semanal", "ate": None, "vezes": 4}
+    assert validate_recorrencia({"Repetir": "mensal", "Até": "01/03/2027"}, data) == {
+        "frequencia": "mensal", "ate": _minutos(2027, 3, 2), "vezes": None}
+
+
+@pytest.mark.parametrize("campos", [
+    {"Repetir": "diaria", "Vezes": "3"},
+    {"Repetir": "semanal"},
+    {"Repetir": "semanal", "Vezes": "0"},
+    {"Repetir": "semanal", "Vezes": str(MAX_OCORRENCIAS + 1)},
+    {"Repetir": "semanal", "Até": "28/02/2027"},
+    {"Repetir": "semanal", "Até": "2027-12-31"},
+    {"Repetir": "semanal", "Até": "01/03/2033"}, # mais de MAX_OCORRENCIAS semanas
+])
+def test_recorrencia_invalida(campos):
+    with pytest.raises(ValidationError):
+        validate_recorrencia(campos, _minutos(2027, 3, 1, 14, 30))
+
+
+def test_servico():
+    assert validate_servico({"Nome": " Corte ", "Valor": "35,5", "Duração": ""}) == {
+        "Nome": "Corte", "Valor": 3550, "Duração": 60}
+    for campos in ({"Nome": " "}, {"Nome": "Corte", "Valor": "x"}, {"Nome": "Corte", "Duração": "500"}):
+        with pytest.raises(ValidationError):
+            validate_servico(campos)
+
+
+@pytest.mark.parametrize("filtros, inicio, fim", [
+    ({}, (2027, 3, 3), None),
+    ({"periodo": "hoje"}, (2027, 3, 3), (2027, 3, 4)),
+    ({"periodo": "semana"}, (2027, 3, 1), (2027, 3, 8)),
+    ({"periodo": "proximos"}, (2027, 3, 3, 15, 20), None),
+    ({"periodo": "intervalo", "inicio": "01/03/2027", "fim": "01/03/2027"}, (2027, 3, 1), (2027, 3, 2)),
+    ({"periodo": "intervalo", "fim": "31/03/2027"}, None, (2027, 4, 1)),
+    ({"periodo": "todos"}, None, None),
+])
+def test_filtros_da_listagem(filtros, inicio, fim):
+    resultado = validate_list_filters({**filtros, "servico": " Corte "}, AGORA)
+    assert resultado == {"inicio": inicio and _minutos(*inicio), "fim": fim and _minutos(*fim), "servico": "Corte"}
+
+
+@pytest.mark.parametrize("filtros", [
+    {"periodo": "mes"},
+    {"periodo": "intervalo", "inicio": "32/01/2027"},
+    {"periodo": "intervalo", "inicio": "02/03/2027", "fim": "01/03/2027"},
+])
+def test_filtros_invalidos(filtros):
+    with pytest.raises(ValidationError):
+        validate_list_filters(filtros, AGORA)
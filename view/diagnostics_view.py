@@ -0,0 +1,152 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+REFRESH_INTERVAL_MS = 2000 # Atualização automática enquanto a janela está aberta
+# Colunas da aba de latências: (chave do resumo, título, largura)
+METRIC_COLUMNS = (
+    ("nome", "Operação", 260),
+    ("chamadas", "Chamadas", 70),
+    ("media_ms", "Média (ms)", 80),
+    ("p50_ms", "p50 (ms)", 70),
+    ("p95_ms", "p95 (ms)", 70),
+    ("max_ms", "Máx (ms)", 80),
+    ("total_ms", "Total (ms)", 90),
+    ("linhas", "Linhas", 80),
+)
+
+class DiagnosticsView:
+    """Janela de diagnóstico: latências por operação e log de chamadas lentas."""
+    def __init__(self, master, controller):
+        """Inicializa a janela com as abas de latências e de chamadas lentas."""
+        self.master = master
+        self.controller = controller
+        self._slow_entries = []
+        self._refresh_after_id = None
+
+        self.window = tk.Toplevel(self.master)
+        self.window.title("Diagnóstico de Desempenho")
+        self.window.geometry("820x520+180+180")
+
+        self.top_frame = ttk.Frame(self.window, padding="10 10 10 0")
+        self.top_frame.pack(fill=tk.X)
+        self.active_var = tk.BooleanVar()
+        self.active_check = ttk.Checkbutton(self.top_frame, text="Coletar métricas", variable=self.active_var,
+                                            command=self._handle_toggle_click)
+        self.active_check.pack(side=tk.LEFT)
+        ttk.Label(self.top_frame, text="Lentas acima de (ms):").pack(side=tk.LEFT, padx=(15, 5))
+        self.threshold_entry = ttk.Entry(self.top_frame, width=8)
+        self.threshold_entry.pack(side=tk.LEFT)
+        self.save_button = ttk.Button(self.top_frame, text="Salvar...", command=self._handle_save_click)
+        self.save_button.pack(side=tk.RIGHT)
+        self.reset_button = ttk.Button(self.top_frame, text="Zerar", command=self._handle_reset_click)
+        self.reset_button.pack(side=tk.RIGHT, padx=5)
+
+        self.notebook = ttk.Notebook(self.window, padding="10")
+        self.notebook.pack(expand=True, fill=tk.BOTH)
+
+        metrics_tab = ttk.Frame(self.notebook)
+        self.notebook.add(metrics_tab, text="Latências")
+        self.metrics_tree = ttk.Treeview(metrics_tab, columns=[key for key, _, _ in METRIC_COLUMNS], show='headings')
+        for key, title, width in METRIC_COLUMNS:
+            self.metrics_tree.heading(key, text=title)
+            self.metrics_tree.column(key, width=width, anchor=tk.W if key == "nome" else tk.E)
+        metrics_scroll = ttk.Scrollbar(metrics_tab, orient=tk.VERTICAL, command=self.metrics_tree.yview)
+        self.metrics_tree.configure(yscrollcommand=metrics_scroll.set)
+        metrics_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.metrics_tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        slow_tab = ttk.Frame(self.notebook)
+        self.notebook.add(slow_tab, text="Chamadas Lentas")
+        self.slow_tree = ttk.Treeview(slow_tab, columns=("Quando", "Operação", "ms", "Linhas"), show='headings',
+                                      height=8)
+        self.slow_tree.heading("Quando", text="Quando"); self.slow_tree.column("Quando", width=170)
+        self.slow_tree.heading("Operação", text="Operação"); self.slow_tree.column("Operação", width=300)
+        self.slow_tree.heading("ms", text="ms"); self.slow_tree.column("ms", width=80, anchor=tk.E)
+        self.slow_tree.heading("Linhas", text="Linhas"); self.slow_tree.column("Linhas", width=80, anchor=tk.E)
+        self.slow_tree.pack(side=tk.TOP, fill=tk.X)
+        self.slow_tree.bind("<<TreeviewSelect>>", self._on_slow_selected)
+        ttk.Label(slow_tab, text="SQL executado (com parâmetros):").pack(side=tk.TOP, anchor=tk.W, pady=(5, 0))
+        self.sql_text = tk.Text(slow_tab, height=10, wrap=tk.WORD, state=tk.DISABLED)
+        self.sql_text.pack(side=tk.TOP, expand=True, fill=tk.BOTH)
+
+        self.close_button = ttk.Button(self.window, text="Fechar", command=self.destroy)
+        self.close_button.pack(pady=(0, 10))
+        self.window.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def populate(self, active, threshold_ms, metrics, slow_entries):
+        """Mostra o estado da coleta, as medidas (metricas.resumo) e o log (metricas.lentas)."""
+        self.active_var.set(active)
+        if self.window.focus_get() is not self.threshold_entry:
+            self.threshold_entry.delete(0, tk.END)
+            self.threshold_entry.insert(0, f"{threshold_ms:g}")
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+        for metric in metrics:
+            self.metrics_tree.insert("", tk.END, values=[metric[key] for key, _, _ in METRIC_COLUMNS])
+        selected = self.slow_tree.selection()
+        self.slow_tree.delete(*self.slow_tree.get_children())
+        self._slow_entries = slow_entries
+        for index, entry in enumerate(slow_entries):
+            linhas = "" if entry["linhas"] is None else entry["linhas"]
+            self.slow_tree.insert("", tk.END, iid=index, values=(entry["quando"], entry["nome"], entry["ms"], linhas))
+        if selected and self.slow_tree.exists(selected[0]):
+            self.slow_tree.selection_set(selected[0])
+
+    def _on_slow_selected(self, event):
+        """Mostra as instruções SQL da chamada lenta selecionada."""
+        selected = self.slow_tree.selection()
+        lines = []
+        if selected:
+            for sql, params in self._slow_entries[int(selected[0])]["sql"]:
+                lines.append(f"{sql}\n    {params}")
+        self.sql_text.config(state=tk.NORMAL)
+        self.sql_text.delete("1.0", tk.END)
+        self.sql_text.insert("1.0", "\n\n".join(lines) or "(nenhuma instrução SQL registrada)")
+        self.sql_text.config(state=tk.DISABLED)
+
+    def get_threshold(self):
+        """Texto digitado no limite de chamadas lentas."""
+        return self.threshold_entry.get().strip()
+
+    def schedule_refresh(self):
+        """Agenda a próxima atualização automática."""
+        self._refresh_after_id = self.window.after(REFRESH_INTERVAL_MS, self._handle_refresh_timer)
+
+    def _handle_refresh_timer(self):
+        """Pede ao controller os números atuais."""
+        self._refresh_after_id = None
+        if self.controller: self.controller.handle_diagnostics_refresh()
+
+    def _handle_toggle_click(self):
+        """Liga ou desliga a coleta de métricas."""
+        if self.controller: self.controller.handle_diagnostics_toggle(self.active_var.get())
+
+    def _handle_reset_click(self):
+        """Descarta as medidas coletadas até agora."""
+        if self.controller: self.controller.handle_diagnostics_reset()
+
+    def _handle_save_click(self):
+        """Pede o arquivo de destino e encaminha a gravação para o controller."""
+        path = filedialog.asksaveasfilename(parent=self.window, title="Salvar Métricas", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path and self.controller: self.controller.handle_diagnostics_export(path)
+
+    def show_message(self, title, message):
+        """Exibe uma mensagem informativa na janela de diagnóstico."""
+        messagebox.showinfo(title, message, parent=self.window)
+
+    def show_error(self, title, message):
+        """Exibe uma mensagem de erro na janela de diagnóstico."""
+        messagebox.showerror(title, message, parent=self.window)
+
+    def lift(self):
+        """Traz a janela para a frente."""
+        self.window.deiconify()
+        self.window.lift()
+
+    def destroy(self):
+        """Destroi a janela e cancela a atualização automática."""
+        if self.window.winfo_exists():
+            if self._refresh_after_id is not None:
+                self.window.after_cancel(self._refresh_after_id)
+                self._refresh_after_id = None
+            self.window.destroy()
@@ -10,7 +10,7 @@ class LoginView:
 
         self.window = tk.Toplevel(self.master)
         self.window.title("Login - Salão de Beleza Neide Leila")
-        self.window.geometry("350x200+500+300") 
+        self.window.geometry("350x220+500+300") 
         self.window.resizable(False, False)
 
         self.frame = ttk.Frame(self.window, padding="20")
@@ -26,12 +26,14 @@ class LoginView:
         self.password_entry = ttk.Entry(self.frame, width=35, show="*")
 
         self.login_button = ttk.Button(self.frame, text="Entrar")
+        self.status_label = ttk.Label(self.frame, text="")
 
         self.label_user.pack(pady=(0,5))
         self.username_entry.pack(pady=5)
         self.label_password.pack(pady=(10,5))
         self.password_entry.pack(pady=5)
         self.login_button.pack(pady=1) 
+        self.status_label.pack()
 
         self.username_entry.focus_set()
 
@@ -47,6 +49,11 @@ class LoginView:
         """Retorna o nome de usuário e a senha inseridos."""
         return self.username_entry.get(), self.password_entry.get()
 
+    def set_busy(self, busy):
+        """Bloqueia o botão Entrar e avisa enquanto a senha é verificada no worker."""
+        self.login_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.status_label.config(text="Verificando..." if busy else "")
+
     def show(self):
         """Mostra a janela de login e a torna modal."""
         self.window.deiconify()
@@ -1,6 +1,31 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from bisect import bisect_left
+from model import codec
+
+MAX_LOADED_ROWS = 600 # Linhas mantidas no Treeview; o restante é buscado sob demanda
+SCROLL_EDGE_FRACTION = 0.1 # Proximidade da borda que dispara a próxima página
+SEARCH_DEBOUNCE_MS = 250 # Espera após a última tecla antes de buscar
+AUTOCOMPLETE_MIN_CHARS = 2 # Caracteres digitados em Nome/Telefone antes de sugerir clientes
+AUTOCOMPLETE_FIELDS = ("Nome", "Telefone") # Campos do formulário com sugestões de clientes
+# Colunas do Treeview que ordenam a listagem ao clicar no cabeçalho -> chave de ordenação
+SORTABLE_COLUMNS = {"Nome": "nome", "Data/Hora": "data", "Serviço": "servico", "Valor": "valor"}
+# Períodos da listagem: chave usada pelo controller -> texto exibido
+PERIODOS_LISTAGEM = (
+    ("hoje_e_proximos", "Hoje e próximos"),
+    ("hoje", "Hoje"),
+    ("semana", "Esta semana"),
+    ("proximos", "Próximos"),
+    ("intervalo", "Intervalo"),
+    ("todos", "Todos"),
+)
+# Repetição de um novo agendamento: frequência usada pelo controller -> texto exibido
+REPETICOES = (
+    ("", "Não repete"),
+    ("semanal", "Semanal"),
+    ("quinzenal", "Quinzenal"),
+    ("mensal", "Mensal"),
+)
 
 class MainView:
     """Representa a janela Principal para gerenciamento de agendamentos."""
@@ -9,13 +34,26 @@ class MainView:
         self.master = master
         self.controller = controller
         self.master.title("Agendamentos - Salão de Beleza Neide Leila")
-        self.master.geometry("800x650+100+100")
+        self.master.geometry("800x760+100+100")
         self.master.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         self.data_var = tk.StringVar()
         self.horario_var = tk.StringVar()
+        self.search_var = tk.StringVar()
+        self.periodo_var = tk.StringVar(value=PERIODOS_LISTAGEM[0][1])
+        self.repetir_var = tk.StringVar(value=REPETICOES[0][1])
+        self._search_after_id = None
+        self._row_keys = [] # Chaves de ordenação (terminadas em id) das linhas carregadas, em ordem
+        self._sort_key = None # Função linha -> chave, definida pelo controller em set_sort()
+        self._sort_descending = False
+        self._key_by_id = {}
+        self._has_more_before = False
+        self._has_more_after = False
+        self._page_request_pending = False
         self._data_var_trace_active = True
         self._horario_var_trace_active = True
+        self._suggestions = [] # Clientes (id, nome, telefone, email) exibidos na lista de sugestões
+        self._suggestions_field = None
 
         self.vcmd_digits = (self.master.register(self._validate_digits_only), '%P')
         self.vcmd_decimal = (self.master.register(self._validate_decimal_input), '%P')
@@ -37,9 +75,9 @@ class MainView:
         return P_value == "" or P_value.isdigit()
 
     def _validate_decimal_input(self, P_value):
-        """Valida se o valor é um decimal válido (um ponto) ou vazio."""
+        """Valida se o valor é um decimal válido (um único separador, ponto ou vírgula) ou vazio."""
         if P_value == "": return True
-        return all(char.isdigit() or char == '.' for char in P_value) and P_value.count('.') <= 1
+        return all(char.isdigit() or char in '.,' for char in P_value) and P_value.count('.') + P_value.count(',') <= 1
 
     def _validate_date_action(self, action_code, text_being_inserted):
         """Valida a entrada no campo de data (permite só dígitos, até 8)."""
@@ -98,7 +136,7 @@ class MainView:
         """Cria e organiza todos os widgets na janela principal."""
         self.labels = {}
         self.entries = {}
-        fields = ["Nome", "Telefone", "Email", "Data (DD/MM/AAAA)", "Horário (HH:MM)", "Valor (R$)", "Serviço"]
+        fields = ["Nome", "Telefone", "Email", "Data (DD/MM/AAAA)", "Horário (HH:MM)", "Duração (min)", "Valor (R$)", "Serviço"]
         current_row = 0
         for field_config in fields:
             label_text_full = field_config
@@ -112,32 +150,87 @@ class MainView:
             elif label_text_key == "Horário":
                 entry_widget = ttk.Entry(self.form_frame, width=40, textvariable=self.horario_var,
                                          validate='key', validatecommand=self.vcmd_time_action)
+            elif label_text_key == "Serviço":
+                entry_widget = ttk.Combobox(self.form_frame, width=38)
+                entry_widget.bind("<<ComboboxSelected>>", lambda event: self._on_service_chosen(only_if_empty=False))
+                entry_widget.bind("<FocusOut>", lambda event: self._on_service_chosen(only_if_empty=True))
             else:
                 entry_widget = ttk.Entry(self.form_frame, width=40)
             entry_widget.grid(row=current_row, column=1, padx=5, pady=5, sticky=tk.W)
             self.entries[label_text_key] = entry_widget
-            if label_text_key == "Telefone":
+            if label_text_key in ("Telefone", "Duração"):
                 entry_widget.config(validate='key', validatecommand=self.vcmd_digits)
             elif label_text_key == "Valor":
                 entry_widget.config(validate='key', validatecommand=self.vcmd_decimal)
+            if label_text_key in AUTOCOMPLETE_FIELDS:
+                entry_widget.bind("<KeyRelease>", lambda event, field=label_text_key: self._on_client_key(event, field))
+                entry_widget.bind("<Down>", lambda event: self._focus_suggestions())
+                entry_widget.bind("<Escape>", lambda event: self.hide_client_suggestions())
+                entry_widget.bind("<FocusOut>", self._on_client_focus_out)
             current_row += 1
+        ttk.Label(self.form_frame, text="Repetir:").grid(row=current_row, column=0, padx=5, pady=5, sticky=tk.W)
+        self.repeat_frame = ttk.Frame(self.form_frame)
+        self.repeat_frame.grid(row=current_row, column=1, padx=5, pady=5, sticky=tk.W)
+        self.repetir_combo = ttk.Combobox(self.repeat_frame, textvariable=self.repetir_var, state="readonly",
+                                          values=[label for _, label in REPETICOES], width=12)
+        self.repetir_combo.pack(side=tk.LEFT)
+        self.repeat_entries = {}
+        for key, label, width in (("Até", "Até (DD/MM/AAAA):", 12), ("Vezes", "ou Vezes:", 5)):
+            ttk.Label(self.repeat_frame, text=label).pack(side=tk.LEFT, padx=(10, 5))
+            self.repeat_entries[key] = ttk.Entry(self.repeat_frame, width=width)
+            self.repeat_entries[key].pack(side=tk.LEFT)
+        self.repeat_entries["Vezes"].config(validate='key', validatecommand=self.vcmd_digits)
+        current_row += 1
+        self.suggestions_list = tk.Listbox(self.form_frame, height=0, activestyle="dotbox", exportselection=False)
+        self.suggestions_list.bind("<Return>", lambda event: self._choose_suggestion())
+        self.suggestions_list.bind("<Double-Button-1>", lambda event: self._choose_suggestion())
+        self.suggestions_list.bind("<Escape>", lambda event: self._close_suggestions_list())
+        self.suggestions_list.bind("<FocusOut>", self._on_client_focus_out)
         self.form_button_frame = ttk.Frame(self.form_frame)
         self.form_button_frame.grid(row=current_row, column=0, columnspan=2, pady=10)
         self.add_button = ttk.Button(self.form_button_frame, text="Adicionar Novo", command=self._handle_add_click)
         self.save_button = ttk.Button(self.form_button_frame, text="Salvar Alterações", command=self._handle_save_click)
         self.clear_button = ttk.Button(self.form_button_frame, text="Limpar Campos", command=self._handle_clear_click)
+        self.free_slots_button = ttk.Button(self.form_button_frame, text="Horários Livres", command=self._handle_free_slots_click)
         self.add_button.pack(side=tk.LEFT, padx=5)
         self.save_button.pack(side=tk.LEFT, padx=5)
         self.clear_button.pack(side=tk.LEFT, padx=5)
+        self.free_slots_button.pack(side=tk.LEFT, padx=5)
         self.save_button.config(state=tk.DISABLED)
+        self.filter_frame = ttk.Frame(self.list_frame)
+        self.filter_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Label(self.filter_frame, text="Período:").pack(side=tk.LEFT, padx=(0, 5))
+        self.periodo_combo = ttk.Combobox(self.filter_frame, textvariable=self.periodo_var, state="readonly",
+                                          values=[label for _, label in PERIODOS_LISTAGEM], width=16)
+        self.periodo_combo.pack(side=tk.LEFT)
+        self.periodo_combo.bind("<<ComboboxSelected>>", self._on_periodo_selected)
+        self.filter_entries = {}
+        for key, text in (("inicio", "De:"), ("fim", "Até:"), ("servico", "Serviço:")):
+            ttk.Label(self.filter_frame, text=text).pack(side=tk.LEFT, padx=(10, 5))
+            entry = ttk.Entry(self.filter_frame, width=12)
+            entry.pack(side=tk.LEFT)
+            entry.bind("<Return>", lambda event: self._handle_filter_click())
+            self.filter_entries[key] = entry
+        self.filter_button = ttk.Button(self.filter_frame, text="Filtrar", command=self._handle_filter_click)
+        self.filter_button.pack(side=tk.LEFT, padx=(10, 0))
+        self._update_range_entries()
+        self.search_frame = ttk.Frame(self.list_frame)
+        self.search_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Label(self.search_frame, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var, width=40)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_var.trace_add('write', self._on_search_changed)
         self.tree = ttk.Treeview(self.list_frame, columns=("ID", "Nome", "Data/Hora", "Serviço", "Valor"), show='headings')
         self.tree.heading("ID", text="ID"); self.tree.column("ID", width=40, anchor=tk.CENTER)
         self.tree.heading("Nome", text="Nome Cliente"); self.tree.column("Nome", width=200)
         self.tree.heading("Data/Hora", text="Data/Hora"); self.tree.column("Data/Hora", width=150, anchor=tk.CENTER)
         self.tree.heading("Serviço", text="Serviço"); self.tree.column("Serviço", width=150)
         self.tree.heading("Valor", text="Valor (R$)"); self.tree.column("Valor", width=80, anchor=tk.E)
+        self._heading_texts = {column: self.tree.heading(column, "text") for column in SORTABLE_COLUMNS}
+        for column, ordenacao in SORTABLE_COLUMNS.items():
+            self.tree.heading(column, command=lambda o=ordenacao: self._handle_sort_click(o))
         self.scrollbar_y = ttk.Scrollbar(self.list_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.scrollbar_y.set)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
         self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
         self.scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
         self.list_button_frame = ttk.Frame(self.list_frame)
@@ -146,7 +239,17 @@ class MainView:
         self.delete_button = ttk.Button(self.list_button_frame, text="Remover Selecionado", command=self._handle_delete_click)
         self.report_button = ttk.Button(self.list_button_frame, text="Gerar Relatório", command=self._handle_report_click)
         self.edit_button.pack(pady=5, fill=tk.X); self.delete_button.pack(pady=5, fill=tk.X)
+        self.import_button = ttk.Button(self.list_button_frame, text="Importar Arquivo", command=self._handle_import_click)
+        self.diagnostics_button = ttk.Button(self.list_button_frame, text="Diagnóstico", command=self._handle_diagnostics_click)
+        self.services_button = ttk.Button(self.list_button_frame, text="Serviços", command=self._handle_services_click)
         self.report_button.pack(pady=15, fill=tk.X)
+        self.import_button.pack(pady=5, fill=tk.X)
+        self.services_button.pack(pady=5, fill=tk.X)
+        self.diagnostics_button.pack(pady=5, fill=tk.X)
+        self.status_label = ttk.Label(self.list_button_frame, text="")
+        self.status_label.pack(side=tk.BOTTOM, pady=5)
+        self.backup_label = ttk.Label(self.list_button_frame, text="")
+        self.backup_label.pack(side=tk.BOTTOM)
         self.edit_button.config(state=tk.DISABLED); self.delete_button.config(state=tk.DISABLED)
         self.tree.bind("<<TreeviewSelect>>", self._handle_tree_select_event)
 
@@ -163,6 +266,10 @@ class MainView:
         self.clear_form() 
         if self.controller: self.controller.handle_clear_form_request()
 
+    def _handle_free_slots_click(self):
+        """Encaminha a consulta de horários livres para o controller."""
+        if self.controller: self.controller.handle_show_free_slots()
+
     def _handle_edit_click(self):
         """Encaminha a ação de editar para o controller."""
         if self.controller: self.controller.handle_edit_selection()
@@ -175,35 +282,292 @@ class MainView:
         """Encaminha a ação de gerar relatório para o controller."""
         if self.controller: self.controller.handle_show_report()
 
+    def _handle_diagnostics_click(self):
+        """Encaminha a abertura da janela de diagnóstico para o controller."""
+        if self.controller: self.controller.handle_show_diagnostics()
+
+    def _handle_services_click(self):
+        """Encaminha a abertura do catálogo de serviços para o controller."""
+        if self.controller: self.controller.handle_show_services()
+
+    def _on_service_chosen(self, only_if_empty):
+        """Pede ao controller o valor e a duração padrão do serviço escolhido.
+
+        Ao sair do campo (`only_if_empty`), só preenche se o Valor ainda estiver vazio.
+        """
+        nome = self.entries["Serviço"].get().strip()
+        if nome and self.controller and not (only_if_empty and self.entries["Valor"].get().strip()):
+            self.controller.handle_service_selected(nome)
+
+    def set_service_names(self, nomes):
+        """Opções da lista de serviços do formulário."""
+        self.entries["Serviço"].config(values=nomes)
+
+    def set_service_defaults(self, nome, valor, duracao):
+        """Preenche Serviço (com o nome do catálogo), Valor e Duração com os padrões do serviço."""
+        for key, value in (("Serviço", nome), ("Valor", valor), ("Duração", duracao)):
+            self.entries[key].delete(0, tk.END)
+            self.entries[key].insert(0, value)
+
+    def _handle_import_click(self):
+        """Pede o arquivo a importar e encaminha para o controller."""
+        path = filedialog.askopenfilename(
+            parent=self.master, title="Importar Agendamentos",
+            filetypes=[("Planilhas e JSON", "*.csv *.json *.jsonl"), ("Todos os arquivos", "*.*")])
+        if path and self.controller: self.controller.handle_import_file(path)
+
+    def _handle_sort_click(self, ordenacao):
+        """Encaminha o clique no cabeçalho (ordenação) para o controller."""
+        if self.controller: self.controller.handle_sort(ordenacao)
+
+    def set_sort(self, ordenacao, descendente, key_func):
+        """Define a ordenação exibida: marca o cabeçalho e guarda a função de chave das linhas."""
+        self._sort_key = key_func
+        self._sort_descending = descendente
+        for column, key in SORTABLE_COLUMNS.items():
+            arrow = (" ▼" if descendente else " ▲") if key == ordenacao else ""
+            self.tree.heading(column, text=self._heading_texts[column] + arrow)
+
+    def _bisect(self, key):
+        """Posição de `key` em _row_keys (crescente ou decrescente, conforme a ordenação)."""
+        if not self._sort_descending:
+            return bisect_left(self._row_keys, key)
+        lo, hi = 0, len(self._row_keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._row_keys[mid] > key: lo = mid + 1
+            else: hi = mid
+        return lo
+
     def _handle_tree_select_event(self, event):
         """Encaminha o evento de seleção na árvore para o controller."""
         if self.controller: self.controller.handle_tree_select(event)
 
-    def populate_treeview(self, data):
-        """Preenche o Treeview com os dados dos agendamentos."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def _update_range_entries(self):
+        """Habilita os campos De/Até apenas no período "Intervalo"."""
+        state = tk.NORMAL if self.get_list_filters()["periodo"] == "intervalo" else tk.DISABLED
+        self.filter_entries["inicio"].config(state=state)
+        self.filter_entries["fim"].config(state=state)
+
+    def _on_periodo_selected(self, event):
+        """Recarrega a listagem ao trocar de período (o intervalo espera o botão Filtrar)."""
+        self._update_range_entries()
+        if self.get_list_filters()["periodo"] != "intervalo":
+            self._handle_filter_click()
+
+    def _handle_filter_click(self):
+        """Encaminha os filtros da listagem para o controller."""
+        if self.controller: self.controller.handle_filter_change()
+
+    def get_list_filters(self):
+        """Retorna {"periodo", "inicio", "fim", "servico"} escolhidos nos filtros da listagem."""
+        label = self.periodo_var.get()
+        periodo = next((key for key, text in PERIODOS_LISTAGEM if text == label), PERIODOS_LISTAGEM[0][0])
+        filters = {key: entry.get().strip() for key, entry in self.filter_entries.items()}
+        filters["periodo"] = periodo
+        return filters
+
+    def _on_search_changed(self, var_name, index, mode):
+        """Reagenda a busca a cada tecla; só busca após SEARCH_DEBOUNCE_MS sem digitação."""
+        if self._search_after_id is not None:
+            self.master.after_cancel(self._search_after_id)
+        self._search_after_id = self.master.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        """Encaminha o termo de busca atual para o controller."""
+        self._search_after_id = None
+        if self.controller: self.controller.handle_search(self.search_var.get().strip())
+
+    def _on_client_key(self, event, field):
+        """Pede sugestões de clientes ao controller para o texto digitado em Nome ou Telefone."""
+        if event.keysym in ("Down", "Up", "Escape", "Return", "Tab"):
+            return
+        text = self.entries[field].get().strip()
+        if len(text) < AUTOCOMPLETE_MIN_CHARS:
+            self.hide_client_suggestions()
+        elif self.controller:
+            self.controller.handle_client_lookup(field, text)
+
+    def show_client_suggestions(self, field, suggestions):
+        """Mostra, logo abaixo do campo, os clientes sugeridos (ou esconde a lista se não houver)."""
+        self._suggestions = list(suggestions)
+        self._suggestions_field = field
+        if not self._suggestions:
+            self.hide_client_suggestions()
+            return
+        self.suggestions_list.delete(0, tk.END)
+        for _, nome, telefone, email in self._suggestions:
+            self.suggestions_list.insert(tk.END, " - ".join(part for part in (nome, telefone, email) if part))
+        self.suggestions_list.config(height=len(self._suggestions))
+        self.suggestions_list.place(in_=self.entries[field], relx=0, rely=1.0, relwidth=1.0)
+        self.suggestions_list.lift()
+
+    def hide_client_suggestions(self):
+        """Esconde a lista de sugestões de clientes."""
+        self._suggestions = []
+        self.suggestions_list.place_forget()
+
+    def _focus_suggestions(self):
+        """Leva o foco (seta para baixo) para a primeira sugestão."""
+        if self._suggestions:
+            self.suggestions_list.focus_set()
+            self.suggestions_list.selection_clear(0, tk.END)
+            self.suggestions_list.selection_set(0)
+            self.suggestions_list.activate(0)
+
+    def _close_suggestions_list(self):
+        """Fecha as sugestões e devolve o foco ao campo em que o usuário digitava."""
+        field = self._suggestions_field
+        self.hide_client_suggestions()
+        if field: self.entries[field].focus_set()
+
+    def _choose_suggestion(self):
+        """Envia ao controller o cliente escolhido na lista."""
+        selection = self.suggestions_list.curselection()
+        if not selection or not self._suggestions:
+            return
+        cliente_id = self._suggestions[selection[0]][0]
+        self._close_suggestions_list()
+        if self.controller: self.controller.handle_client_selected(cliente_id)
+
+    def _on_client_focus_out(self, event):
+        """Esconde as sugestões quando o foco sai do campo e da própria lista."""
+        self.master.after_idle(self._hide_suggestions_if_unfocused)
+
+    def _hide_suggestions_if_unfocused(self):
+        """Esconde as sugestões se o foco não estiver no campo de origem nem na lista."""
+        focus = self.master.focus_get()
+        field = self._suggestions_field
+        if focus is not self.suggestions_list and (not field or focus is not self.entries[field]):
+            self.hide_client_suggestions()
+
+    def set_client_fields(self, nome, telefone, email):
+        """Preenche Nome, Telefone e Email com os dados de um cliente."""
+        for key, value in (("Nome", nome), ("Telefone", telefone), ("Email", email)):
+            self.entries[key].delete(0, tk.END)
+            self.entries[key].insert(0, value)
+        if self.entries.get("Data"): self.entries["Data"].focus_set()
+
+    def get_search_term(self):
+        """Retorna o termo digitado na caixa de busca."""
+        return self.search_var.get().strip()
+
+    def _on_tree_scroll(self, first, last):
+        """Atualiza a barra de rolagem e pede páginas ao se aproximar das bordas."""
+        self.scrollbar_y.set(first, last)
+        if self._page_request_pending or not self._row_keys or not self.controller:
+            return
+        if self._has_more_after and float(last) >= 1.0 - SCROLL_EDGE_FRACTION:
+            self._page_request_pending = True
+            self.controller.handle_load_page("next", self._row_keys[-1])
+        elif self._has_more_before and float(first) <= SCROLL_EDGE_FRACTION:
+            self._page_request_pending = True
+            self.controller.handle_load_page("previous", self._row_keys[0])
+
+    def _format_tree_row(self, row):
+        """Converte uma linha do banco na tupla exibida pelo Treeview."""
+        return (row[0], row[1], codec.format_datetime(row[4]), row[6], codec.format_money(row[5]))
+
+    def populate_treeview(self, data, has_more_after=False):
+        """Preenche o Treeview com a primeira página de agendamentos."""
+        self.tree.delete(*self.tree.get_children())
+        self._row_keys = []
+        self._key_by_id = {}
+        self._has_more_before = False
+        self._has_more_after = has_more_after
+        self._page_request_pending = False
+        for row in data:
+            self.tree.insert("", tk.END, values=self._format_tree_row(row), iid=row[0])
+            key = self._sort_key(row)
+            self._row_keys.append(key)
+            self._key_by_id[row[0]] = key
+
+    def append_page(self, data, has_more):
+        """Acrescenta uma página ao final e descarta linhas antigas do topo."""
+        self._page_request_pending = False
+        self._has_more_after = has_more
+        if not data: return
+        first_visible = float(self.tree.yview()[0]) * len(self._row_keys)
         for row in data:
-            db_datetime_str = row[4] 
-            display_datetime_tree = db_datetime_str 
-            try:
-                dt_obj = datetime.strptime(db_datetime_str, "%Y-%m-%d %H:%M:%S")
-                display_datetime_tree = dt_obj.strftime("%d/%m/%Y %H:%M")
-            except (ValueError, TypeError): 
-                try:
-                    dt_obj = datetime.strptime(db_datetime_str.split(" ")[0], "%Y-%m-%d")
-                    display_datetime_tree = dt_obj.strftime("%d/%m/%Y")
-                except (ValueError, TypeError, AttributeError): pass 
-            display_row = (row[0], row[1], display_datetime_tree, row[6], f"{row[5]:.2f}") 
-            self.tree.insert("", tk.END, values=display_row, iid=row[0])
+            self.tree.insert("", tk.END, values=self._format_tree_row(row), iid=row[0])
+            key = self._sort_key(row)
+            self._row_keys.append(key)
+            self._key_by_id[row[0]] = key
+        excess = len(self._row_keys) - MAX_LOADED_ROWS
+        if excess > 0:
+            self._forget_keys(self._row_keys[:excess])
+            del self._row_keys[:excess]
+            self._has_more_before = True
+            self.tree.yview_moveto(max(first_visible - excess, 0) / len(self._row_keys))
+
+    def prepend_page(self, data, has_more):
+        """Insere uma página no início e descarta linhas do final."""
+        self._page_request_pending = False
+        self._has_more_before = has_more
+        if not data: return
+        first_visible = float(self.tree.yview()[0]) * len(self._row_keys)
+        for row in reversed(data):
+            self.tree.insert("", 0, values=self._format_tree_row(row), iid=row[0])
+        keys = [self._sort_key(row) for row in data]
+        self._row_keys[:0] = keys
+        self._key_by_id.update((row[0], key) for row, key in zip(data, keys))
+        excess = len(self._row_keys) - MAX_LOADED_ROWS
+        if excess > 0:
+            self._forget_keys(self._row_keys[-excess:])
+            del self._row_keys[-excess:]
+            self._has_more_after = True
+        self.tree.yview_moveto((first_visible + len(data)) / len(self._row_keys))
+
+    def _forget_keys(self, keys):
+        """Remove do Treeview as linhas com as chaves dadas (sem mexer em _row_keys)."""
+        self.tree.delete(*[key[-1] for key in keys])
+        for key in keys:
+            self._key_by_id.pop(key[-1], None)
+
+    def _is_outside_window(self, index):
+        """Indica se uma posição cai fora da janela carregada (linha ainda não paginada)."""
+        return ((index == 0 and self._has_more_before) or
+                (index == len(self._row_keys) and self._has_more_after))
+
+    def upsert_row(self, row):
+        """Insere ou atualiza uma única linha na posição ordenada, sem recarregar a lista."""
+        old_key = self._key_by_id.pop(row[0], None)
+        if old_key is not None:
+            del self._row_keys[self._bisect(old_key)]
+        key = self._sort_key(row)
+        index = self._bisect(key)
+        if self._is_outside_window(index):
+            if old_key is not None: self.tree.delete(row[0])
+            return
+        if old_key is not None:
+            self.tree.item(row[0], values=self._format_tree_row(row))
+            self.tree.move(row[0], "", index)
+        else:
+            self.tree.insert("", index, values=self._format_tree_row(row), iid=row[0])
+        self._row_keys.insert(index, key)
+        self._key_by_id[row[0]] = key
+
+    def remove_row(self, agendamento_id):
+        """Remove uma única linha do Treeview, se estiver carregada."""
+        key = self._key_by_id.pop(agendamento_id, None)
+        if key is None: return
+        del self._row_keys[self._bisect(key)]
+        self.tree.delete(agendamento_id)
+
+    def has_row(self, agendamento_id):
+        """Indica se o agendamento está carregado no Treeview."""
+        return agendamento_id in self._key_by_id
 
     def get_form_data(self):
         """Retorna um dicionário com os dados dos campos do formulário."""
         return {
             "Nome": self.entries["Nome"].get(), "Telefone": self.entries["Telefone"].get(),
             "Email": self.entries["Email"].get(), "Data": self.data_var.get(), 
-            "Horário": self.horario_var.get(), "Valor": self.entries["Valor"].get(),
-            "Serviço": self.entries["Serviço"].get()
+            "Horário": self.horario_var.get(), "Duração": self.entries["Duração"].get(),
+            "Valor": self.entries["Valor"].get(),
+            "Serviço": self.entries["Serviço"].get(),
+            "Repetir": next((key for key, text in REPETICOES if text == self.repetir_var.get()), ""),
+            "Até": self.repeat_entries["Até"].get().strip(), "Vezes": self.repeat_entries["Vezes"].get().strip()
         }
 
     def set_form_data(self, data_dict_from_controller): 
@@ -212,21 +576,14 @@ class MainView:
         self.entries["Nome"].insert(0, data_dict_from_controller.get("Nome", ""))
         self.entries["Telefone"].insert(0, data_dict_from_controller.get("Telefone", ""))
         self.entries["Email"].insert(0, data_dict_from_controller.get("Email", ""))
-        db_datetime_str = data_dict_from_controller.get("Data", "") 
+        db_minutes = data_dict_from_controller.get("Data")
         display_date_form, display_time_form = "", ""
-        if db_datetime_str:
-            try:
-                dt_obj = datetime.strptime(db_datetime_str, "%Y-%m-%d %H:%M:%S")
-                display_date_form = dt_obj.strftime("%d/%m/%Y")
-                display_time_form = dt_obj.strftime("%H:%M")
-            except (ValueError, TypeError):
-                try:
-                    dt_obj = datetime.strptime(db_datetime_str.split(" ")[0], "%Y-%m-%d")
-                    display_date_form = dt_obj.strftime("%d/%m/%Y")
-                except (ValueError, TypeError, AttributeError):
-                    display_date_form, display_time_form = "Data Inv.", "Hora Inv."
+        if isinstance(db_minutes, int):
+            display_date_form = codec.format_date(db_minutes)
+            display_time_form = codec.format_time(db_minutes)
         self.data_var.set(display_date_form)
         self.horario_var.set(display_time_form) 
+        self.entries["Duração"].insert(0, data_dict_from_controller.get("Duração", ""))
         self.entries["Valor"].insert(0, data_dict_from_controller.get("Valor", ""))
         self.entries["Serviço"].insert(0, data_dict_from_controller.get("Serviço", ""))
 
@@ -236,11 +593,15 @@ class MainView:
             if key == "Data": self.data_var.set("")
             elif key == "Horário": self.horario_var.set("")
             else: entry_widget.delete(0, tk.END)
+        self.repetir_var.set(REPETICOES[0][1])
+        for entry_widget in self.repeat_entries.values():
+            entry_widget.delete(0, tk.END)
         if self.entries.get("Nome"): self.entries["Nome"].focus_set()
     
     def clear_form(self):
         """Limpa os campos do formulário e reseta o estado dos botões e seleção."""
         self.clear_form_fields()
+        self.hide_client_suggestions()
         if self.tree.selection(): self.tree.selection_remove(self.tree.selection()[0])
         self.save_button.config(state=tk.DISABLED)
         self.edit_button.config(state=tk.DISABLED)
@@ -265,6 +626,15 @@ class MainView:
         self.save_button.config(state=tk.NORMAL if enable else tk.DISABLED)
         self.add_button.config(state=tk.DISABLED if enable else tk.NORMAL)
 
+    def set_loading(self, loading=True):
+        """Indica (ou encerra a indicação) de que há operações do banco em andamento."""
+        self.status_label.config(text="Carregando..." if loading else "")
+        self.master.config(cursor="watch" if loading else "")
+
+    def set_backup_status(self, text):
+        """Mostra o andamento ou o horário do último backup automático."""
+        self.backup_label.config(text=text)
+
     def show_message(self, title, message):
         """Exibe uma caixa de diálogo de informação."""
         messagebox.showinfo(title, message, parent=self.master)
@@ -277,6 +647,10 @@ class MainView:
         """Exibe uma caixa de diálogo de pergunta (Sim/Não)."""
         return messagebox.askyesno(title, message, parent=self.master)
 
+    def ask_series_scope(self, title, message):
+        """Pergunta se a ação vale para esta ocorrência e as seguintes (True), só esta (False) ou nenhuma (None)."""
+        return messagebox.askyesnocancel(title, message, parent=self.master)
+
     def show(self):
         """Mostra a janela principal."""
         self.master.deiconify()
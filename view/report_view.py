@@ -1,5 +1,19 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox, filedialog
+from model import codec
+
+# Abas de relatório agregado: chave do agrupamento -> (título da aba, título da coluna de grupo)
+AGGREGATE_TABS = (
+    ("dia", "Por Dia", "Dia"),
+    ("mes", "Por Mês", "Mês"),
+    ("ano", "Por Ano", "Ano"),
+    ("servico", "Por Serviço", "Serviço"),
+)
+
+RENDER_BATCH_SIZE = 500 # Linhas inseridas no Treeview por vez, entre atualizações da tela
+RENDER_INTERVAL_MS = 1 # Pausa entre lotes, para o Tk processar eventos (rolagem, Cancelar)
+# Colunas do relatório que ordenam ao clicar no cabeçalho -> chave de ordenação
+SORTABLE_COLUMNS = {"Nome": "nome", "Data": "data", "Valor": "valor", "Serviço": "servico"}
 
 class ReportView:
     """Representa a janela de Relatórios, exibindo agendamentos."""
@@ -13,8 +27,12 @@ class ReportView:
         self.window.geometry("900x500+150+150")
         self.window.resizable(True, True)
 
-        self.frame = ttk.Frame(self.window, padding="10")
-        self.frame.pack(expand=True, fill=tk.BOTH)
+        self.period_label = ttk.Label(self.window, text="")
+        self.period_label.pack(fill=tk.X, padx=10, pady=(10, 0))
+        self.notebook = ttk.Notebook(self.window, padding="10")
+        self.notebook.pack(expand=True, fill=tk.BOTH)
+        self.frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.frame, text="Agendamentos")
 
         self.tree = ttk.Treeview(self.frame,
                                  columns=("ID", "Nome", "Telefone", "Email", "Data", "Valor", "Serviço"),
@@ -26,6 +44,23 @@ class ReportView:
         self.tree.heading("Data", text="Data/Hora"); self.tree.column("Data", width=120, anchor=tk.CENTER)
         self.tree.heading("Valor", text="Valor (R$)"); self.tree.column("Valor", width=80, anchor=tk.E)
         self.tree.heading("Serviço", text="Serviço"); self.tree.column("Serviço", width=150)
+        self._heading_texts = {column: self.tree.heading(column, "text") for column in SORTABLE_COLUMNS}
+        for column, ordenacao in SORTABLE_COLUMNS.items():
+            self.tree.heading(column, command=lambda o=ordenacao: self._handle_sort_click(o))
+
+        self._render_rows = [] # Linhas do relatório em exibição, inseridas aos poucos
+        self._render_items = () # Itens já existentes no Treeview, reaproveitados em ordem
+        self._render_index = 0
+        self._render_after_id = None
+        self.progress_frame = ttk.Frame(self.frame)
+        self.progress_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", length=200)
+        self.progress_bar.pack(side=tk.LEFT)
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        self.cancel_button = ttk.Button(self.progress_frame, text="Cancelar", command=self.cancel_render,
+                                        state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT)
 
         self.scrollbar_y = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.scrollbar_x = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
@@ -35,18 +70,145 @@ class ReportView:
         self.scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
 
+        self.aggregate_trees = {}
+        for key, tab_title, group_title in AGGREGATE_TABS:
+            self.aggregate_trees[key] = self._create_aggregate_tab(tab_title, group_title)
+
+        self.export_frame = ttk.LabelFrame(self.window, text="Período e exportação", padding="5")
+        self.export_frame.pack(fill=tk.X, padx=10)
+        self.export_entries = {}
+        for column, (key, label_text) in enumerate((("Inicio", "De (DD/MM/AAAA):"), ("Fim", "Até (DD/MM/AAAA):"),
+                                                    ("Serviço", "Serviço:"))):
+            ttk.Label(self.export_frame, text=label_text).grid(row=0, column=2 * column, padx=5, sticky=tk.W)
+            self.export_entries[key] = ttk.Entry(self.export_frame, width=14)
+            self.export_entries[key].grid(row=0, column=2 * column + 1, padx=5)
+        self.filter_button = ttk.Button(self.export_frame, text="Filtrar", command=self._handle_filter_click)
+        self.filter_button.grid(row=0, column=6, padx=(10, 0))
+        self.export_button = ttk.Button(self.export_frame, text="Exportar...", command=self._handle_export_click)
+        self.export_button.grid(row=0, column=7, padx=10)
+
         self.close_button = ttk.Button(self.window, text="Fechar", command=self.destroy)
         self.close_button.pack(pady=10)
         self.window.protocol("WM_DELETE_WINDOW", self.destroy)
 
+    def _create_aggregate_tab(self, tab_title, group_title):
+        """Cria uma aba com Treeview de totais (grupo, quantidade, total, média)."""
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text=tab_title)
+        tree = ttk.Treeview(tab, columns=("Grupo", "Quantidade", "Total", "Média"), show='headings')
+        tree.heading("Grupo", text=group_title); tree.column("Grupo", width=200)
+        tree.heading("Quantidade", text="Atendimentos"); tree.column("Quantidade", width=100, anchor=tk.E)
+        tree.heading("Total", text="Total (R$)"); tree.column("Total", width=120, anchor=tk.E)
+        tree.heading("Média", text="Média (R$)"); tree.column("Média", width=120, anchor=tk.E)
+        scrollbar_y = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar_y.set)
+        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        return tree
+
+    def populate_aggregates(self, resumos):
+        """Preenche as abas agregadas com {agrupamento: [(grupo, quantidade, total, média)]}."""
+        for key, rows in resumos.items():
+            tree = self.aggregate_trees.get(key)
+            if tree is None: continue
+            tree.delete(*tree.get_children())
+            for grupo, quantidade, total, media in rows:
+                if key == "dia": grupo = codec.format_day(grupo)
+                tree.insert("", tk.END, values=(grupo, quantidade, codec.format_money(total), codec.format_money(media)))
+
+    def set_period(self, texto):
+        """Mostra acima das abas o período e o serviço em uso no relatório."""
+        self.period_label.config(text=texto)
+
+    def _handle_sort_click(self, ordenacao):
+        """Encaminha o clique no cabeçalho (ordenação) para o controller."""
+        if self.controller: self.controller.handle_report_sort(ordenacao)
+
+    def set_sort(self, ordenacao, descendente):
+        """Marca no cabeçalho a coluna e o sentido da ordenação atual."""
+        for column, key in SORTABLE_COLUMNS.items():
+            arrow = (" ▼" if descendente else " ▲") if key == ordenacao else ""
+            self.tree.heading(column, text=self._heading_texts[column] + arrow)
+
     def populate_report(self, data):
-        """Preenche o Treeview com os dados do relatório."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for row in data:
-            formatted_row = list(row)
-            formatted_row[5] = f"{row[5]:.2f}" # Formata valor
-            self.tree.insert("", tk.END, values=tuple(formatted_row))
+        """Preenche o Treeview com os dados do relatório em lotes agendados com after().
+
+        Os itens já existentes são reaproveitados (só têm os valores trocados); os que
+        sobrarem são removidos ao final. Uma nova chamada substitui a renderização em curso.
+        """
+        self._stop_render()
+        self._render_rows = data
+        self._render_items = self.tree.get_children()
+        self._render_index = 0
+        self.progress_bar.config(maximum=max(len(data), 1), value=0)
+        self.cancel_button.config(state=tk.NORMAL)
+        self._render_next_batch()
+
+    def _render_next_batch(self):
+        """Insere/atualiza o próximo lote de linhas e agenda o seguinte."""
+        self._render_after_id = None
+        items = self._render_items
+        start = self._render_index
+        end = min(start + RENDER_BATCH_SIZE, len(self._render_rows))
+        for position in range(start, end):
+            row = self._render_rows[position]
+            values = (row[0], row[1], row[2], row[3], codec.format_datetime(row[4]),
+                      codec.format_money(row[5]), row[6])
+            if position < len(items):
+                self.tree.item(items[position], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+        self._render_index = end
+        self.progress_bar.config(value=end)
+        if end < len(self._render_rows):
+            self.progress_label.config(text=f"Carregando {end} de {len(self._render_rows)}...")
+            self._render_after_id = self.window.after(RENDER_INTERVAL_MS, self._render_next_batch)
+        else:
+            self._finish_render(f"{end} agendamento(s)")
+
+    def _finish_render(self, status):
+        """Remove os itens que sobraram da exibição anterior e atualiza o indicador."""
+        surplus = self._render_items[self._render_index:]
+        if surplus:
+            self.tree.delete(*surplus)
+        self._render_items = ()
+        self.progress_label.config(text=status)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def _stop_render(self):
+        """Cancela o próximo lote agendado, se houver."""
+        if self._render_after_id is not None:
+            self.window.after_cancel(self._render_after_id)
+            self._render_after_id = None
+
+    def cancel_render(self):
+        """Interrompe a renderização, mantendo apenas as linhas já exibidas."""
+        if self._render_after_id is None: return
+        self._stop_render()
+        self._finish_render(f"Exibindo {self._render_index} de {len(self._render_rows)} (cancelado)")
+
+    def get_export_filters(self):
+        """Retorna os filtros de exportação digitados (data inicial/final e serviço)."""
+        return {key: entry.get().strip() for key, entry in self.export_entries.items()}
+
+    def _handle_filter_click(self):
+        """Recarrega o relatório com o período e o serviço digitados (sem datas, só os agendamentos atuais)."""
+        if self.controller: self.controller.handle_report_filter(self.get_export_filters())
+
+    def _handle_export_click(self):
+        """Pede o arquivo de destino e encaminha a exportação para o controller."""
+        path = filedialog.asksaveasfilename(
+            parent=self.window, title="Exportar Agendamentos", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json"), ("JSON Lines", "*.jsonl")])
+        if path and self.controller: self.controller.handle_export_report(path, self.get_export_filters())
+
+    def show_message(self, title, message):
+        """Exibe uma mensagem informativa na janela de relatório."""
+        messagebox.showinfo(title, message, parent=self.window)
+
+    def show_error(self, title, message):
+        """Exibe uma mensagem de erro na janela de relatório."""
+        messagebox.showerror(title, message, parent=self.window)
 
     def show(self):
         """Mostra a janela de relatório."""
@@ -55,4 +217,5 @@ class ReportView:
     def destroy(self):
         """Destroi a janela de relatório."""
         if self.window.winfo_exists():
+            self._stop_render()
             self.window.destroy()
\ No newline at end of file
@@ -0,0 +1,111 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# Campos do cadastro: (chave usada pelo controller, rótulo)
+SERVICO_FIELDS = (("Nome", "Nome"), ("Valor", "Valor (R$)"), ("Duração", "Duração (min)"))
+
+class ServicosView:
+    """Janela do catálogo de serviços: nome, valor e duração padrão de cada um."""
+    def __init__(self, master, controller):
+        """Inicializa a janela com a lista de serviços e o formulário de edição."""
+        self.master = master
+        self.controller = controller
+        self.selected_id = None
+
+        self.window = tk.Toplevel(self.master)
+        self.window.title("Serviços")
+        self.window.geometry("560x420+200+200")
+
+        self.list_frame = ttk.Frame(self.window, padding="10 10 10 0")
+        self.list_frame.pack(expand=True, fill=tk.BOTH)
+        self.tree = ttk.Treeview(self.list_frame, columns=("Nome", "Valor", "Duração"), show='headings', height=10)
+        self.tree.heading("Nome", text="Serviço"); self.tree.column("Nome", width=260)
+        self.tree.heading("Valor", text="Valor (R$)"); self.tree.column("Valor", width=100, anchor=tk.E)
+        self.tree.heading("Duração", text="Duração (min)"); self.tree.column("Duração", width=100, anchor=tk.E)
+        scroll = ttk.Scrollbar(self.list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+
+        self.form_frame = ttk.Frame(self.window, padding="10")
+        self.form_frame.pack(fill=tk.X)
+        self.entries = {}
+        for column, (key, label) in enumerate(SERVICO_FIELDS):
+            ttk.Label(self.form_frame, text=f"{label}:").grid(row=0, column=2 * column, padx=(0, 5), sticky=tk.W)
+            self.entries[key] = ttk.Entry(self.form_frame, width=28 if key == "Nome" else 10)
+            self.entries[key].grid(row=0, column=2 * column + 1, padx=(0, 10), sticky=tk.W)
+
+        self.button_frame = ttk.Frame(self.window, padding="0 0 0 10")
+        self.button_frame.pack()
+        self.new_button = ttk.Button(self.button_frame, text="Novo", command=self.clear_form)
+        self.save_button = ttk.Button(self.button_frame, text="Salvar", command=self._handle_save_click)
+        self.delete_button = ttk.Button(self.button_frame, text="Remover", command=self._handle_delete_click)
+        self.close_button = ttk.Button(self.button_frame, text="Fechar", command=self.destroy)
+        for button in (self.new_button, self.save_button, self.delete_button, self.close_button):
+            button.pack(side=tk.LEFT, padx=5)
+        self.delete_button.config(state=tk.DISABLED)
+        self.window.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def populate(self, servicos):
+        """Mostra os serviços (id, nome, valor em R$, duração), mantendo a seleção se possível."""
+        self.tree.delete(*self.tree.get_children())
+        for servico_id, nome, valor, duracao in servicos:
+            self.tree.insert("", tk.END, iid=servico_id, values=(nome, valor, duracao))
+        if self.selected_id is not None and self.tree.exists(self.selected_id):
+            self.tree.selection_set(self.selected_id)
+
+    def _on_tree_select(self, event):
+        """Carrega no formulário o serviço selecionado."""
+        selected = self.tree.selection()
+        if not selected:
+            return
+        self.selected_id = int(selected[0])
+        for key, value in zip(("Nome", "Valor", "Duração"), self.tree.item(selected[0], "values")):
+            self.entries[key].delete(0, tk.END)
+            self.entries[key].insert(0, value)
+        self.delete_button.config(state=tk.NORMAL)
+
+    def get_form_data(self):
+        """Textos digitados no formulário."""
+        return {key: entry.get().strip() for key, entry in self.entries.items()}
+
+    def clear_form(self):
+        """Limpa o formulário para cadastrar um novo serviço."""
+        self.selected_id = None
+        if self.tree.selection(): self.tree.selection_remove(*self.tree.selection())
+        for entry in self.entries.values():
+            entry.delete(0, tk.END)
+        self.delete_button.config(state=tk.DISABLED)
+        self.entries["Nome"].focus_set()
+
+    def _handle_save_click(self):
+        """Encaminha ao controller o serviço do formulário (novo ou o selecionado)."""
+        if self.controller: self.controller.handle_service_save(self.selected_id, self.get_form_data())
+
+    def _handle_delete_click(self):
+        """Encaminha ao controller a remoção do serviço selecionado, após confirmação."""
+        if self.selected_id is not None and self.controller and self.ask_question("Confirmar", "Remover este serviço?"):
+            self.controller.handle_service_delete(self.selected_id)
+
+    def show_message(self, title, message):
+        """Exibe uma mensagem informativa na janela de serviços."""
+        messagebox.showinfo(title, message, parent=self.window)
+
+    def show_error(self, title, message):
+        """Exibe uma mensagem de erro na janela de serviços."""
+        messagebox.showerror(title, message, parent=self.window)
+
+    def ask_question(self, title, message):
+        """Exibe uma caixa de diálogo de pergunta (Sim/Não)."""
+        return messagebox.askyesno(title, message, parent=self.window)
+
+    def lift(self):
+        """Traz a janela para a frente."""
+        self.window.deiconify()
+        self.window.lift()
+
+    def destroy(self):
+        """Destroi a janela."""
+        if self.window.winfo_exists():
+            self.window.destroy()